@@ -1,40 +1,183 @@
 # importing the required libraries
 import streamlit as st # for turning data scripts into web applications
-import plotly.express as px # for Plotly visualizations using high-level interface
 import plotly.io as pio # for displaying and saving Plotly figures
 import pandas as pd # for data manipulation and analysis with DataFrames
 import numpy as np # for numerical operations and array manipulation
 import os
+import sys
+import time # for timing the display of every chart when profiling
+
+# making the shared combustion_analytics package importable when running from the app_deploy folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from combustion_analytics import dataset_fingerprint, build_prepared_dataset, prepared_dataset_view, resolve_dataset_path # for the cached, versioned prepared dataset stage
+from combustion_analytics import load_or_build_aggregates # for the precomputed Key Insights aggregates
+from combustion_analytics import box_statistics, histogram_counts # for shrinking chart payloads before plotting
+from combustion_analytics import memory_report # for the per-column memory footprint of the shared dataset
+from combustion_analytics.energy_cube import build_energy_cube, build_facility_table, cube_filter_options, filter_state, \
+    slice_cube, slice_energy_cube, cube_category_counts, cube_key_insights_aggregates # for answering the filtered charts from the precomputed cube
+from combustion_analytics.page_figures import build_dataset_exploration_figures, build_key_insights_figures, \
+    facility_map_figure, nearby_fuel_energy_figure, county_choropleth_figure, COUNTY_MEASURE_LABELS, \
+    facility_drill_down_figure, naics_level_figure # for building each page's figures
+from combustion_analytics.naics_hierarchy import NAICS_LEVELS, NAICS_LEVEL_NAMES, naics_children # for the NAICS drill-down
+from combustion_analytics.facility_search import SEARCH_LIMIT, build_facility_search_index, search_facilities, \
+    facility_units, facility_fuel_summary # for the indexed facility search and drill-down
+from combustion_analytics.spatial_index import TILE_ZOOM_LEVELS, facility_locations, build_tile_index, area_bounds, \
+    zoom_for_bounds, query_tiles, query_facilities # for the tile-aggregated facility map
+from combustion_analytics.figure_cache import figure_cache_dir, load_cached_figures, store_figures # for reusing built figures across restarts
+from combustion_analytics.rerun_profile import profiling_mode, start_rerun_profile, timed_stage, record_figure, \
+    finish_rerun_profile # for the opt-in per-rerun timings
 
 
 # setting the opening of Plotly charts in a browser tab
 pio.renderers.default = "browser"
 
-
-# setting the helper function to load data (cached for performance)
-@st.cache_data
-def load_combustion__energy_dataset():
-    # importing the dataset from the file system, accounting for relative and absolute paths and specifying file encoding
-    try:
-        df = pd.read_csv("data_source/IndustrialCombEnergy_2014_utf-8_version.csv", encoding="utf-8")
-    except Exception as e:
-        df = pd.read_csv("../data_source/IndustrialCombEnergy_2014_utf-8_version.csv", encoding="utf-8")
-    # returning the loaded dataset as output
-    return df
-
-# getting the loaded dataset via the function call
-raw_df = load_combustion__energy_dataset()
-
-# dropping the columns that are not required for the analysis
-transformed_df = raw_df.drop(['FACILITY_ID', 'FUEL_TYPE_BLEND', 'FUEL_TYPE_OTHER', 'OTHER_OR_BLEND_FUEL_TYPE', 'CENSUS_PLACE_NAME', \
-                                            'REPORTING_YEAR','COUNTY','COUNTY_FIPS','LATITUDE', 'LONGITUDE','ZIP', 'PRIMARY_NAICS_CODE'], \
-                                                  axis=1)
-
-# transforming the values of the COGENERATION_UNIT_EMISS_IND column
-transformed_df.replace({'COGENERATION_UNIT_EMISS_IND': {'Y': 'Yes', 'N': 'No'}}, inplace=True)
-
-# dropping the records having null values
-cleaned_df = transformed_df.dropna(ignore_index=True)
+# setting how the MMBtu vs GWht scatter plot is reduced before plotting ('lttb' or 'binned', set via the environment)
+SCATTER_REDUCTION = os.environ.get("SCATTER_REDUCTION", "lttb")
+
+# setting the number of built pages (per page, dataset version and parameters, including the filters) kept in memory
+PAGE_CACHE_ENTRIES = 32
+
+# setting the sidebar filters and their labels, all answered from the energy cube
+FILTER_LABELS = {'STATE': 'State', 'MECS_Region': 'MECS Region', 'FUEL_TYPE': 'Fuel Type', 'GROUPING': 'Industry Group',
+                 'COGENERATION_UNIT_EMISS_IND': 'Used for Cogeneration'}
+
+
+# setting the helper function to load and prepare the data once per source-file fingerprint
+# (cache_resource hands every session the same frames instead of a per-rerun copy; the pages only get
+# copy-on-write views of them, see prepared_dataset_view)
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_prepared_dataset(fingerprint):
+    return build_prepared_dataset()
+
+# setting the helper function to read the precomputed Key Insights aggregates from the on-disk store
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_key_insights_aggregates(fingerprint):
+    with timed_stage('key_insights_aggregates'):
+        return load_or_build_aggregates(load_prepared_dataset(fingerprint)[2], resolve_dataset_path())
+
+# setting the helper function to precompute the box plot statistics of the energy use per category
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_box_statistics(fingerprint):
+    cleaned = load_prepared_dataset(fingerprint)[2]
+    with timed_stage('box_statistics'):
+        return {category_col: box_statistics(cleaned, category_col, 'MMBtu_TOTAL')
+                for category_col in ['FUEL_TYPE', 'UNIT_TYPE', 'GROUPING']}
+
+# setting the helper function to bin an energy column on the server, cached per column and bin spec
+@st.cache_resource(max_entries=16, show_spinner=False)
+def load_histogram_counts(fingerprint, value_col, nbins, scale):
+    return histogram_counts(load_prepared_dataset(fingerprint)[2][value_col], nbins=nbins, scale=scale)
+
+# setting the helper function to build the energy cube (unit counts and MMBtu sums per combination of the
+# filter dimensions, and of the filters and each chart dimension) once per dataset version, so a filter change only
+# rolls up the cube
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_energy_cube(fingerprint):
+    with timed_stage('energy_cube'):
+        cube = build_energy_cube(load_prepared_dataset(fingerprint)[2])
+    return cube, cube_filter_options(cube)
+
+# setting the helper function to build the facility table (unit counts and MMBtu sums per facility, unit type and
+# filter combination) once per dataset version, for the filtered facility rankings
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_facility_table(fingerprint):
+    with timed_stage('facility_table'):
+        return build_facility_table(load_prepared_dataset(fingerprint)[2])
+
+# setting the helper function to deduplicate the facilities and pre-aggregate them per map tile and zoom level
+# once per dataset version, so moving the map only reads the visible tiles
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_spatial_index(fingerprint):
+    with timed_stage('spatial_index'):
+        facilities = facility_locations(load_prepared_dataset(fingerprint)[2])
+        return facilities, build_tile_index(facilities)
+
+# setting the helper function to build the haversine tree over the facilities once per dataset version
+# (geo_query is imported here rather than at the top, so only the Facility Map page loads scikit-learn and scipy)
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_geo_index(fingerprint):
+    from combustion_analytics.geo_query import build_geo_index # for the haversine tree over the facilities
+    with timed_stage('geo_index'):
+        return build_geo_index(load_prepared_dataset(fingerprint)[2])
+
+# setting the helper function to build the facility name index and the per-facility unit slices once per dataset
+# version, so a search never scans the dataset
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_facility_search_index(fingerprint):
+    with timed_stage('facility_search_index'):
+        return build_facility_search_index(load_prepared_dataset(fingerprint)[2])
+
+# setting the helper function to draw the county map from the stored county aggregates, once per measure
+@st.cache_resource(max_entries=8, show_spinner=False)
+def load_county_figure(fingerprint, measure):
+    county_energy = load_key_insights_aggregates(fingerprint)['county_energy']
+    with timed_stage('build_figures'):
+        return county_choropleth_figure(county_energy, measure)
+
+# setting the helper function to build the map of one area at one tile zoom level
+@st.cache_resource(max_entries=PAGE_CACHE_ENTRIES, show_spinner=False)
+def load_map_figure(fingerprint, area, zoom):
+    facilities, tile_index = load_spatial_index(fingerprint)
+    bounds = area_bounds(facilities, None if area == "All facilities" else area)
+    with timed_stage('build_figures'):
+        return facility_map_figure(query_tiles(tile_index, zoom, bounds), bounds)
+
+# setting the helper function to build a page's data and figures for the given dataset version and parameters
+def build_page_figures(page_name, fingerprint, hist_scale='linear', filter_key=()):
+    # slicing the cube once for a filtered page; the unfiltered page keeps its precomputed data
+    filtered_cube = slice_energy_cube(load_energy_cube(fingerprint)[0], filter_key) if filter_key else None
+    if page_name == "Dataset Exploration":
+        hist_counts_dt = {value_col: load_histogram_counts(fingerprint, value_col, 20, hist_scale)
+                          for value_col in ['MMBtu_TOTAL', 'GWht_TOTAL']}
+        box_stats_dt = load_box_statistics(fingerprint)
+        category_counts = cube_category_counts(filtered_cube) if filter_key else None
+        with timed_stage('build_figures'):
+            return build_dataset_exploration_figures(load_prepared_dataset(fingerprint)[2], box_stats_dt,
+                                                     hist_counts_dt, hist_scale=hist_scale,
+                                                     scatter_reduction=SCATTER_REDUCTION,
+                                                     category_counts=category_counts)
+    if page_name == "Key Insights":
+        if filter_key:
+            aggregates = cube_key_insights_aggregates(filtered_cube, load_facility_table(fingerprint), filter_key)
+        else:
+            aggregates = load_key_insights_aggregates(fingerprint)
+        with timed_stage('build_figures'):
+            return build_key_insights_figures(aggregates)
+    raise ValueError(f"No figures are built for the page: {page_name!r}")
+
+# setting the helper function to get a page's figures once per (page, dataset version, parameters), so revisiting
+# a page is a cache hit (the least recently used pages are dropped beyond PAGE_CACHE_ENTRIES); a page built before,
+# in this or an earlier process, is read back from its cached figure specs instead of being rebuilt
+@st.cache_resource(max_entries=PAGE_CACHE_ENTRIES, show_spinner=False)
+def load_page_figures(page_name, fingerprint, hist_scale='linear', filter_key=()):
+    # (this file is hashed into the cache key too, as build_page_figures shapes the figure data)
+    cache_dir = figure_cache_dir(resolve_dataset_path(), fingerprint, extra_sources=(os.path.abspath(__file__),))
+    page_state = [hist_scale, SCATTER_REDUCTION, filter_key] if page_name == "Dataset Exploration" else [filter_key]
+    with timed_stage('figure_cache:load'):
+        figures = load_cached_figures(cache_dir, page_name, page_state)
+    if figures is None:
+        figures = build_page_figures(page_name, fingerprint, hist_scale=hist_scale, filter_key=filter_key)
+        with timed_stage('figure_cache:store'):
+            store_figures(cache_dir, page_name, page_state, figures)
+    return figures
+
+# setting the helper function to display a Plotly chart, recording its payload and display time when profiling
+def show_plotly_chart(fig, **kwargs):
+    started = time.perf_counter()
+    st.plotly_chart(fig, **kwargs)
+    record_figure(kwargs.get('key') or fig.layout.title.text, fig, time.perf_counter() - started)
+
+# starting the opt-in rerun profile, switched on with ?profile=1 or the APP_PROFILE variable
+# (?profile=cprofile only dumps a cProfile when APP_PROFILE is set on the server)
+rerun_profile = None
+profile_mode = profiling_mode(st.query_params.get("profile"))
+if profile_mode:
+    rerun_profile = start_rerun_profile(None, profile_mode)
+
+# getting the raw dataset summary and the transformed and cleaned datasets via the function call
+with timed_stage('prepared_dataset'):
+    raw_summary, transformed_df, cleaned_df = prepared_dataset_view(load_prepared_dataset(dataset_fingerprint()))
 
 
 
@@ -59,7 +202,24 @@ st.markdown("---")
 # setting up the page sidebar
 st.sidebar.header("Navigation Menu")
 # displaying the pages as radio button for easy navigation
-page = st.sidebar.radio("Go to", ["Project Overview", "Dataset Exploration", "Key Insights", "Conclusion and Recommendations", "References"])
+page = st.sidebar.radio("Go to", ["Project Overview", "Dataset Exploration", "Key Insights", "Facility Map", "Facility Search", "Conclusion and Recommendations", "References"])
+if rerun_profile:
+    rerun_profile['page'] = page
+
+# setting up the sidebar filters of the Dataset Exploration and Key Insights charts
+filter_key = ()
+if page in ("Dataset Exploration", "Key Insights"):
+    st.sidebar.header("Filters")
+    energy_cube, filter_options = load_energy_cube(dataset_fingerprint())
+    filter_key = filter_state({dimension: st.sidebar.multiselect(label, filter_options[dimension], key=f"filter_{dimension}")
+                               for dimension, label in FILTER_LABELS.items()})
+    if filter_key:
+        # counting the selected units from the cube, falling back to the whole dataset when nothing matches
+        selected_units = slice_cube(energy_cube['filters'], filter_key)['units'].sum()
+        st.sidebar.caption(f"{selected_units:,} of {energy_cube['filters']['units'].sum():,} combustion units selected")
+        if not selected_units:
+            st.sidebar.warning("No combustion units match the selected filters, so the whole dataset is shown.")
+            filter_key = ()
 
 
 # setting up the page contents for the sidebar navigation
@@ -157,7 +317,7 @@ elif page == "Dataset Exploration":
     # the dataset's shape subsection
     st.subheader('Shape of the Dataset')
     # extracting the shape of the dataset
-    size_of_df = raw_df.shape
+    size_of_df = raw_summary['shape']
     # content for the dataset's shape
     st.write(f"The dataset consists of **{size_of_df[0]} rows** and **{size_of_df[1]} columns**.")
 
@@ -166,16 +326,16 @@ elif page == "Dataset Exploration":
     # content for the dataset's shape
     st.write("Exploring the first and last few rows of the dataset.")
     # extracting the first few rows of the dataset
-    st.dataframe(raw_df.head())
+    st.dataframe(raw_summary['head'])
     # extracting the last few rows of the dataset
-    st.dataframe(raw_df.tail())
+    st.dataframe(raw_summary['tail'])
 
     # the dataset's data types subsection
     st.subheader('Data Types of the Dataset')
     # content for the dataset's data types subsection
     st.write("Checking the data types for each column of the dataset.")
     # extracting the data types of the dataset
-    df_dtypes = raw_df.dtypes
+    df_dtypes = raw_summary['dtypes']
     # showing the data types
     st.write(df_dtypes)
 
@@ -184,7 +344,7 @@ elif page == "Dataset Exploration":
     # content for the dataset's summary statistics subsection
     st.write("Examining the desciptive statistics of the dataset's numerical columns.")
     # extracting the summary statisitics of the dataset
-    df_desc_stats = raw_df.describe()
+    df_desc_stats = raw_summary['describe']
     # showing the summary statistics
     st.write(df_desc_stats)
 
@@ -195,12 +355,19 @@ elif page == "Dataset Exploration":
     # content 3 for the dataset cleaning subsection
     st.write("- The following columns were dropped from the dataset:")
     st.write("""
-    - ```FACILITY_ID```, ```CENSUS_PLACE_NAME```, ```COUNTY```,  ```COUNTY_FIPS```, 
-              ```LATITUDE```, ```LONGITUDE```, ```ZIP```, 
-             ```PRIMARY_NAICS_TITLE```: These columns were dropped because they were not 
+    - ```CENSUS_PLACE_NAME```, ```ZIP```: These columns were dropped because they were not 
              required for the analysis.
     """)
     st.write("""
+    - ```PRIMARY_NAICS_CODE```: This column was kept aside for rolling the industries up to their 
+             NAICS sectors in the **Key Insights** page.
+    """)
+    st.write("""
+    - ```FACILITY_ID```, ```LATITUDE```, ```LONGITUDE```, ```COUNTY```, ```COUNTY_FIPS```: These columns 
+             were kept aside for the **Facility Map** page; a record missing only its location is still 
+             used in the analysis.
+    """)
+    st.write("""
     - ```FUEL_TYPE_BLEND```, ```FUEL_TYPE_OTHER```, 
              ```OTHER_OR_BLEND_FUEL_TYPE```: These columns were dropped because they contained only
              missing values.
@@ -223,8 +390,8 @@ elif page == "Dataset Exploration":
     st.write("""
     The dataset was examined for the presence of missing data.
     """)
-    # checking the dataset for missing values
-    cleaned_df_missing_vals = transformed_df.isna().sum()
+    # reading the missing values from the data-quality profile computed at ingest
+    cleaned_df_missing_vals = pd.Series(raw_summary['quality']['kept_nulls'])
     # showing the result
     st.write(cleaned_df_missing_vals)
 
@@ -237,21 +404,22 @@ elif page == "Dataset Exploration":
              corrupting the integrity of the dataset.
     """)
     # checking again for missing values after cleaning
-    st.write(cleaned_df.isna().sum())
+    st.write(pd.Series(raw_summary['quality']['cleaned_nulls']))
 
     # content 6 for the dataset cleaning subsection
     st.write("**Checking for duplicated data**")
-    dupli_df = cleaned_df.loc[cleaned_df.duplicated()]
-    st.write("The dataset was assessed for presence of duplicated records, so that each record of data \
+    # reading the duplicates found by hashing every row at ingest
+    dupli_df = raw_summary['quality']['duplicate_sample']
+    st.write(f"The dataset was assessed for presence of duplicated records, so that each record of data \
              was a representative of a unique observation. The dataset was found to contain \
-              **0** duplicate records.")
+              **{raw_summary['quality']['duplicate_rows']}** duplicate records.")
     # showing the duplicated data, if any
     st.write(dupli_df)
 
     # content 7 for the dataset cleaning subsection
     st.write("**Data remaining after cleaning process**")
     # calculating the percentage of data remaining after the cleaning process
-    pct_rem_data = len(cleaned_df)/len(raw_df)
+    pct_rem_data = len(cleaned_df)/raw_summary['shape'][0]
     # showing the remaining data
     st.write(f"The percentage of data remaining after the cleaning process was {pct_rem_data*100:.2f} %, \
              representing a significant amount of data left for the EDA analysis.")
@@ -259,171 +427,38 @@ elif page == "Dataset Exploration":
     # dataset feature exploration subsection
     st.subheader('Feature Exploration of the Dataset')
 
-    # extracting the different fuel types in the dataset
-    fuel_type_dt = cleaned_df['FUEL_TYPE'].value_counts()
-    # extracting the fuel types and their corresponding counts 
-    y_1, x_1 = fuel_type_dt.index, fuel_type_dt.values
-    
-    # plotting the bar graph of the fuel types
-    fig_1 = px.bar(x=x_1, y=y_1, title='Fuel Type Used across the different combustion units', 
-                   labels={'x':'No. of combustion units',
-                           'y': 'Fuel Type'},
-                           height=600)
-    fig_1.update_layout(title={
-            'x': 0.5, # Sets the x-position to the center (0.5)
-            'xanchor': 'center' # Aligns the title's center with the x-position 
-        })
-    st.plotly_chart(fig_1, use_container_width=False)
-    
-    # extracting the different combustion units in the dataset
-    unit_type_dt = cleaned_df['UNIT_TYPE'].value_counts()
-    # extracting the combustion units and their corresponding counts
-    y_2, x_2 = unit_type_dt.index, unit_type_dt.values
-
-    # plotting the bar graph of the combustion units
-    fig_2 = px.bar(x=x_2, y=y_2, title='Combustion Unit Type Used across the Industries', 
-                   labels={'x':'No. of combustion units',
-                           'y': 'Combustion unit type'},
-                           height=600)
-    fig_2.update_layout(title={
-            'x': 0.5,
-            'xanchor': 'center'
-        })
-    st.plotly_chart(fig_2, use_container_width=False)
-    
-    # extracting the different industries based on NAICS in the dataset and selecting the first 20
-    naics_dt = cleaned_df['PRIMARY_NAICS_TITLE'].value_counts().head(20)
-    # extracting the industries and their corresponding counts
-    y_3, x_3 = naics_dt.index, naics_dt.values
-
-    # plotting the bar graph of the industries
-    fig_3 = px.bar(x=x_3, y=y_3, title='Classification of Combustion Units by NAICS title (Top 20)', 
-                   labels={'x':'No. of combustion units',
-                           'y': 'NAICS Title'},
-                           height=600)
-    fig_3.update_layout(title={
-            'x': 0.5,
-            'xanchor': 'center'
-        })
-    st.plotly_chart(fig_3, use_container_width=False)
-
-
-    # extracting the different industry groups in the dataset
-    group_dt = cleaned_df['GROUPING'].value_counts()
-    # extracting the industry groups and their corresponding counts
-    y_4, x_4 = group_dt.index, group_dt.values
-
-    # plotting the bar graph of the industry groups
-    fig_4 = px.bar(x=x_4, y=y_4, title='Classification of Combustion Units by Industry Group', 
-                   labels={'x':'No. of combustion units',
-                           'y': 'Industry Group'},
-                           height=600)
-    fig_4.update_layout(title={
-            'x': 0.5,
-            'xanchor': 'center'
-        })
-    st.plotly_chart(fig_4, use_container_width=False)
+    # reading the histogram bin spacing from the widget state, as the figures are built before the widget is drawn
+    hist_scale = st.session_state.get("hist_scale", "linear")
+    # getting the page's figures, built once per dataset version and bin spacing
+    with timed_stage('page_figures'):
+        figures = load_page_figures(page, dataset_fingerprint(), hist_scale=hist_scale, filter_key=filter_key)
+    if filter_key:
+        st.caption("The bar charts follow the sidebar filters; the histograms, scatter plot and box plots show the whole dataset.")
 
-    
-    # extracting the cogeneration status of the combustion units in the dataset
-    cogen_dt = cleaned_df['COGENERATION_UNIT_EMISS_IND'].value_counts()
-    # extracting the corresponding counts of the two groups (Yes and No)
-    x_5, y_5 = cogen_dt.index, cogen_dt.values
-
-    # plotting the bar graph of the cogeneration status of the combustion units
-    fig_5 = px.bar(x=x_5, y=y_5, title='Classification of Combustion Units by Cogeneration', 
-                   labels={'x':'Cogeneration Indicator',
-                           'y': 'No. of combustion units'},
-                           )
-    fig_5.update_layout(title={
-            'x': 0.5,
-            'xanchor': 'center'
-        })
-    st.plotly_chart(fig_5, use_container_width=False)
-
-    # extracting the different regions in the dataset
-    mecs_dt = cleaned_df['MECS_Region'].value_counts()
-    # extracting the different regions and their corresponding combustion unit counts
-    x_6, y_6 = mecs_dt.index, mecs_dt.values
-
-     # plotting the bar graph of the combustion units' division by region
-    fig_6 = px.bar(x=x_6, y=y_6, title='Classification of Combustion Units by Manufacturing Energy Consumption Survey (MECS) Region', 
-                   labels={'x':'MECS Region',
-                           'y': 'No. of combustion units'},
-                           )
-    fig_6.update_layout(title={
-            'x': 0.5, 
-            'xanchor': 'center' 
-        })
-    st.plotly_chart(fig_6, use_container_width=False)
-
-    # extracting the combustion energy values in MMBtu
-    mmbtu_dt = cleaned_df['MMBtu_TOTAL']
-    # extracting the combustion energy values in GWht
-    gwht_dt = cleaned_df['GWht_TOTAL']
+    # plotting the bar graphs of the fuel types, combustion units, industries, industry groups, cogeneration status and regions
+    for fig_name in ['fig_1', 'fig_2', 'fig_3', 'fig_4', 'fig_5', 'fig_6']:
+        show_plotly_chart(figures[fig_name], use_container_width=False)
+
+    # choosing the bin spacing - log-spaced bins spread the heavy right tail across the chart
+    st.radio("Histogram bins", ["linear", "log"], horizontal=True, format_func=str.capitalize, key="hist_scale")
 
     # splitting the section into 2 columns - for MMBtu and GWht
     col_mmbtu, col_gwht = st.columns(2)
 
-    # plotting the first histogram graph for the MMBtu values
+    # plotting the histogram graphs for the MMBtu and GWht values
     with col_mmbtu:
-        fig_7_1 = px.histogram(x=mmbtu_dt, nbins=20, title='Distribution of Total Energy Use (MMBtu)',
-                               labels={'x':'Total Energy Use (MMBtu)',
-                           'y': 'Count'})
-        fig_7_1.update_layout(
-        title={
-            'x': 0.5,  # Sets the x-position to the center (0.5)
-            'xanchor': 'center' # Aligns the title's center with the x-position
-        }
-    )
-        st.plotly_chart(fig_7_1, use_container_width=False)
-
-    # plotting the second histogram graph for the GWht values
+        show_plotly_chart(figures['fig_7_1'], use_container_width=False)
     with col_gwht:
-        fig_7_2 = px.histogram(x=gwht_dt, nbins=20,  title='Distribution of Total Energy Use (GWht)',
-                        labels={'x':'Total Energy Use (GWht)',
-                           'y': 'Count'}        )
-        fig_7_2.update_layout(
-        title={
-            'x': 0.5,  
-            'xanchor': 'center' 
-        }
-    )
-        st.plotly_chart(fig_7_2, use_container_width=False)
-
-    # getting the correlation between the MMBtu and GWht values
-    corr_df = cleaned_df[['MMBtu_TOTAL', 'GWht_TOTAL']].corr()
+        show_plotly_chart(figures['fig_7_2'], use_container_width=False)
 
     # splitting the section into 2 columns - for scatter plot and heatmap
     col_rel_scatter, col_rel_corr = st.columns(2)
 
-    # plotting the scatterplot for relationship between the MMBtu and GWht values
+    # plotting the scatterplot and the correlation heatmap for the relationship between the MMBtu and GWht values
     with col_rel_scatter:
-        fig_8_1 = px.scatter(x=gwht_dt, y=mmbtu_dt, title='Scatterplot of MMBtu vs GWht',
-                               labels={'x':'Total Energy Use (GWht)',
-                           'y': 'Total Energy Use (MMBtu)'})
-        fig_8_1.update_layout(
-        title={
-            'x': 0.5, 
-            'xanchor': 'center'
-        }
-    )
-        st.plotly_chart(fig_8_1, use_container_width=False)
-  
-    # plotting the correlation heatmap to show the correlation between MMBtu and GWht
+        show_plotly_chart(figures['fig_8_1'], use_container_width=False)
     with col_rel_corr:
-        fig_8_2 = px.imshow(corr_df, text_auto=True, title='Heatmap of MMBtu vs GWht',
-                            labels=dict(color="Correlation"),
-                x=['MMBtu', 'GWht'],
-                y=['MMBtu', 'GWht'])
-        
-        fig_8_2.update_layout(
-        title={
-            'x': 0.5, 
-            'xanchor': 'center' 
-        }
-    )
-        st.plotly_chart(fig_8_2, use_container_width=False)
+        show_plotly_chart(figures['fig_8_2'], use_container_width=False)
 
     # content for the relationship and correlation of the MMbtu and GWht values
     st.write("The reason for the linear relationship and positive correlation **(i.e. 1)**" \
@@ -437,164 +472,34 @@ elif page == "Dataset Exploration":
     # the dataset outlier visualization subsection
     st.subheader("**Visualizing Outliers in the Data**")
     
-    # extracting the fuel type column of the dataset
-    fuel_type_dt_1 = cleaned_df['FUEL_TYPE']
-    # extracting the MMBtu column of the dataset
-    mmbtu_dt_1 = cleaned_df['MMBtu_TOTAL']
-    
-    # showing the boxplot distribution of the different fuel types and their usage in terms of combustion energy
-    fig_9 = px.box(x=mmbtu_dt_1, y=fuel_type_dt_1, 
-                   title='Boxplot Distribution of Fuel Type and their energy use (MMBtu)',
-                   labels={'x':'Total Energy Use (MMBtu)',
-                           'y': 'Fuel Type'},
-                   height=1000)
-    fig_9.update_layout(title={
-            'x': 0.5,  # Sets the x-position to the center (0.5)
-            'xanchor': 'center' # Aligns the title's center with the x-position
-        })
-    st.plotly_chart(fig_9, use_container_width=False)
-    
-    # extracting the combustion unit type column of the dataset
-    unit_type_dt_1 = cleaned_df['UNIT_TYPE']
-
-    # showing the boxplot distribution of the different combustion units and their corresponding combustion energy use
-    fig_10 = px.box(x=mmbtu_dt_1, y=unit_type_dt_1, 
-                   title='Boxplot Distribution of  Combustion Unit Type and their energy use (MMBtu)',
-                   labels={'x':'Total Energy Use (MMBtu)',
-                           'y': 'Unit Type'},
-                   height=800)
-    fig_10.update_layout(title={
-            'x': 0.5, 
-            'xanchor': 'center' 
-        })
-    st.plotly_chart(fig_10, use_container_width=False)
-    
-    # extracting the industry group column of the dataset
-    group_type_dt_1 = cleaned_df['GROUPING']
-    # showing the boxplot distribution of the different industry groups and their corresponding combustion energy use
-    fig_11 = px.box(x=mmbtu_dt_1, y=group_type_dt_1, 
-                   title='Boxplot Distribution of the Industry Groups and their energy use (MMBtu)',
-                   labels={'x':'Total Energy Use (MMBtu)',
-                           'y': 'Group'},
-                   height=600)
-    fig_11.update_layout(title={
-            'x': 0.5, 
-            'xanchor': 'center'
-        })
-    st.plotly_chart(fig_11, use_container_width=False)
+    # showing the boxplot distributions of the energy use (MMBtu) by fuel type, combustion unit type and industry group
+    for fig_name in ['fig_9', 'fig_10', 'fig_11']:
+        show_plotly_chart(figures[fig_name], use_container_width=False)
 
 # setting up the Key Insights page
 elif page == "Key Insights":
+    # getting the page's figures, built once per dataset version from the precomputed aggregates
+    with timed_stage('page_figures'):
+        figures = load_page_figures(page, dataset_fingerprint(), filter_key=filter_key)
+
     # the key insights header
     st.header("Main Findings💡")
+    if filter_key:
+        st.caption("The charts follow the sidebar filters; the written findings describe the whole dataset.")
     # the key insights subsection
     st.subheader("Asking Key Questions About The Data ❓")
 
     # Question 1
     st.subheader("1. What are the dominant fuel types used by combustion units in each Manufacturing Energy Consumption Survey (MECS) region?")
     
-    # extracting the fuel types used by combustion units in the South region and selecting the top 10 fuels used
-    mecs_south = cleaned_df.query('MECS_Region == "South"') \
-            .groupby('FUEL_TYPE') \
-            .size() \
-            .sort_values(ascending=False) \
-            .head(10)
-
-    # extracting the fuel types used by combustion units in the West region and selecting the top 10 fuels used
-    mecs_west = cleaned_df.query('MECS_Region == "West"') \
-                .groupby('FUEL_TYPE') \
-                .size() \
-                .sort_values(ascending=False) \
-                .head(10)
-
-    # extracting the fuel types used by combustion units in the Midwest region and selecting the top 10 fuels used
-    mecs_midwest = cleaned_df.query('MECS_Region == "Midwest"') \
-                .groupby('FUEL_TYPE') \
-                .size() \
-                .sort_values(ascending=False) \
-                .head(10)
-
-    # extracting the fuel types used by combustion units in the Northeast region and selecting the top 10 fuels used
-    mecs_northeast = cleaned_df.query('MECS_Region == "Northeast"') \
-                .groupby('FUEL_TYPE') \
-                .size() \
-                .sort_values(ascending=False) \
-                .head(10)
-
-    # extract the top 10 fuel types and their corresponding counts from the South region
-    x_south, y_south = mecs_south.index, mecs_south.values
-
-
-    # extract the top 10 fuel types and their corresponding counts from the West region
-    x_west, y_west = mecs_west.index, mecs_west.values
-
-    # extract the top 10 fuel types and their corresponding counts from the Midwest region
-    x_midwest, y_midwest = mecs_midwest.index, mecs_midwest.values
-
-    # extract the top 10 fuel types and their corresponding counts from the Northeast region
-    x_northeast, y_northeast = mecs_northeast.index, mecs_northeast.values
-
-    # splitting the section into 2 columns - for the first two regions
-    col_mecs_south, col_mecs_west = st.columns(2)
-    
-   # plotting the first bar graph for the South region's top 10 fuel types
-    with col_mecs_south:
-        fig_12_1 = px.bar(x=x_south, y=y_south, title='South MECS Region (Top 10 Fuel Type Used)',
-                               labels={'x':'Fuel Type',
-                           'y': 'No. of combustion units'}, color_discrete_sequence=['green'])
-        fig_12_1.update_layout(
-        title={
-            'x': 0.5, 
-            'xanchor': 'center'
-        },
-        xaxis_tickangle=-45
-    )
-        st.plotly_chart(fig_12_1, use_container_width=False)
-
-    # plotting the second bar graph for the West region's top 10 fuel types
-    with col_mecs_west:
-        fig_12_2 = px.bar(x=x_west, y=y_west, title='West MECS Region (Top 10 Fuel Type Used)',
-                               labels={'x':'Fuel Type',
-                           'y': 'No. of combustion units'}, color_discrete_sequence=['purple'])
-        fig_12_2.update_layout(
-        title={
-            'x': 0.5, 
-            'xanchor': 'center'
-        },
-        xaxis_tickangle=-45
-    )
-        st.plotly_chart(fig_12_2, use_container_width=False)
-
-    # splitting the section into 2 columns - for the last two regions
-    col_mecs_midwest, col_mecs_northeast = st.columns(2)
-
-    # plotting the third bar graph for the Midwest region's top 10 fuel types
-    with col_mecs_midwest:
-        fig_12_3 = px.bar(x=x_midwest, y=y_midwest, title='Midwest MECS Region (Top 10 Fuel Type Used)',
-                               labels={'x':'Fuel Type',
-                           'y': 'No. of combustion units'}, color_discrete_sequence=['#D46A21'])
-        fig_12_3.update_layout(
-        title={
-            'x': 0.5, 
-            'xanchor': 'center'
-        },
-        xaxis_tickangle=-45
-    )
-        st.plotly_chart(fig_12_3, use_container_width=False)
-
-    # plotting the last bar graph for the Nrtheast region's top 10 fuel types
-    with col_mecs_northeast:
-        fig_12_4 = px.bar(x=x_northeast, y=y_northeast, title='Northeast MECS Region (Top 10 Fuel Type Used)',
-                               labels={'x':'Fuel Type',
-                           'y': 'No. of combustion units'}, color_discrete_sequence=['#167F9E'])
-        fig_12_4.update_layout(
-        title={
-            'x': 0.5,
-            'xanchor': 'center'
-        },
-        xaxis_tickangle=-45
-    )
-        st.plotly_chart(fig_12_4, use_container_width=False)
+    # plotting a bar graph of the top 10 fuel types for every region, two regions per row
+    mecs_regions = list(figures['fig_12'])
+    for row_start in range(0, len(mecs_regions), 2):
+        # splitting the section into 2 columns - one for each region
+        col_mecs_row = st.columns(2)
+        for col_mecs, region in zip(col_mecs_row, mecs_regions[row_start:row_start + 2]):
+            with col_mecs:
+                show_plotly_chart(figures['fig_12'][region], use_container_width=False, key=f'mecs_fuel_{region}')
     
     # content for Question 1
     st.write("""
@@ -623,31 +528,8 @@ elif page == "Key Insights":
     # Question 2
     st.subheader("2. Which industrial facilities have the highest combustion energy use?")
     
-    # extracting the industrial facilities, ranking them based on total combustion energy usage and selecting the top 10
-    inds_comb_high = cleaned_df.groupby('FACILITY_NAME')['MMBtu_TOTAL'] \
-            .sum() \
-            .sort_values(ascending=False) \
-            .head(10)
-
-    # extract the top 10 facilities and their corresponding total combustion energy use 
-    x_inds_comb_high, y_inds_comb_high = inds_comb_high.index, inds_comb_high.values
-
-    # plotting the bar graph for the top 10 industrial facilities
-    fig_13 = px.bar(x=x_inds_comb_high, y=y_inds_comb_high, 
-                          title='Top 10 Facilities with the Highest Combustion Energy Use',
-                               labels={'x':'Facility',
-                           'y': 'Combustion energy use (MMBtu)'}, height=600,
-                           color_discrete_sequence=["#0B5345"])
-    
     # plotting the bar graph for the top 10 industrial facilities
-    fig_13.update_layout(
-        title={
-            'x': 0.5, 
-            'xanchor': 'center'
-        },
-        xaxis_tickangle=-45
-    )
-    st.plotly_chart(fig_13, use_container_width=False)
+    show_plotly_chart(figures['fig_13'], use_container_width=False)
     
     # content for Question 2
     st.write("""
@@ -680,26 +562,8 @@ elif page == "Key Insights":
                  have the most combustion units? What kind of combustion units can \
                  be found in such facilities?")
     
-    # extracting the facilities, ranking them based on the number of combustion units owned and selecting the top 10
-    ind_top_comb_units = cleaned_df['FACILITY_NAME'] \
-        .value_counts() \
-        .sort_values(ascending=False) \
-        .head(10)
-
-    # extracting the top 10 facilities and their corresponding counts
-    x_ind_top_comb_units, y_ind_top_comb_units = ind_top_comb_units.index, ind_top_comb_units.values
-    
     # plotting the bar graph for the top 10 facilities
-    fig_14_1 = px.bar(x=x_ind_top_comb_units, y=y_ind_top_comb_units, 
-                      title='Top 10 Facilities with the most combustion units',
-                        labels={'x':'Facility',
-                           'y': 'No. of combustion units'}, height=600,
-                          color_discrete_sequence=["#DC143C"])
-    fig_14_1.update_layout(xaxis_tickangle=-45, title={
-            'x': 0.5, 
-            'xanchor': 'center'
-        })
-    st.plotly_chart(fig_14_1, use_container_width=False)
+    show_plotly_chart(figures['fig_14_1'], use_container_width=False)
 
     # content for Question 3 - first part
     st.write("""
@@ -729,119 +593,8 @@ elif page == "Key Insights":
               only waste management facility with a large energy usage footprint. 
     """)
 
-    # splitting the section into 3 columns and 4 rows - one for each graph
-    col_top_row = st.columns(3)
-    col_2nd_row = st.columns(3)
-    col_3rd_row = st.columns(3)
-    col_bottom_row = st.columns(1)
-
-    # making a copy of the cleaned dataset for aggregation
-    copy_clean_df_1 = cleaned_df.copy()
-
-    # extracting the top 10 facilities by number of units owned
-    top_10_fcty_col = copy_clean_df_1.groupby('FACILITY_NAME')['UNIT_NAME'] \
-                                        .size() \
-                                        .sort_values(ascending=False) \
-                                        .head(10).reset_index() \
-                                        .drop('UNIT_NAME', axis=1)
-
-    # extracting the facilities by the type and number of combustion units owned
-    unit_group = copy_clean_df_1.groupby('FACILITY_NAME')['UNIT_TYPE'].value_counts()
-
-    # looping through the array of 10 ten facilities based on number of combustion units owned
-    for i in range(len(col_top_row)):
-        # extracting the facility name
-        fcty_name = top_10_fcty_col.iloc[i]['FACILITY_NAME']
-
-        # plotting the bar graphs for the top row
-        with col_top_row[i]:
-            # extracting the combustion units for a single facility
-            grouping_1 = unit_group[fcty_name]
-            # extracting the combustion units and their corresponding counts
-            x_1_, y_1_ = grouping_1.index, grouping_1.values
-            # plotting the chart
-            fig_14_1_1_ = px.bar(x=x_1_, y=y_1_, 
-                      title=fcty_name,
-                        labels={'x': 'Unit Type',
-                           'y': 'Count'}, height=500,
-                           color_discrete_sequence=["#000080"])
-            fig_14_1_1_.update_layout(xaxis_tickangle=-45,
-                                     title={
-            'x': 0.5,
-            'xanchor': 'center'
-        },)
-            st.plotly_chart(fig_14_1_1_, use_container_width=False, key=fcty_name)
-    
-    # looping through the array of 10 ten facilities based on number of combustion units owned
-    for i in range(len(col_2nd_row)):
-        # extracting the facility name
-        fcty_name = top_10_fcty_col.iloc[i+3]['FACILITY_NAME']
-
-        # plotting the bar graphs for the second row
-        with col_2nd_row[i]:
-            # extracting the combustion units for a single facility
-            grouping_1 = unit_group[fcty_name]
-            # extracting the combustion units and their corresponding counts
-            x_2, y_2 = grouping_1.index, grouping_1.values
-            # plotting the chart
-            fig_14_1_2_ = px.bar(x=x_2, y=y_2, 
-                      title=fcty_name[:40],
-                        labels={'x': 'Unit Type',
-                           'y': 'Count'}, height=500,
-                           color_discrete_sequence=["#000080"])
-            fig_14_1_2_.update_layout(xaxis_tickangle=-45,
-                                     title={
-            'x': 0.5,
-            'xanchor': 'center' 
-        },)
-            st.plotly_chart(fig_14_1_2_, use_container_width=False, key=fcty_name)
-
-    # looping through the array of 10 ten facilities based on number of combustion units owned
-    for i in range(len(col_3rd_row)):
-        # extracting the facility name
-        fcty_name = top_10_fcty_col.iloc[i+6]['FACILITY_NAME']
-
-        # plotting the bar graphs for the third row
-        with col_3rd_row[i]:
-            # extracting the combustion units for a single facility
-            grouping_1 = unit_group[fcty_name]
-            # extracting the combustion units and their corresponding counts
-            x_3, y_3 = grouping_1.index, grouping_1.values
-            # plotting the chart
-            fig_14_1_3_ = px.bar(x=x_3, y=y_3, 
-                      title=fcty_name,
-                        labels={'x': 'Unit Type',
-                           'y': 'Count'}, height=500,
-                           color_discrete_sequence=["#000080"])
-            fig_14_1_3_.update_layout(xaxis_tickangle=-45,
-                                     title={
-            'x': 0.5,
-            'xanchor': 'center'
-        },)
-            st.plotly_chart(fig_14_1_3_, use_container_width=False, key=fcty_name)
-    
-    # looping through the array of 10 ten facilities based on number of combustion units owned
-    for i in range(len(col_bottom_row)):
-        fcty_name = top_10_fcty_col.iloc[i+9]['FACILITY_NAME']
-
-        # plotting the bar graphs for the bottom row
-        with col_bottom_row[i]:
-            # extracting the facility name
-            grouping_1 = unit_group[fcty_name]
-            # extracting the combustion units and their corresponding counts
-            x_4, y_4 = grouping_1.index, grouping_1.values
-            # plotting the chart
-            fig_14_1_4_ = px.bar(x=x_4, y=y_4, 
-                      title=fcty_name,
-                        labels={'x': 'Unit Type',
-                           'y': 'Count'}, height=500, width=400,
-                           color_discrete_sequence=["#000080"])
-            fig_14_1_4_.update_layout(xaxis_tickangle=-45,
-                                     title={
-            'x': 0.5,  
-            'xanchor': 'center' 
-        },)
-            st.plotly_chart(fig_14_1_4_, use_container_width=False, key=fcty_name)
+    # plotting the combustion unit types of each of the top 10 facilities
+    show_plotly_chart(figures['fig_14_2'], use_container_width=True)
     
     # content for Question 3 - second part  
     st.write("""
@@ -871,52 +624,14 @@ elif page == "Key Insights":
     st.subheader("4. What are the average and total \
                  combustion energy consumption by MECS region?")
    
-    # extracting MMBtu_TOTAL values by MECS_Region and calculating the sum for each region
-    tot_energy_mecs = cleaned_df.groupby('MECS_Region')[['MMBtu_TOTAL']].sum()
-
-    # extract MMBtu_TOTAL values by MECS_Region and calculating the average for each region
-    avg_energy_mecs = cleaned_df.groupby('MECS_Region')[['MMBtu_TOTAL']].mean()
-
-
-    # extracting the MECS regions and their corresponding total energy consumed
-    x_tot_mecs, y_tot_mecs = tot_energy_mecs.index, tot_energy_mecs.values
-
-    # extracting the MECS regions and their corresponding average energy consumed
-    x_avg_mecs, y_avg_mecs = avg_energy_mecs.index, avg_energy_mecs.values
-
-    # converting 2-D array to 1-D array to allow for plotting 
-    y_tot_mecs_conv, y_avg_mecs_conv = y_tot_mecs.flatten(), y_avg_mecs.flatten()
-
     # splitting the section into 2 columns - one for each graph
     col_mecs_tot, col_mecs_avg = st.columns(2)
 
-    # plotting the first bar graph for the total combustion energy consumption for the regions
+    # plotting the bar graphs for the total and average combustion energy consumption for the regions
     with col_mecs_tot:
-        fig_15_1 = px.bar(x=x_tot_mecs, y=y_tot_mecs_conv, 
-                      title="Total MMBtu consumed by MECS Region",
-                        labels={'x': 'MECS Region',
-                           'y': 'Total amount of energy consumed (MMBtu)'},
-                           color_discrete_sequence=['#008080'], height=500)
-        fig_15_1.update_layout(xaxis_tickangle=-45,
-                                     title={
-            'x': 0.5,  
-            'xanchor': 'center'
-        },)
-        st.plotly_chart(fig_15_1, use_container_width=False)
-    
-    # plotting the second bar graph for the average combustion energy consumption for the regions
+        show_plotly_chart(figures['fig_15_1'], use_container_width=False)
     with col_mecs_avg:
-        fig_15_2 = px.bar(x=x_avg_mecs, y=y_avg_mecs_conv, 
-                      title="Average MMBtu consumed by MECS Region",
-                        labels={'x': 'MECS Region',
-                           'y': 'Average amount of energy consumed (MMBtu)'}, 
-                           color_discrete_sequence=['#8C5DAF'], height=500)
-        fig_15_2.update_layout(xaxis_tickangle=-45,
-                                     title={
-            'x': 0.5,
-            'xanchor': 'center'
-        },)
-        st.plotly_chart(fig_15_2, use_container_width=False)
+        show_plotly_chart(figures['fig_15_2'], use_container_width=False)
 
     # content for Question 4
     st.write("""
@@ -959,44 +674,9 @@ elif page == "Key Insights":
     # Question 5
     st.subheader("5. What are the average and total combustion energy consumption by State?")
     
-    # extracting the MMBtu_TOTAL values by STATE and calculatimg the sum for each state
-    tot_energy_state = cleaned_df.groupby('STATE')['MMBtu_TOTAL'].sum()
-
-    # extracting the MMBtu_TOTAL values by STATE and calculating the average for each state
-    avg_energy_state = cleaned_df.groupby('STATE')['MMBtu_TOTAL'].mean()
-
-    # extracting the MECS regions and their corresponding total combustion energy consumed
-    x_tot_state, y_tot_state = tot_energy_state.index, tot_energy_state.values
-
-    # extracting the MECS regions and their corresponding average combustion energy consumed
-    x_avg_state, y_avg_state = avg_energy_state.index, avg_energy_state.values
-
-    # converting 2-D array to 1-D array to allow for plotting 
-    y_tot_state_conv, y_avg_state_conv = y_tot_state.flatten(), y_avg_state.flatten()
-
-    # plotting the bar graph of total combustion energy consumption for the different states
-    fig_16_1 = px.bar(x=x_tot_state, y=y_tot_state_conv, 
-                      title="Total MMBtu consumed by State",
-                        labels={'x': 'State',
-                           'y': 'Total amount of energy consumed (MMBtu)'},
-                           color_discrete_sequence=['#4B0082'], height=500)
-    fig_16_1.update_layout(title={
-            'x': 0.5,
-            'xanchor': 'center'
-        },)
-    st.plotly_chart(fig_16_1, use_container_width=False)
-    
-    # plotting the bar graph of average combustion energy consumption for the different states
-    fig_16_2 = px.bar(x=x_avg_state, y=y_avg_state_conv, 
-                      title="Average MMBtu consumed by State",
-                        labels={'x': 'State',
-                           'y': 'Average amount of energy consumed (MMBtu)'}, 
-                           color_discrete_sequence=['#C41E3A'], height=500)
-    fig_16_2.update_layout(title={
-            'x': 0.5, 
-            'xanchor': 'center' 
-        })
-    st.plotly_chart(fig_16_2, use_container_width=False)
+    # plotting the bar graphs of total and average combustion energy consumption for the different states
+    show_plotly_chart(figures['fig_16_1'], use_container_width=False)
+    show_plotly_chart(figures['fig_16_2'], use_container_width=False)
 
     # content for Question 5
     st.write("""
@@ -1031,29 +711,29 @@ elif page == "Key Insights":
                  energy consumption based on the North American Industry \
                  Classification System (NAICS)?")
     
-    # extracting the industries in reference to NAICS, ranking them based on total combustion energy usage and selecting the top 10
-    energy_cons_naics = cleaned_df.groupby('PRIMARY_NAICS_TITLE')[['MMBtu_TOTAL']] \
-                                    .sum() \
-                                    .sort_values(by='MMBtu_TOTAL', ascending=False) \
-                                    .head(10)
-
-    # extracting the top 10 industries and their corresponding counts
-    x_energy_cons_naics, y_energy_cons_naics = energy_cons_naics.index,energy_cons_naics.values
-
-    # converting the 2-D array to 1-D array to allow for plotting 
-    y_energy_cons_naics_conv = y_energy_cons_naics.flatten()    
-    
     # plotting the bar graph for the top 10 industries
-    fig_17 = px.bar(x=x_energy_cons_naics, y=y_energy_cons_naics_conv, 
-                      title='Top 10 NAICS Industries based on combustion energy consumption',
-                        labels={'x':'NAICS Title',
-                           'y': 'Total amount of energy consumed (MMBtu)'}, height=800,
-                           color_discrete_sequence=["#151B54"])
-    fig_17.update_layout(xaxis_tickangle=-45, title={
-            'x': 0.5,
-            'xanchor': 'center'
-        })
-    st.plotly_chart(fig_17, use_container_width=False)
+    show_plotly_chart(figures['fig_17'], use_container_width=False)
+
+    # drilling from the NAICS sectors down to the industries, reading every level from the stored roll-up tree
+    st.write("**Drilling down the NAICS hierarchy**")
+    if filter_key:
+        st.caption("The NAICS drill-down shows the whole dataset.")
+    naics_tree = load_key_insights_aggregates(dataset_fingerprint())['naics_tree']
+    naics_path = []
+    naics_level, naics_code = None, None
+    naics_cols = st.columns(len(NAICS_LEVELS) - 1)
+    for naics_col, level in zip(naics_cols, NAICS_LEVELS[:-1]):
+        level_nodes = naics_children(naics_tree, naics_level, naics_code)
+        with naics_col:
+            choice = st.selectbox(NAICS_LEVEL_NAMES[level], ["All"] + list(level_nodes.index), key=f"naics_{level}",
+                                  format_func=lambda code, nodes=level_nodes: code if code == "All" else
+                                  f"{code} · {nodes.loc[code, 'title']}")
+        if choice == "All":
+            break
+        naics_path.append(choice)
+        naics_level, naics_code = level, choice
+    show_plotly_chart(naics_level_figure(naics_children(naics_tree, naics_level, naics_code), naics_path),
+                      use_container_width=True, key='naics_drill_down')
 
     # content for Question 6
     st.write("""
@@ -1083,30 +763,8 @@ elif page == "Key Insights":
     st.subheader("7. What Industry Groups are the major contributors to combustion \
                  energy consumption?")
 
-    # extracting the industry groups, ranking them based on total combustion energy usage and selecting the top 10
-    energy_cons_grp = cleaned_df.groupby('GROUPING')[['MMBtu_TOTAL']] \
-                                    .sum() \
-                                    .sort_values(by='MMBtu_TOTAL', ascending=False) \
-                                    .head(10)
-
-    # extracting the top 10 industry groups and their corresponding counts
-    x_energy_grp, y_energy_grp = energy_cons_grp.index, energy_cons_grp.values
-
-    # converting the 2-D array to 1-D array to allow for plotting 
-    y_energy_grp_conv = y_energy_grp.flatten()    
-    
     # plotting the bar graph for the top 10 industry groups
-    fig_18 = px.bar(x=x_energy_grp, y=y_energy_grp_conv, 
-                      title='Top 10 Industry Groups based on combustion energy consumption',
-                        labels={'x':'Group',
-                           'y': 'Total amount of energy consumed (MMBtu)'}, 
-                           color_discrete_sequence=['#c21807'],
-                             height=800)
-    fig_18.update_layout(xaxis_tickangle=-45, title={
-            'x': 0.5, 
-            'xanchor': 'center'
-        })
-    st.plotly_chart(fig_18, use_container_width=False)
+    show_plotly_chart(figures['fig_18'], use_container_width=False)
 
     # content for Question 7
     st.write("""
@@ -1146,46 +804,9 @@ elif page == "Key Insights":
     # Question 8
     st.subheader("8. Across industry groups, what is the distribution of combustion units for cogeneration versus non-cogeneration use?")
 
-    # extracting the industry groups based on units used for cogeneration
-    cogen_grp_yes = cleaned_df.groupby('COGENERATION_UNIT_EMISS_IND')['GROUPING'] \
-                            .value_counts()['Yes']
-
-    # extracting the industry groups based on units not used for cogeneration
-    cogen_grp_no = cleaned_df.groupby('COGENERATION_UNIT_EMISS_IND')['GROUPING'] \
-                            .value_counts()['No']    
-
-    
-    # extracting the industry groups and their corresponding counts
-    x_cogen_grp_yes, y_cogen_grp_yes = cogen_grp_yes.index, cogen_grp_yes.values
-    
-    # extracting the industry groups and their corresponding counts
-    x_cogen_grp_no, y_cogen_grp_no = cogen_grp_no.index, cogen_grp_no.values
-    
-    # plotting the bar graph for the first group (units used for cogeneration)
-    fig_19_1 = px.bar(x=x_cogen_grp_yes, y=y_cogen_grp_yes, 
-                      title='Distribution of Combustion Units Used For Cogeneration',
-                        labels={'x':'Industry Group',
-                           'y': 'No. of combustion units'}, 
-                           color_discrete_sequence=['#ff6e00'],
-                             height=800)
-    fig_19_1.update_layout(xaxis_tickangle=-45, title={
-            'x': 0.5,
-            'xanchor': 'center'
-        })
-    st.plotly_chart(fig_19_1, use_container_width=False)
-
-    # plotting the bar graph for the second group (units not used for cogeneration)
-    fig_19_2 = px.bar(x=x_cogen_grp_no, y=y_cogen_grp_no, 
-                      title='Distribution of Combustion Units Not Used For Cogeneration',
-                        labels={'x':'Industry Group',
-                           'y': 'No. of combustion units'}, 
-                           color_discrete_sequence=["#a1195d"],
-                            height=800)
-    fig_19_2.update_layout(xaxis_tickangle=-45, title={
-            'x': 0.5, 
-            'xanchor': 'center'
-        })
-    st.plotly_chart(fig_19_2, use_container_width=False)
+    # plotting the bar graphs for the units used and not used for cogeneration
+    show_plotly_chart(figures['fig_19_1'], use_container_width=False)
+    show_plotly_chart(figures['fig_19_2'], use_container_width=False)
 
     # content for Question 8
     st.write("""
@@ -1229,6 +850,139 @@ elif page == "Key Insights":
              for trade. 
     """)
 
+# setting up the Facility Map page
+elif page == "Facility Map":
+    # getting the facilities (one row per facility) and their tile index, built once per dataset version
+    with timed_stage('spatial_index'):
+        facilities, tile_index = load_spatial_index(dataset_fingerprint())
+
+    # the facility map header
+    st.header("Facility Map 🗺️")
+    st.write("""
+    The map shows where the combustion energy is used. Rather than one marker per combustion unit, 
+             the facilities are grouped into map tiles: every bubble is one tile, sized by the total energy 
+             use of its facilities and coloured by their number of combustion units. Choose a state to 
+             zoom in, and a higher tile zoom level for smaller tiles.
+    """)
+
+    # choosing the area in view and the tile zoom level, fitted to the area unless changed
+    col_area, col_zoom = st.columns(2)
+    with col_area:
+        area = st.selectbox("Area", ["All facilities"] + sorted(facilities['STATE'].unique()), key="map_area")
+    bounds = area_bounds(facilities, None if area == "All facilities" else area)
+    with col_zoom:
+        zoom = st.select_slider("Tile zoom level", TILE_ZOOM_LEVELS, value=zoom_for_bounds(bounds),
+                                key=f"map_zoom_{area}")
+
+    # reading only the tiles and facilities inside the area
+    with timed_stage('map_query'):
+        visible_tiles = query_tiles(tile_index, zoom, bounds)
+        visible_facilities = query_facilities(facilities, bounds)
+    col_facilities, col_tiles, col_units = st.columns(3)
+    col_facilities.metric("Facilities in view", f"{len(visible_facilities):,}")
+    col_tiles.metric("Map tiles drawn", f"{len(visible_tiles):,}")
+    col_units.metric("Combustion units in view", f"{visible_facilities['units'].sum():,}")
+
+    with timed_stage('page_figures'):
+        map_fig = load_map_figure(dataset_fingerprint(), area, zoom)
+    show_plotly_chart(map_fig, use_container_width=True, key='facility_map')
+    unlocated_units = len(cleaned_df) - facilities['units'].sum()
+    if unlocated_units:
+        st.caption(f"{unlocated_units:,} combustion units have no coordinates and are not shown on the map.")
+
+    # listing the facilities of the area using the most energy
+    st.subheader("Facilities in view with the highest combustion energy use")
+    st.dataframe(visible_facilities.nlargest(10, 'MMBtu_TOTAL')[['FACILITY_NAME', 'STATE', 'units', 'MMBtu_TOTAL']]
+                 .rename(columns={'FACILITY_NAME': 'Facility', 'STATE': 'State', 'units': 'Combustion units',
+                                  'MMBtu_TOTAL': 'Total energy use (MMBtu)'}), hide_index=True)
+
+    # the radius query subsection
+    st.subheader("Combustion energy use near a facility 📍")
+    st.write("Choose a facility and a distance to total the combustion energy used by every facility within it.")
+    geo_index = load_geo_index(dataset_fingerprint())
+    located = geo_index['facilities']
+    col_plant, col_radius = st.columns(2)
+    with col_plant:
+        plant_position = st.selectbox("Facility", range(len(located)), key="radius_facility",
+                                      format_func=geo_index['labels'].__getitem__)
+    with col_radius:
+        radius = st.slider("Distance (miles)", min_value=5, max_value=250, value=50, step=5, key="radius_miles")
+
+    # querying the tree for the facilities and the energy use by fuel type within the distance
+    from combustion_analytics.geo_query import facilities_within_radius, energy_within_radius # for the radius queries
+    plant = located.iloc[plant_position]
+    with timed_stage('radius_query'):
+        nearby_facilities = facilities_within_radius(geo_index, plant['LATITUDE'], plant['LONGITUDE'], radius)
+        nearby_energy = energy_within_radius(geo_index, plant['LATITUDE'], plant['LONGITUDE'], radius)
+    col_nearby, col_nearby_units, col_nearby_energy = st.columns(3)
+    col_nearby.metric("Facilities within the distance", f"{len(nearby_facilities):,}")
+    col_nearby_units.metric("Combustion units", f"{nearby_facilities['units'].sum():,}")
+    col_nearby_energy.metric("Total energy use (MMBtu)", f"{nearby_energy.sum():,.0f}")
+    show_plotly_chart(nearby_fuel_energy_figure(nearby_energy, radius), use_container_width=True, key='nearby_fuel_energy')
+    # listing the nearest facilities, the chosen facility first
+    st.dataframe(nearby_facilities.head(20)[['FACILITY_NAME', 'STATE', 'distance', 'units', 'MMBtu_TOTAL']]
+                 .rename(columns={'FACILITY_NAME': 'Facility', 'STATE': 'State', 'distance': 'Distance (miles)',
+                                  'units': 'Combustion units', 'MMBtu_TOTAL': 'Total energy use (MMBtu)'})
+                 .round({'Distance (miles)': 1}), hide_index=True)
+
+    # the county map subsection, drawn from the county aggregates stored with the Key Insights aggregates
+    st.subheader("Combustion energy use by county 🗾")
+    county_measure = st.radio("Colour the counties by", list(COUNTY_MEASURE_LABELS), horizontal=True,
+                              format_func=COUNTY_MEASURE_LABELS.get, key="county_measure")
+    with timed_stage('page_figures'):
+        county_fig = load_county_figure(dataset_fingerprint(), county_measure)
+    show_plotly_chart(county_fig, use_container_width=True, key='county_map')
+    st.caption("Hover over a county for its combustion units, total and average energy use and main fuel type.")
+
+# setting up the Facility Search page
+elif page == "Facility Search":
+    # getting the facility name index and unit slices, built once per dataset version
+    with timed_stage('facility_search_index'):
+        search_index = load_facility_search_index(dataset_fingerprint())
+
+    # the facility search header
+    st.header("Facility Search 🔎")
+    st.write("""
+    Search the facilities by name: every word typed is matched against the start of the words of the 
+             facility names, and close spellings are matched too. Choose a facility to see its 
+             combustion units, fuel types and energy use.
+    """)
+    query = st.text_input("Facility name", key="facility_query", placeholder="e.g. refinery")
+
+    # searching the name index, listing the facilities using the most energy until something is typed
+    with timed_stage('facility_search'):
+        matches = search_facilities(search_index, query) if query.strip() else \
+            search_index['facilities'].head(SEARCH_LIMIT)
+    if matches.empty:
+        st.info("No facility name matches the search.")
+    else:
+        st.caption(f"{len(matches)} matching facilities" if query.strip() else
+                   f"The {len(matches)} facilities with the highest combustion energy use")
+        facility_position = st.selectbox("Facility", list(matches.index), key="facility_choice",
+                                         format_func=search_index['labels'].__getitem__)
+
+        # reading the chosen facility's units from its precomputed slice
+        facility = search_index['facilities'].iloc[facility_position]
+        with timed_stage('facility_drill_down'):
+            units = facility_units(search_index, facility_position)
+            fuel_summary = facility_fuel_summary(units)
+        st.subheader(f"{facility['FACILITY_NAME']} ({facility['STATE']})")
+        col_units, col_fuels, col_energy = st.columns(3)
+        col_units.metric("Combustion units", f"{facility['units']:,}")
+        col_fuels.metric("Fuel types", f"{len(fuel_summary):,}")
+        col_energy.metric("Total energy use (MMBtu)", f"{facility['MMBtu_TOTAL']:,.0f}")
+
+        show_plotly_chart(facility_drill_down_figure(units, facility['FACILITY_NAME']), use_container_width=True,
+                          key='facility_drill_down')
+        # listing the energy use per fuel type, then every unit of the facility
+        st.dataframe(fuel_summary.rename(columns={'units': 'Combustion units', 'MMBtu_TOTAL': 'Total energy use (MMBtu)'})
+                     .rename_axis('Fuel Type'))
+        st.dataframe(units.sort_values('MMBtu_TOTAL', ascending=False)
+                     .rename(columns={'UNIT_NAME': 'Unit', 'UNIT_TYPE': 'Unit Type', 'FUEL_TYPE': 'Fuel Type',
+                                      'COGENERATION_UNIT_EMISS_IND': 'Used for Cogeneration',
+                                      'MMBtu_TOTAL': 'Energy use (MMBtu)', 'GWht_TOTAL': 'Energy use (GWht)'}),
+                     hide_index=True)
+
 # setting up the Conclusions and Recommendations page
 elif page == "Conclusion and Recommendations":
     # the conclusion subsection
@@ -1318,4 +1072,23 @@ elif page == "References":
     - U.S. Census Bureau. (2017). North American Industry Classification System (NAICS). U.S. Department of Commerce. Retrieved September 16, 2025, from https://www.census.gov/naics/ 
     - U.S. Energy Information Administration (EIA). (2014). Manufacturing Energy Consumption Survey (MECS): Detailed combustion energy data and fuel use in industrial facilities. U.S. Department of Energy. Retrieved September 11, 2025, from https://www.eia.gov/consumption/manufacturing/    
     - Union Carbide Corporation. (2024). St Charles Operations petrochemical facility. Dow Inc. subsidiary information.Retrieved September 21, 2025, from https://corporate.dow.com/en-us/locations/texas-city.html 
-                """)
\ No newline at end of file
+                """)
+
+
+# showing the rerun profile in the sidebar and writing its structured log line
+if rerun_profile:
+    rerun_summary = finish_rerun_profile(rerun_profile)
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("Rerun profile ⏱️")
+    st.sidebar.metric("Script rerun", f"{rerun_summary['total_ms']:,.0f} ms")
+    st.sidebar.dataframe(pd.DataFrame(rerun_summary['stages'], columns=['stage', 'offset_ms', 'ms']), hide_index=True)
+    if rerun_summary['figures']:
+        st.sidebar.write(f"Figure payloads: {rerun_summary['figure_bytes'] / 2**10:,.0f} KiB "
+                         f"across {len(rerun_summary['figures'])} charts")
+        st.sidebar.dataframe(pd.DataFrame(rerun_summary['figures']), hide_index=True)
+    # showing the footprint of the cleaned dataset shared by every session, per column
+    cleaned_memory = memory_report(cleaned_df)
+    st.sidebar.write(f"Cleaned dataset in memory: {cleaned_memory['bytes'].sum() / 2**20:,.1f} MiB")
+    st.sidebar.dataframe(cleaned_memory[['dtype', 'distinct', 'bytes']])
+    if rerun_summary['profile_path']:
+        st.sidebar.write(f"cProfile dump: `{rerun_summary['profile_path']}`")
@@ -0,0 +1,21 @@
+# the headless analytics layer shared by the analysis notebook and the Streamlit app
+# (only pandas/numpy/pyarrow are imported here; the Plotly figure builders live in
+# combustion_analytics.page_figures and combustion_analytics.chart_builders, and the scikit-learn/scipy
+# radius queries in combustion_analytics.geo_query, imported only where they are used)
+from .prepared_dataset import (PREPARED_DATASET_VERSION, DATASET_PATHS, DROPPED_COLUMNS, COGENERATION_LABELS,
+                               resolve_dataset_path, dataset_fingerprint, load_combustion__energy_dataset,
+                               transform_combustion_dataset, clean_combustion_dataset, build_prepared_dataset,
+                               prepared_dataset_view)
+from .columnar_store import COLUMNAR_SCHEMA, LOCATION_COLUMNS, OPTIONAL_COLUMNS, ingest_csv_dataset, load_columnar_dataset, summarise_raw_dataset, \
+    memory_report, concat_shared_dictionary
+from .aggregate_store import TOP_N, dataset_hash, top_n_per_group, county_fips_codes, build_key_insights_aggregates, \
+    load_or_build_aggregates
+from .chart_reducers import SCATTER_POINT_BUDGET, reduce_scatter, box_statistics, histogram_counts
+from .yearly_store import register_dataset_files, available_years, load_yearly_dataset, yearly_energy_aggregates
+from .data_quality import quality_profile, schema_drift
+from .energy_cube import build_energy_cube, build_facility_table, filter_state, slice_cube, slice_energy_cube, rollup, \
+    cube_key_insights_aggregates
+from .spatial_index import TILE_ZOOM_LEVELS, facility_locations, facility_labels, build_tile_index, query_tiles, \
+    query_facilities
+from .facility_search import build_facility_search_index, search_facilities, facility_units, facility_fuel_summary
+from .naics_hierarchy import NAICS_LEVELS, NAICS_LEVEL_NAMES, build_naics_tree, naics_children
@@ -0,0 +1,200 @@
+# importing the required libraries
+import glob # for listing the superseded stored aggregates
+import hashlib # for hashing the dataset file contents
+import os # for file system paths
+import pickle # for persisting the aggregates in a compact binary form
+import pandas as pd # for data manipulation and analysis with DataFrames
+from .rerun_profile import timed_stage # for timing every aggregation when profiling is on
+from .naics_hierarchy import build_naics_tree # for the NAICS roll-up tree
+from .prepared_dataset import PREPARED_DATASET_VERSION # for keying the aggregates on the cleaning steps they are built after
+
+
+# bumping this value invalidates every stored aggregate (e.g. after adding or changing an aggregation)
+AGGREGATE_STORE_VERSION = 7
+
+# the number of bars shown in the Key Insights top-N charts
+TOP_N = 10
+
+
+# helper function for hashing the dataset contents in fixed-size chunks
+def dataset_hash(dataset_path, chunk_size=1 << 20):
+    hasher = hashlib.sha256()
+    with open(dataset_path, 'rb') as dataset_file:
+        for chunk in iter(lambda: dataset_file.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()[:16]
+
+
+# helper function for locating the stored aggregates of a dataset, kept in a folder next to the dataset itself
+# (keyed on the aggregation and cleaning versions too, as either changes the aggregates of the same raw bytes)
+def aggregate_store_path(dataset_path, data_hash):
+    store_dir = os.path.join(os.path.dirname(os.path.abspath(dataset_path)), 'aggregate_store')
+    return os.path.join(store_dir, f"key_insights_v{AGGREGATE_STORE_VERSION}_p{PREPARED_DATASET_VERSION}_{data_hash}.pkl")
+
+
+# helper function for removing the stored aggregates superseded by the one just written (older versions or contents)
+def remove_superseded_aggregates(store_path):
+    for other_path in glob.glob(os.path.join(os.path.dirname(store_path), 'key_insights_*.pkl')):
+        if other_path != store_path:
+            try:
+                os.remove(other_path)
+            except OSError:
+                pass
+
+
+# helper function for ranking the values of one column within every group of another column in a single pass
+# (grouping by both columns at once, then keeping the first n rows of each group after one global sort)
+def top_n_per_group(df, group_col, value_col, n=TOP_N):
+    group_counts = df.groupby([group_col, value_col], observed=True) \
+            .size() \
+            .sort_values(ascending=False, kind='stable')
+    return group_counts.groupby(level=0, observed=True, sort=False).head(n)
+
+
+# helper function for ranking the fuel types used by combustion units within every MECS region (Question 1)
+def region_fuel_aggregates(cleaned_df, top_n=TOP_N):
+    return {'region_fuel_top': top_n_per_group(cleaned_df, 'MECS_Region', 'FUEL_TYPE', top_n)}
+
+
+# helper function for ranking the industrial facilities based on total combustion energy usage (Question 2)
+def facility_energy_aggregates(cleaned_df, top_n=TOP_N):
+    return {'facility_energy_top': cleaned_df.groupby('FACILITY_NAME', observed=True)['MMBtu_TOTAL'] \
+            .sum() \
+            .sort_values(ascending=False) \
+            .head(top_n)}
+
+
+# helper function for ranking the facilities based on the number of combustion units owned (Question 3)
+def facility_units_aggregates(cleaned_df, top_n=TOP_N):
+    facility_units_top = cleaned_df['FACILITY_NAME'] \
+            .value_counts() \
+            .sort_values(ascending=False) \
+            .head(top_n)
+
+    # cross-tabulating the combustion unit types of the top facilities only, restricting the rows before counting
+    top_facility_rows = cleaned_df.loc[cleaned_df['FACILITY_NAME'].isin(facility_units_top.index)]
+    top_facility_names = top_facility_rows['FACILITY_NAME']
+    # dropping the other facilities' categories when the frame is dictionary-encoded (the notebook's frame is not)
+    if isinstance(top_facility_names.dtype, pd.CategoricalDtype):
+        top_facility_names = top_facility_names.cat.remove_unused_categories()
+    unit_type_crosstab = pd.crosstab(top_facility_names, top_facility_rows['UNIT_TYPE']) \
+            .reindex(facility_units_top.index, fill_value=0)
+    return {'facility_units_top': facility_units_top,
+            'facility_unit_type_crosstab': unit_type_crosstab.loc[:, unit_type_crosstab.sum() > 0]}
+
+
+# helper function for calculating the total and average energy consumption for each region (Question 4)
+def region_energy_aggregates(cleaned_df, top_n=TOP_N):
+    region_energy = cleaned_df.groupby('MECS_Region', observed=True)['MMBtu_TOTAL'].agg(['sum', 'mean'])
+    return {'region_energy_total': region_energy['sum'], 'region_energy_mean': region_energy['mean']}
+
+
+# helper function for calculating the total and average energy consumption for each state (Question 5)
+def state_energy_aggregates(cleaned_df, top_n=TOP_N):
+    state_energy = cleaned_df.groupby('STATE', observed=True)['MMBtu_TOTAL'].agg(['sum', 'mean'])
+    return {'state_energy_total': state_energy['sum'], 'state_energy_mean': state_energy['mean']}
+
+
+# helper function for ranking the industries in reference to NAICS based on total combustion energy usage (Question 6)
+def naics_energy_aggregates(cleaned_df, top_n=TOP_N):
+    return {'naics_energy_top': cleaned_df.groupby('PRIMARY_NAICS_TITLE', observed=True)['MMBtu_TOTAL'] \
+            .sum() \
+            .sort_values(ascending=False) \
+            .head(top_n)}
+
+
+# helper function for ranking the industry groups based on total combustion energy usage (Question 7)
+def grouping_energy_aggregates(cleaned_df, top_n=TOP_N):
+    return {'grouping_energy_top': cleaned_df.groupby('GROUPING', observed=True)['MMBtu_TOTAL'] \
+            .sum() \
+            .sort_values(ascending=False) \
+            .head(top_n)}
+
+
+# helper function for counting the industry groups' units used and not used for cogeneration (Question 8)
+def cogen_grouping_aggregates(cleaned_df, top_n=TOP_N):
+    return {'cogen_grouping_counts': cleaned_df.groupby('COGENERATION_UNIT_EMISS_IND', observed=True)['GROUPING'] \
+            .value_counts() \
+            .loc[lambda counts: counts > 0]}
+
+
+# helper function for turning the COUNTY_FIPS column into the 5-digit county codes the county map is keyed on
+def county_fips_codes(county_fips):
+    return county_fips.astype('Int64').astype('string').str.zfill(5).rename('COUNTY_FIPS')
+
+
+# helper function for the total and mean energy use and the fuel mix of every county (Facility Map),
+# precomputed once so the county map never groups the rows per request
+def county_energy_aggregates(cleaned_df, top_n=TOP_N):
+    county_codes = county_fips_codes(cleaned_df['COUNTY_FIPS'])
+    # the MMBtu of every fuel type per county (units without a county are left out of the map)
+    county_fuel_mix = cleaned_df.groupby([county_codes, cleaned_df['FUEL_TYPE']], observed=True)['MMBtu_TOTAL'] \
+            .sum() \
+            .unstack(fill_value=0.0)
+    county_energy = cleaned_df.groupby(county_codes) \
+            .agg(COUNTY=('COUNTY', 'first'), STATE=('STATE', 'first'), units=('MMBtu_TOTAL', 'size'),
+                 MMBtu_TOTAL=('MMBtu_TOTAL', 'sum'))
+    county_energy['MMBtu_mean'] = county_energy['MMBtu_TOTAL'] / county_energy['units']
+    # naming the fuel type using the most energy in every county, with its share of the county's energy use
+    county_energy['main_fuel'] = county_fuel_mix.idxmax(axis=1)
+    county_energy['main_fuel_share'] = county_fuel_mix.max(axis=1) / county_fuel_mix.sum(axis=1)
+    return {'county_energy': county_energy, 'county_fuel_mix': county_fuel_mix}
+
+
+# helper function for the NAICS roll-up tree drilled into below Question 6, stored so it is built once per dataset
+def naics_hierarchy_aggregates(cleaned_df, top_n=TOP_N):
+    return {'naics_tree': build_naics_tree(cleaned_df)}
+
+
+# the stored aggregations: one per Key Insights question in page order, then the NAICS roll-up and the county
+# aggregates of the Facility Map (also timed one by one by the benchmark suite)
+KEY_INSIGHTS_AGGREGATIONS = {
+    'region_fuel': region_fuel_aggregates,
+    'facility_energy': facility_energy_aggregates,
+    'facility_units': facility_units_aggregates,
+    'region_energy': region_energy_aggregates,
+    'state_energy': state_energy_aggregates,
+    'naics_energy': naics_energy_aggregates,
+    'grouping_energy': grouping_energy_aggregates,
+    'cogen_grouping': cogen_grouping_aggregates,
+    'naics_hierarchy': naics_hierarchy_aggregates,
+    'county_energy': county_energy_aggregates,
+}
+
+
+# helper function for computing every Key Insights aggregation in one build step
+def build_key_insights_aggregates(cleaned_df, top_n=TOP_N):
+    aggregates = {}
+    for aggregation_name, aggregation in KEY_INSIGHTS_AGGREGATIONS.items():
+        with timed_stage(f"aggregate:{aggregation_name}"):
+            aggregates.update(aggregation(cleaned_df, top_n))
+    return aggregates
+
+
+# helper function for reading the stored aggregates, building and persisting them when missing or stale
+def load_or_build_aggregates(cleaned_df, dataset_path, data_hash=None):
+    data_hash = data_hash or dataset_hash(dataset_path)
+    store_path = aggregate_store_path(dataset_path, data_hash)
+
+    # reading the aggregates straight from the store when this dataset was already processed
+    try:
+        with open(store_path, 'rb') as store_file:
+            return pickle.load(store_file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+
+    aggregates = build_key_insights_aggregates(cleaned_df)
+
+    # writing to a temporary file first so concurrent workers never read a partial store
+    try:
+        os.makedirs(os.path.dirname(store_path), exist_ok=True)
+        tmp_path = f"{store_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as store_file:
+            pickle.dump(aggregates, store_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, store_path)
+        remove_superseded_aggregates(store_path)
+    except OSError:
+        # a read-only deployment still gets the in-memory aggregates
+        pass
+
+    return aggregates
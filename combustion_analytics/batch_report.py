@@ -0,0 +1,170 @@
+# importing the required libraries
+import argparse # for reading the report options from the command line
+import importlib.util # for checking whether a static image renderer is installed
+import json # for writing the report manifest
+import os # for file system paths and the number of CPUs
+import time # for timing every build and render step
+from concurrent.futures import ProcessPoolExecutor, as_completed # for building and rendering the figures in parallel
+from .prepared_dataset import build_prepared_dataset, resolve_dataset_path # for the cleaned dataset
+from .aggregate_store import load_or_build_aggregates # for the precomputed Key Insights aggregates
+from .chart_reducers import box_statistics, histogram_counts # for shrinking chart payloads before plotting
+from .page_figures import DATASET_EXPLORATION_FIGURES, KEY_INSIGHTS_FIGURES, dataset_exploration_inputs # for building each figure on its own
+
+
+# the folder the report artifacts are written to by default
+DEFAULT_REPORT_DIR = "reports"
+
+# the output formats a report can contain ('png' needs a local static image renderer such as kaleido)
+REPORT_FORMATS = ['html', 'json', 'png']
+
+# the figure builders of every page in the report, keyed by page and figure id
+PAGE_FIGURE_BUILDERS = {"Dataset Exploration": DATASET_EXPLORATION_FIGURES, "Key Insights": KEY_INSIGHTS_FIGURES}
+
+# the inputs of every page, set once in each worker process by the pool initializer
+worker_page_inputs = {}
+
+
+# helper function for checking whether Plotly can export static images in this environment
+def static_images_available():
+    return importlib.util.find_spec('kaleido') is not None
+
+
+# helper function for preparing the inputs of both pages from the shared dataset and aggregates (the data steps, run
+# once in the parent), returning the inputs keyed by page and the preparation time of every step
+def build_report_inputs(dataset_path=None, hist_scale='linear', scatter_reduction='lttb'):
+    dataset_path = dataset_path or resolve_dataset_path()
+    page_inputs, build_seconds = {}, {}
+
+    started = time.perf_counter()
+    cleaned_df = build_prepared_dataset(dataset_path)[2]
+    build_seconds['prepared_dataset'] = time.perf_counter() - started
+
+    # preparing the Dataset Exploration inputs from the same precomputed statistics as the app
+    started = time.perf_counter()
+    box_stats_dt = {category_col: box_statistics(cleaned_df, category_col, 'MMBtu_TOTAL')
+                    for category_col in ['FUEL_TYPE', 'UNIT_TYPE', 'GROUPING']}
+    hist_counts_dt = {value_col: histogram_counts(cleaned_df[value_col], nbins=20, scale=hist_scale)
+                      for value_col in ['MMBtu_TOTAL', 'GWht_TOTAL']}
+    page_inputs["Dataset Exploration"] = dataset_exploration_inputs(cleaned_df, box_stats_dt, hist_counts_dt,
+                                                                    hist_scale=hist_scale,
+                                                                    scatter_reduction=scatter_reduction)
+    build_seconds["Dataset Exploration"] = time.perf_counter() - started
+
+    # reading the Key Insights aggregates from the on-disk aggregate store
+    started = time.perf_counter()
+    page_inputs["Key Insights"] = load_or_build_aggregates(cleaned_df, dataset_path)
+    build_seconds["Key Insights"] = time.perf_counter() - started
+
+    return page_inputs, build_seconds
+
+
+# helper function for handing every worker process the page inputs once, rather than with every figure
+def set_worker_page_inputs(page_inputs):
+    worker_page_inputs.update(page_inputs)
+
+
+# helper function for building one figure from its page's inputs and writing it in every requested format,
+# run inside a worker process; returns one entry per written figure (a figure group, such as the per-region
+# fuel type charts, is written as one figure per member)
+def render_figure(page_name, figure_id, report_dir, formats, include_plotlyjs='cdn'):
+    started = time.perf_counter()
+    fig = PAGE_FIGURE_BUILDERS[page_name][figure_id](worker_page_inputs[page_name])
+    build_seconds = time.perf_counter() - started
+    if isinstance(fig, dict):
+        # flattening the group into one figure id per member
+        figures = {f"{figure_id}_{key.lower().replace(' ', '_')}": sub_fig for key, sub_fig in fig.items()}
+    else:
+        figures = {figure_id: fig}
+
+    rendered = []
+    for output_id, output_fig in figures.items():
+        started = time.perf_counter()
+        outputs = {}
+        for report_format in formats:
+            output_path = os.path.join(report_dir, f"{output_id}.{report_format}")
+            if report_format == 'html':
+                output_fig.write_html(output_path, include_plotlyjs=include_plotlyjs)
+            elif report_format == 'json':
+                output_fig.write_json(output_path)
+            elif report_format == 'png':
+                output_fig.write_image(output_path)
+            outputs[report_format] = {'path': output_path, 'bytes': os.path.getsize(output_path)}
+        rendered.append((output_id, output_fig.layout.title.text, outputs, build_seconds / len(figures),
+                         time.perf_counter() - started))
+    return page_name, rendered
+
+
+# helper function for building and rendering every figure with a process pool (each worker builds and writes its
+# own figures from the page inputs prepared once) and writing the manifest of outputs and timings
+def generate_report(report_dir=DEFAULT_REPORT_DIR, formats=('html', 'json'), workers=None, dataset_path=None,
+                    hist_scale='linear', scatter_reduction='lttb', include_plotlyjs='cdn'):
+    report_started = time.perf_counter()
+    dataset_path = dataset_path or resolve_dataset_path()
+    os.makedirs(report_dir, exist_ok=True)
+
+    # dropping the static images when no renderer is installed, instead of failing every worker
+    formats = list(dict.fromkeys(formats))
+    skipped_formats = []
+    if 'png' in formats and not static_images_available():
+        formats.remove('png')
+        skipped_formats.append('png')
+
+    page_inputs, build_seconds = build_report_inputs(dataset_path, hist_scale, scatter_reduction)
+    figure_tasks = [(page_name, figure_id) for page_name in page_inputs for figure_id in PAGE_FIGURE_BUILDERS[page_name]]
+
+    rendered_figures = {}
+    workers = workers or min(os.cpu_count() or 1, len(figure_tasks))
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_worker_page_inputs,
+                             initargs=(page_inputs,)) as executor:
+        futures = {executor.submit(render_figure, page_name, figure_id, report_dir, formats, include_plotlyjs):
+                   (page_name, figure_id) for page_name, figure_id in figure_tasks}
+        for future in as_completed(futures):
+            page_name, rendered = future.result()
+            rendered_figures[futures[future]] = {
+                output_id: {
+                    'page': page_name,
+                    'title': title,
+                    'outputs': outputs,
+                    'build_seconds': round(figure_build_seconds, 4),
+                    'render_seconds': round(render_seconds, 4),
+                } for output_id, title, outputs, figure_build_seconds, render_seconds in rendered}
+
+    manifest = {
+        'dataset': dataset_path,
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'formats': formats,
+        'skipped_formats': skipped_formats,
+        'workers': workers,
+        'build_seconds': {step: round(seconds, 4) for step, seconds in build_seconds.items()},
+        'total_seconds': round(time.perf_counter() - report_started, 4),
+        # listing the figures in page order rather than completion order
+        'figures': {output_id: entry for task in figure_tasks for output_id, entry in rendered_figures[task].items()},
+    }
+    with open(os.path.join(report_dir, 'manifest.json'), 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+
+# writing every figure of the app to static report artifacts from the command line, e.g.
+# python -m combustion_analytics.batch_report --formats html json png --workers 4
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render every figure of the app to HTML/JSON/PNG report artifacts.")
+    parser.add_argument("--dataset", help="path of the dataset CSV (default: the 2014 dataset in data_source)")
+    parser.add_argument("--output", default=DEFAULT_REPORT_DIR, help="folder the artifacts and manifest are written to")
+    parser.add_argument("--formats", nargs="+", choices=REPORT_FORMATS, default=['html', 'json'],
+                        help="output formats (png is skipped when no static image renderer is installed)")
+    parser.add_argument("--workers", type=int, help="number of building and rendering processes (default: one per CPU)")
+    parser.add_argument("--hist-scale", choices=['linear', 'log'], default='linear', help="histogram bin spacing")
+    parser.add_argument("--scatter-reduction", choices=['lttb', 'binned'], default='lttb',
+                        help="how the MMBtu vs GWht scatter plot is reduced")
+    parser.add_argument("--plotlyjs", choices=['cdn', 'inline'], default='cdn',
+                        help="link plotly.js from a CDN (small files) or embed it in every HTML file (offline)")
+    args = parser.parse_args()
+
+    manifest = generate_report(args.output, args.formats, args.workers, args.dataset, args.hist_scale,
+                               args.scatter_reduction, include_plotlyjs=True if args.plotlyjs == 'inline' else 'cdn')
+    slowest_id, slowest = max(manifest['figures'].items(), key=lambda item: item[1]['render_seconds'])
+    print(f"wrote {len(manifest['figures'])} figures to {args.output} in {manifest['total_seconds']:.2f}s "
+          f"(slowest: {slowest_id}, {slowest['render_seconds']:.2f}s)")
+    if manifest['skipped_formats']:
+        print(f"skipped formats without a local renderer: {', '.join(manifest['skipped_formats'])}")
@@ -0,0 +1,197 @@
+# importing the required libraries
+import argparse # for reading the benchmark options from the command line
+import json # for writing and comparing the benchmark results
+import os # for file system paths and file metadata
+import platform # for recording the Python version of a run
+import subprocess # for recording the commit a run was measured on
+import time # for timing every stage
+import tracemalloc # for measuring the peak memory allocated by every stage
+import pandas as pd # for data manipulation and analysis with DataFrames
+from .prepared_dataset import load_combustion__energy_dataset, transform_combustion_dataset, clean_combustion_dataset, \
+    resolve_dataset_path # for the cleaning steps of the app
+from .columnar_store import ingest_csv_dataset, load_columnar_dataset # for the typed, memory-mapped copy of the dataset
+from .aggregate_store import KEY_INSIGHTS_AGGREGATIONS # for timing every Key Insights aggregation on its own
+from .chart_reducers import box_statistics, histogram_counts # for the precomputed chart statistics
+from .page_figures import DATASET_EXPLORATION_FIGURES, KEY_INSIGHTS_FIGURES, dataset_exploration_inputs # for building each figure on its own
+from .synthetic_dataset import generate_synthetic_dataset # for the synthetic scaled-up datasets
+
+
+# the dataset sizes measured by default, as multiples of the source file
+BENCHMARK_SCALES = [1, 10, 100, 1000]
+
+# the folder the JSON results are written to by default
+DEFAULT_RESULTS_DIR = "benchmark_results"
+
+# whether every stage is run a second time under tracemalloc to measure its peak memory (set to False by --no-memory)
+TRACE_MEMORY = True
+
+
+# helper function for locating (and writing once) a scaled-up copy of the dataset next to the source file,
+# either appending one copy of the source at a time or generating synthetic rows from its distributions
+def scaled_dataset_path(dataset_path, scale, synthetic=False):
+    if scale == 1:
+        return dataset_path
+    benchmark_dir = os.path.join(os.path.dirname(os.path.abspath(dataset_path)), 'benchmark')
+    file_stem = os.path.splitext(os.path.basename(dataset_path))[0]
+    scaled_path = os.path.join(benchmark_dir, f"{file_stem}.{'synthetic.' if synthetic else ''}x{scale}.csv")
+    if os.path.exists(scaled_path) and os.path.getmtime(scaled_path) >= os.path.getmtime(dataset_path):
+        return scaled_path
+
+    os.makedirs(benchmark_dir, exist_ok=True)
+    if synthetic:
+        with open(dataset_path, encoding="utf-8") as dataset_file:
+            source_rows = sum(1 for _ in dataset_file) - 1
+        return generate_synthetic_dataset(scaled_path, source_rows * scale, dataset_path)
+    source_df = pd.read_csv(dataset_path, encoding="utf-8")
+    tmp_path = scaled_path + f".{os.getpid()}.tmp"
+    for copy_no in range(scale):
+        copy_df = source_df.copy()
+        # suffixing the names of every extra copy, so the facility and unit cardinalities grow with the data
+        if copy_no:
+            copy_df['FACILITY_NAME'] = copy_df['FACILITY_NAME'] + f" #{copy_no}"
+            copy_df['UNIT_NAME'] = copy_df['UNIT_NAME'] + f" #{copy_no}"
+        copy_df.to_csv(tmp_path, mode='w' if copy_no == 0 else 'a', header=copy_no == 0, index=False, encoding="utf-8")
+    os.replace(tmp_path, scaled_path)
+    return scaled_path
+
+
+# helper function for running one stage, measuring its wall time and, in a second traced run, its peak memory
+# (tracemalloc slows allocation-heavy stages by an order of magnitude, so the timed run is never traced)
+def measure_stage(stage_fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = stage_fn(*args, **kwargs)
+    stage_stats = {'seconds': round(time.perf_counter() - started, 6), 'peak_bytes': None}
+    if TRACE_MEMORY:
+        tracemalloc.start()
+        try:
+            stage_fn(*args, **kwargs)
+            stage_stats['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, stage_stats
+
+
+# helper function for measuring every stage of the app's pipeline on one dataset file
+def benchmark_dataset(dataset_path):
+    stages = {}
+
+    # loading the CSV the way the notebook does, and through the columnar store the way the app does
+    raw_df, stages['load_csv'] = measure_stage(load_combustion__energy_dataset, dataset_path)
+    rows = len(raw_df)
+    del raw_df
+    _, stages['ingest_columnar'] = measure_stage(ingest_csv_dataset, dataset_path)
+    (_, columnar_df), stages['load_columnar'] = measure_stage(load_columnar_dataset, dataset_path)
+
+    # dropping the columns and relabelling the cogeneration indicator, then dropping the rows with missing data
+    transformed_df, stages['transform'] = measure_stage(transform_combustion_dataset, columnar_df)
+    cleaned_df, stages['clean'] = measure_stage(clean_combustion_dataset, transformed_df)
+    del columnar_df, transformed_df
+
+    # timing every Key Insights aggregation on its own
+    aggregates = {}
+    for aggregation_name, aggregation in KEY_INSIGHTS_AGGREGATIONS.items():
+        question_aggregates, stages[f"aggregate:{aggregation_name}"] = measure_stage(aggregation, cleaned_df)
+        aggregates.update(question_aggregates)
+
+    # precomputing the chart statistics of the Dataset Exploration page
+    box_stats_dt, stages['box_statistics'] = measure_stage(
+        lambda: {category_col: box_statistics(cleaned_df, category_col, 'MMBtu_TOTAL')
+                 for category_col in ['FUEL_TYPE', 'UNIT_TYPE', 'GROUPING']})
+    hist_counts_dt, stages['histogram_counts'] = measure_stage(
+        lambda: {value_col: histogram_counts(cleaned_df[value_col], nbins=20)
+                 for value_col in ['MMBtu_TOTAL', 'GWht_TOTAL']})
+
+    # preparing the Dataset Exploration inputs (category counts, reduced scatter points, correlations) once
+    exploration_inputs, stages['figure_inputs'] = measure_stage(
+        dataset_exploration_inputs, cleaned_df, box_stats_dt, hist_counts_dt)
+
+    # building every figure of both pages on its own, so the results point at the slow charts
+    built_figures = {}
+    for figure_builders, inputs in [(DATASET_EXPLORATION_FIGURES, exploration_inputs), (KEY_INSIGHTS_FIGURES, aggregates)]:
+        for figure_id, figure_builder in figure_builders.items():
+            fig, stages[f"figure:{figure_id}"] = measure_stage(figure_builder, inputs)
+            # flattening a figure group (e.g. one chart per region) into one figure per member
+            built_figures.update({f"{figure_id}_{key}": sub_fig for key, sub_fig in fig.items()}
+                                 if isinstance(fig, dict) else {figure_id: fig})
+
+    # serialising every figure as the browser would receive it
+    figures = {}
+    for figure_id, fig in built_figures.items():
+        started = time.perf_counter()
+        figure_json = fig.to_json()
+        figures[figure_id] = {'bytes': len(figure_json.encode('utf-8')),
+                              'serialize_seconds': round(time.perf_counter() - started, 6)}
+
+    return {'rows': rows, 'cleaned_rows': len(cleaned_df), 'stages': stages, 'figures': figures}
+
+
+# helper function for reading the short id of the checked out commit, so results can be compared across commits
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# helper function for running the whole suite over the given scales and writing the JSON results
+def run_benchmarks(dataset_path=None, scales=BENCHMARK_SCALES, results_dir=DEFAULT_RESULTS_DIR, synthetic=False):
+    dataset_path = dataset_path or resolve_dataset_path()
+    commit = current_commit()
+    results = {
+        'commit': commit,
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'dataset': dataset_path,
+        'trace_memory': TRACE_MEMORY,
+        'synthetic': synthetic,
+        'runs': {},
+    }
+    for scale in scales:
+        results['runs'][f"x{scale}"] = benchmark_dataset(scaled_dataset_path(dataset_path, scale, synthetic))
+
+    os.makedirs(results_dir, exist_ok=True)
+    results_path = os.path.join(results_dir, f"{time.strftime('%Y%m%d-%H%M%S')}_{commit or 'nocommit'}.json")
+    with open(results_path, 'w', encoding='utf-8') as results_file:
+        json.dump(results, results_file, indent=2)
+    return results, results_path
+
+
+# helper function for printing the stage timings of a run, next to a baseline run when one is given
+def print_results(results, baseline=None):
+    for run_name, run in results['runs'].items():
+        print(f"{run_name} ({run['rows']:,} rows)")
+        baseline_stages = (baseline or {}).get('runs', {}).get(run_name, {}).get('stages', {})
+        for stage_name, stage in run['stages'].items():
+            line = f"  {stage_name:<32} {stage['seconds']:>10.4f}s"
+            if stage['peak_bytes'] is not None:
+                line += f" {stage['peak_bytes'] / 2**20:>10.1f} MiB"
+            if stage_name in baseline_stages and baseline_stages[stage_name]['seconds']:
+                line += f"   x{stage['seconds'] / baseline_stages[stage_name]['seconds']:.2f} vs {baseline['commit']}"
+            print(line)
+        print(f"  {'figure JSON total':<32} {sum(fig['bytes'] for fig in run['figures'].values()) / 2**10:>10.1f} KiB")
+
+
+# running the benchmark suite from the command line, e.g.
+# python -m combustion_analytics.benchmark --scales 1 10 --compare benchmark_results/<previous run>.json
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and measure the load, clean, aggregate and figure-build stages.")
+    parser.add_argument("--dataset", help="path of the dataset CSV (default: the 2014 dataset in data_source)")
+    parser.add_argument("--scales", nargs="+", type=int, default=BENCHMARK_SCALES,
+                        help="dataset sizes as multiples of the source file (default: 1 10 100 1000)")
+    parser.add_argument("--output", default=DEFAULT_RESULTS_DIR, help="folder the JSON results are written to")
+    parser.add_argument("--compare", help="a previous results file to print the timing ratios against")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="scale up with rows generated from the dataset's distributions instead of suffixed copies")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced runs measuring peak memory")
+    args = parser.parse_args()
+
+    TRACE_MEMORY = not args.no_memory
+    results, results_path = run_benchmarks(args.dataset, args.scales, args.output, args.synthetic)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+    print_results(results, baseline)
+    print(f"results written to {results_path}")
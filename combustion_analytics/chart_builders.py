@@ -0,0 +1,37 @@
+# importing the required libraries
+import numpy as np # for numerical operations and array manipulation
+import plotly.graph_objects as go # for building Plotly figures from precomputed values
+
+
+# the default Plotly colour, matching the charts built with plotly.express
+DEFAULT_TRACE_COLOUR = '#636efa'
+
+
+# helper function for building a horizontal box plot from precomputed box statistics and outliers
+def box_figure(box_stats, outliers, category_col, value_col, title, labels, height):
+    category_names = box_stats.index.astype(str)
+    fig = go.Figure()
+    # drawing the boxes from the quartiles and whiskers only, instead of shipping every row
+    fig.add_trace(go.Box(y=category_names, q1=box_stats['q1'], median=box_stats['median'], q3=box_stats['q3'],
+                         lowerfence=box_stats['lowerfence'], upperfence=box_stats['upperfence'],
+                         orientation='h', boxpoints=False, marker_color=DEFAULT_TRACE_COLOUR,
+                         name='', showlegend=False))
+    # drawing the capped outlier sample as markers on top of the boxes
+    fig.add_trace(go.Scatter(x=outliers[value_col], y=outliers[category_col].astype(str), mode='markers',
+                             marker={'color': DEFAULT_TRACE_COLOUR, 'size': 4}, name='', showlegend=False))
+    fig.update_layout(title={'text': title}, xaxis_title=labels['x'], yaxis_title=labels['y'], height=height)
+    return fig
+
+
+# helper function for building a histogram as a bar trace from precomputed bin counts and edges
+def histogram_figure(counts, bin_edges, title, labels, scale='linear'):
+    if scale == 'log':
+        # labelling each log-spaced bin by its range, as bar widths do not map onto a log axis
+        bin_labels = [f"{low:,.3g} - {high:,.3g}" for low, high in zip(bin_edges[:-1], bin_edges[1:])]
+        bar = go.Bar(x=bin_labels, y=counts, marker_color=DEFAULT_TRACE_COLOUR)
+    else:
+        bar = go.Bar(x=(bin_edges[:-1] + bin_edges[1:]) / 2, y=counts, width=np.diff(bin_edges),
+                     marker_color=DEFAULT_TRACE_COLOUR)
+    fig = go.Figure(bar)
+    fig.update_layout(title={'text': title}, xaxis_title=labels['x'], yaxis_title=labels['y'], bargap=0)
+    return fig
@@ -0,0 +1,118 @@
+# importing the required libraries
+import numpy as np # for numerical operations and array manipulation
+
+
+# the maximum number of points sent to the browser for a scatter plot
+SCATTER_POINT_BUDGET = 2000
+
+# the maximum number of outliers kept per category of a box plot
+BOX_OUTLIER_CAP = 50
+
+
+# helper function for downsampling a scatter series with the Largest-Triangle-Three-Buckets algorithm,
+# which keeps the points that shape the curve (including the extremes) and drops the redundant ones
+def lttb_downsample(x, y, point_budget=SCATTER_POINT_BUDGET):
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    n_points = len(x)
+    if point_budget >= n_points or point_budget < 3:
+        return x, y
+
+    # sorting the points along the x axis, as the buckets are consecutive x ranges
+    order = np.argsort(x, kind='stable')
+    x, y = x[order], y[order]
+
+    # splitting the points between the first and last into (point_budget - 2) buckets
+    bucket_edges = np.linspace(1, n_points - 1, point_budget - 1).astype(int)
+    selected = np.empty(point_budget, dtype=int)
+    selected[0], selected[-1] = 0, n_points - 1
+
+    prev_idx = 0
+    for bucket in range(point_budget - 2):
+        start, end = bucket_edges[bucket], bucket_edges[bucket + 1]
+        # averaging the next bucket (or the last point) as the third vertex of the triangle
+        if bucket + 2 < len(bucket_edges):
+            next_start, next_end = bucket_edges[bucket + 1], bucket_edges[bucket + 2]
+        else:
+            next_start, next_end = n_points - 1, n_points
+        avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+
+        # keeping the point forming the largest triangle with the previously kept point and the next bucket's average
+        areas = np.abs((x[prev_idx] - avg_x) * (y[start:end] - y[prev_idx])
+                       - (x[prev_idx] - x[start:end]) * (avg_y - y[prev_idx]))
+        prev_idx = start + int(np.argmax(areas))
+        selected[bucket + 1] = prev_idx
+
+    return x[selected], y[selected]
+
+
+# helper function for aggregating a scatter series into a 2-D grid, returning the centres and point counts of the occupied cells
+def bin_scatter(x, y, bins=100):
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    x_idx, y_idx = np.nonzero(counts)
+    x_centres = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centres = (y_edges[:-1] + y_edges[1:]) / 2
+    return x_centres[x_idx], y_centres[y_idx], counts[x_idx, y_idx].astype(int)
+
+
+# helper function for reducing a scatter series to at most point_budget points before the figure is built,
+# using either 'lttb' (shape-preserving sample) or 'binned' (density grid); counts is None for 'lttb'
+def reduce_scatter(x, y, point_budget=SCATTER_POINT_BUDGET, mode='lttb'):
+    if mode == 'binned':
+        # a square grid with at most point_budget cells
+        return bin_scatter(x, y, bins=max(int(np.sqrt(point_budget)), 1))
+    if mode == 'lttb':
+        x_reduced, y_reduced = lttb_downsample(x, y, point_budget)
+        return x_reduced, y_reduced, None
+    raise ValueError(f"Unknown scatter reduction mode: {mode!r}")
+
+
+# helper function for summarising a value column per category as box plot statistics,
+# returning the quartiles and Tukey whiskers per category and the most extreme outliers of each category
+def box_statistics(df, category_col, value_col, outlier_cap=BOX_OUTLIER_CAP):
+    categories, values = df[category_col], df[value_col]
+    grouped_values = values.groupby(categories, observed=True)
+
+    # calculating the quartiles of every category in one grouped pass
+    box_stats = grouped_values.quantile([0.25, 0.5, 0.75]).unstack()
+    box_stats.columns = ['q1', 'median', 'q3']
+    box_stats['count'] = grouped_values.size()
+
+    # broadcasting the per-category 1.5 x IQR bounds back to the rows
+    iqr = box_stats['q3'] - box_stats['q1']
+    row_labels = categories.to_numpy()
+    lower_bound = (box_stats['q1'] - 1.5 * iqr).reindex(row_labels).to_numpy()
+    upper_bound = (box_stats['q3'] + 1.5 * iqr).reindex(row_labels).to_numpy()
+    is_inlier = (values.to_numpy() >= lower_bound) & (values.to_numpy() <= upper_bound)
+
+    # extending the whiskers to the furthest values still inside the bounds
+    whiskers = values[is_inlier].groupby(categories[is_inlier], observed=True).agg(['min', 'max'])
+    box_stats['lowerfence'] = whiskers['min']
+    box_stats['upperfence'] = whiskers['max']
+
+    # keeping only the outliers furthest from their category's median
+    outliers = df.loc[~is_inlier, [category_col, value_col]]
+    median_distance = (outliers[value_col] - box_stats['median'].reindex(outliers[category_col].to_numpy()).to_numpy()).abs()
+    outliers = outliers.loc[median_distance.sort_values(ascending=False).index] \
+            .groupby(category_col, observed=True) \
+            .head(outlier_cap)
+
+    return box_stats, outliers
+
+
+# helper function for binning a value column on the server, with 'linear' or 'log' spaced bin edges
+# (for log bins, values at or below zero are counted in the first bin)
+def histogram_counts(values, nbins=20, scale='linear'):
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if scale == 'log':
+        positive = values[values > 0]
+        low, high = (positive.min(), positive.max()) if len(positive) else (1.0, 10.0)
+        bin_edges = np.geomspace(low, max(high, low * 10), nbins + 1)
+        values = np.clip(values, low, None)
+    elif scale == 'linear':
+        bin_edges = np.histogram_bin_edges(values, bins=nbins)
+    else:
+        raise ValueError(f"Unknown histogram scale: {scale!r}")
+    counts, bin_edges = np.histogram(values, bins=bin_edges)
+    return counts, bin_edges
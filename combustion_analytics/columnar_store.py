@@ -0,0 +1,148 @@
+# importing the required libraries
+import os # for file system paths and file metadata
+import pickle # for persisting the raw dataset summary
+import sys # for reading the command line arguments
+import pandas as pd # for data manipulation and analysis with DataFrames
+import pyarrow.feather as feather # for reading and writing the columnar (Arrow IPC) file
+from .data_quality import quality_profile # for the data-quality profile computed once at ingest
+
+
+# bumping this value forces a fresh conversion of the CSV (e.g. after changing the schema below)
+COLUMNAR_STORE_VERSION = 6
+
+# the explicit schema of the columnar file: only the 11 columns the app analyses plus the NAICS code and the facility
+# and county locations,
+# dictionary-encoded categoricals for every text column and float32 where the precision is only used for display
+# (facility and unit names repeat across the units of a facility and across facilities, so even they store
+# each distinct string once and group on integer codes)
+COLUMNAR_SCHEMA = {
+    'FACILITY_NAME': 'category',
+    'FUEL_TYPE': 'category',
+    'UNIT_NAME': 'category',
+    'UNIT_TYPE': 'category',
+    'STATE': 'category',
+    'PRIMARY_NAICS_TITLE': 'category',
+    'COGENERATION_UNIT_EMISS_IND': 'category',
+    'MECS_Region': 'category',
+    # MMBtu_TOTAL stays float64 because the Key Insights totals sum it into the billions
+    'MMBtu_TOTAL': 'float64',
+    'GWht_TOTAL': 'float32',
+    'GROUPING': 'category',
+    # the 6-digit NAICS code the industries are rolled up from (a nullable integer, as it may be missing)
+    'PRIMARY_NAICS_CODE': 'Int64',
+    # the facility id, coordinates and county, kept for the maps rather than for the analysis
+    # (the FIPS code is a nullable integer, as a county may be missing)
+    'FACILITY_ID': 'int64',
+    'LATITUDE': 'float64',
+    'LONGITUDE': 'float64',
+    'COUNTY': 'category',
+    'COUNTY_FIPS': 'Int64',
+}
+
+# the location columns of the schema
+LOCATION_COLUMNS = ['FACILITY_ID', 'LATITUDE', 'LONGITUDE', 'COUNTY', 'COUNTY_FIPS']
+
+# the columns the cleaning never drops a unit for, as only the maps and the NAICS roll-up use them
+# (see clean_combustion_dataset)
+OPTIONAL_COLUMNS = LOCATION_COLUMNS + ['PRIMARY_NAICS_CODE']
+
+
+# helper function for locating the columnar file and the raw summary derived from a CSV file
+def columnar_store_paths(dataset_path):
+    store_dir = os.path.join(os.path.dirname(os.path.abspath(dataset_path)), 'columnar_store')
+    file_stem = os.path.splitext(os.path.basename(dataset_path))[0]
+    columnar_path = os.path.join(store_dir, f"{file_stem}.v{COLUMNAR_STORE_VERSION}.feather")
+    summary_path = os.path.join(store_dir, f"{file_stem}.v{COLUMNAR_STORE_VERSION}.summary.pkl")
+    return columnar_path, summary_path
+
+
+# helper function for summarising the raw dataset, so the overview section never needs the full CSV again
+def summarise_raw_dataset(raw_df):
+    return {
+        'shape': raw_df.shape,
+        'head': raw_df.head(),
+        'tail': raw_df.tail(),
+        'dtypes': raw_df.dtypes,
+        'describe': raw_df.describe(),
+    }
+
+
+# helper function for reporting the in-memory footprint of every column, largest first
+# (for categoricals the deep size counts the integer codes plus the dictionary of distinct strings once)
+def memory_report(df):
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'distinct': df.nunique(),
+        'bytes': df.memory_usage(index=False, deep=True),
+    })
+    report['bytes_per_row'] = (report['bytes'] / max(len(df), 1)).round(2)
+    report['share'] = (report['bytes'] / report['bytes'].sum()).round(4)
+    return report.rename_axis('column').sort_values('bytes', ascending=False)
+
+
+# helper function for concatenating frames whose categoricals were encoded separately (e.g. one per reporting year),
+# giving each categorical column one shared dictionary first so the result stays categorical without decoding any strings
+def concat_shared_dictionary(frames):
+    frames = list(frames)
+    for col in frames[0].columns:
+        if all(isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+            shared_categories = pd.api.types.union_categoricals([frame[col] for frame in frames]).categories
+            frames = [frame.assign(**{col: frame[col].cat.set_categories(shared_categories)}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+# helper function for converting the CSV once into the typed columnar file
+def ingest_csv_dataset(dataset_path):
+    columnar_path, summary_path = columnar_store_paths(dataset_path)
+    os.makedirs(os.path.dirname(columnar_path), exist_ok=True)
+
+    # importing the full dataset from the file system, specifying file encoding
+    raw_df = pd.read_csv(dataset_path, encoding="utf-8")
+    raw_summary = summarise_raw_dataset(raw_df)
+    # profiling the missing values and duplicates once, so the cleaning section never recomputes them
+    raw_summary['quality'] = quality_profile(raw_df, [col for col in COLUMNAR_SCHEMA if col not in OPTIONAL_COLUMNS])
+
+    # keeping only the used columns, cast to the explicit schema
+    columnar_df = raw_df[list(COLUMNAR_SCHEMA)].astype({col: dtype for col, dtype in COLUMNAR_SCHEMA.items() if dtype})
+
+    # writing to temporary files first so concurrent workers never read a partial store
+    tmp_suffix = f".{os.getpid()}.tmp"
+    # leaving the file uncompressed so it can be memory-mapped
+    feather.write_feather(columnar_df, columnar_path + tmp_suffix, compression='uncompressed')
+    with open(summary_path + tmp_suffix, 'wb') as summary_file:
+        pickle.dump(raw_summary, summary_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(summary_path + tmp_suffix, summary_path)
+    os.replace(columnar_path + tmp_suffix, columnar_path)
+
+    return raw_summary, columnar_df
+
+
+# helper function for checking whether the columnar file is missing or older than its CSV
+def columnar_store_is_stale(dataset_path):
+    columnar_path, summary_path = columnar_store_paths(dataset_path)
+    if not (os.path.exists(columnar_path) and os.path.exists(summary_path)):
+        return True
+    return os.path.getmtime(columnar_path) < os.path.getmtime(dataset_path)
+
+
+# helper function for loading the dataset from the memory-mapped columnar file, converting the CSV first when needed
+def load_columnar_dataset(dataset_path):
+    if columnar_store_is_stale(dataset_path):
+        return ingest_csv_dataset(dataset_path)
+
+    columnar_path, summary_path = columnar_store_paths(dataset_path)
+    with open(summary_path, 'rb') as summary_file:
+        raw_summary = pickle.load(summary_file)
+    # split_blocks avoids consolidating the mapped columns into new 2-D blocks
+    columnar_df = feather.read_table(columnar_path, memory_map=True).to_pandas(split_blocks=True)
+    return raw_summary, columnar_df
+
+
+# converting the given CSV files (or the default dataset) from the command line, e.g.
+# python -m combustion_analytics.columnar_store data_source/IndustrialCombEnergy_2014_utf-8_version.csv
+if __name__ == "__main__":
+    from .prepared_dataset import resolve_dataset_path
+    for csv_path in sys.argv[1:] or [resolve_dataset_path()]:
+        summary, columnar_df = ingest_csv_dataset(csv_path)
+        print(f"{csv_path}: {summary['shape'][0]} rows -> {columnar_store_paths(csv_path)[0]}")
+        print(memory_report(columnar_df).to_string())
@@ -0,0 +1,54 @@
+# importing the required libraries
+import pandas as pd # for data manipulation and analysis with DataFrames
+
+
+# the number of duplicated records kept in the profile as examples
+DUPLICATE_SAMPLE_ROWS = 20
+
+
+# helper function for hashing every row into one 64-bit value, so duplicates are found
+# by comparing integers instead of the full rows of long strings
+def row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False)
+
+
+# helper function for profiling every column: its type, null count, distinct count and, for numbers, its range
+def column_profile(df):
+    profile = {}
+    for col in df.columns:
+        values = df[col]
+        col_profile = {'dtype': str(values.dtype), 'nulls': int(values.isna().sum()), 'distinct': int(values.nunique())}
+        if pd.api.types.is_numeric_dtype(values.dtype) and values.notna().any():
+            col_profile['min'], col_profile['max'] = float(values.min()), float(values.max())
+        profile[col] = col_profile
+    return profile
+
+
+# helper function for computing the data-quality profile of a raw dataset once, at ingest:
+# the raw column profile, the missing values of the kept columns, and the size and duplicates left after cleaning
+# (the cleaning drops every row with a missing value in the kept columns, see clean_combustion_dataset)
+def quality_profile(raw_df, kept_columns):
+    kept_df = raw_df[kept_columns]
+    cleaned_df = kept_df.dropna()
+    is_duplicate = row_hashes(cleaned_df).duplicated().to_numpy()
+    return {
+        'rows': len(raw_df),
+        'columns': column_profile(raw_df),
+        'kept_nulls': kept_df.isna().sum().astype(int).to_dict(),
+        'cleaned_rows': len(cleaned_df),
+        'cleaned_nulls': cleaned_df.isna().sum().astype(int).to_dict(),
+        'duplicate_rows': int(is_duplicate.sum()),
+        'duplicate_sample': cleaned_df.loc[is_duplicate].head(DUPLICATE_SAMPLE_ROWS).reset_index(drop=True),
+    }
+
+
+# helper function for listing the schema changes of a dataset against a reference dataset's column profile
+# (e.g. a new reporting year's file against the previous one); a column holding no values in either file has no
+# meaningful type (the CSV reader types it float64), so its type changes are not reported
+def schema_drift(reference_columns, columns):
+    drift = [f"added column {col} ({columns[col]['dtype']})" for col in columns if col not in reference_columns]
+    drift += [f"removed column {col}" for col in reference_columns if col not in columns]
+    drift += [f"column {col} changed from {reference_columns[col]['dtype']} to {columns[col]['dtype']}"
+              for col in columns if col in reference_columns and columns[col]['dtype'] != reference_columns[col]['dtype']
+              and columns[col]['distinct'] > 0 and reference_columns[col]['distinct'] > 0]
+    return drift
@@ -0,0 +1,133 @@
+# importing the required libraries
+import pandas as pd # for data manipulation and analysis with DataFrames
+from .aggregate_store import TOP_N # for the number of ranked items per chart
+
+
+# the dimensions the dashboard can be filtered by
+CUBE_FILTER_DIMENSIONS = ['STATE', 'MECS_Region', 'FUEL_TYPE', 'GROUPING', 'COGENERATION_UNIT_EMISS_IND']
+
+# the chart dimensions outside the filters: each gets its own small cube of the filters plus that one dimension,
+# as one cube of every dimension together would have nearly as many cells as the dataset has rows
+CUBE_CHART_DIMENSIONS = ['PRIMARY_NAICS_TITLE', 'UNIT_TYPE']
+
+# the dimensions of the facility table: the facility and its unit types plus the filters
+FACILITY_TABLE_DIMENSIONS = ['FACILITY_NAME'] + CUBE_FILTER_DIMENSIONS + ['UNIT_TYPE']
+
+# the category columns counted by the bar charts of the Dataset Exploration page
+EXPLORATION_COUNT_COLUMNS = ['FUEL_TYPE', 'UNIT_TYPE', 'PRIMARY_NAICS_TITLE', 'GROUPING', 'COGENERATION_UNIT_EMISS_IND',
+                             'MECS_Region']
+
+
+# helper function for the number of units and their total energy use for every combination of the dimensions
+def aggregate_cells(cleaned_df, dimensions):
+    return cleaned_df.groupby(dimensions, observed=True) \
+            .agg(units=('MMBtu_TOTAL', 'size'), MMBtu_TOTAL=('MMBtu_TOTAL', 'sum')) \
+            .reset_index()
+
+
+# helper function for building the cube once: one cube of the filter dimensions ('filters') and one per chart
+# dimension (the filters plus that dimension), each bounded by the number of categories, not by the number of rows
+def build_energy_cube(cleaned_df):
+    cube = {'filters': aggregate_cells(cleaned_df, CUBE_FILTER_DIMENSIONS)}
+    for dimension in CUBE_CHART_DIMENSIONS:
+        cube[dimension] = aggregate_cells(cleaned_df, CUBE_FILTER_DIMENSIONS + [dimension])
+    return cube
+
+
+# helper function for the cube holding a dimension: its own cube for a chart dimension, else the filters' cube
+def dimension_cube(cube, dimension):
+    return cube[dimension] if dimension in CUBE_CHART_DIMENSIONS else cube['filters']
+
+
+# helper function for keeping the cells of every cube matching every selected filter (given as a filter_state key)
+def slice_energy_cube(cube, filter_key):
+    return {name: slice_cube(cells, filter_key) for name, cells in cube.items()}
+
+
+# helper function for building the facility table once, for the filtered facility rankings: the number of units
+# and total energy use of every facility and unit type per combination of the filters (a facility has one state,
+# region and industry group, so only its fuel types, cogeneration indicators and unit types add rows), so both the
+# rankings and the unit types of the ranked facilities are rolled up from it
+def build_facility_table(cleaned_df):
+    return aggregate_cells(cleaned_df, FACILITY_TABLE_DIMENSIONS)
+
+
+# helper function for listing the values each filter can take
+def cube_filter_options(cube):
+    return {dimension: sorted(cube['filters'][dimension].unique()) for dimension in CUBE_FILTER_DIMENSIONS}
+
+
+# helper function for normalising the selected filter values into a hashable cache key, dropping the unused filters
+def filter_state(filters):
+    return tuple((dimension, tuple(sorted(filters[dimension])))
+                 for dimension in CUBE_FILTER_DIMENSIONS if filters.get(dimension))
+
+
+# helper function for keeping the cells of one cube (or of the facility table) matching every selected filter
+def slice_cube(cube, filter_key):
+    mask = pd.Series(True, index=cube.index)
+    for dimension, values in filter_key:
+        mask &= cube[dimension].isin(values)
+    return cube.loc[mask]
+
+
+# helper function for rolling a cube up to the given dimensions, summing a measure
+def rollup(cube, dimensions, measure='units'):
+    return cube.groupby(dimensions, observed=True)[measure].sum()
+
+
+# helper function for counting the units of every category shown on the Dataset Exploration page, largest first
+def cube_category_counts(cube):
+    return {col: rollup(dimension_cube(cube, col), col).loc[lambda counts: counts > 0].sort_values(ascending=False)
+            for col in EXPLORATION_COUNT_COLUMNS}
+
+
+# helper function for answering every Key Insights aggregation from a (sliced) cube and, for the facility rankings,
+# the facility table sliced by the same filters, returning the same chart keys as build_key_insights_aggregates
+# so the same figure builder draws them
+# (the NAICS roll-up and the county aggregates are not filtered, so the cube leaves them out)
+def cube_key_insights_aggregates(cube, facility_table, filter_key=(), top_n=TOP_N):
+    aggregates = {}
+
+    # ranking the fuel types within every MECS region (Question 1)
+    aggregates['region_fuel_top'] = rollup(cube['filters'], ['MECS_Region', 'FUEL_TYPE']) \
+            .sort_values(ascending=False, kind='stable') \
+            .groupby(level=0, observed=True, sort=False) \
+            .head(top_n)
+
+    # ranking the facilities by total energy use and by number of units (Questions 2 and 3)
+    facility_cells = slice_cube(facility_table, filter_key)
+    aggregates['facility_energy_top'] = rollup(facility_cells, 'FACILITY_NAME', 'MMBtu_TOTAL') \
+            .sort_values(ascending=False) \
+            .head(top_n)
+    facility_units_top = rollup(facility_cells, 'FACILITY_NAME').sort_values(ascending=False).head(top_n)
+    aggregates['facility_units_top'] = facility_units_top
+
+    # cross-tabulating the unit types of the top facilities from their own matching cells (Question 3)
+    top_facility_cells = facility_cells.loc[facility_cells['FACILITY_NAME'].isin(facility_units_top.index)]
+    unit_type_crosstab = rollup(top_facility_cells, ['FACILITY_NAME', 'UNIT_TYPE']) \
+            .unstack(fill_value=0) \
+            .reindex(facility_units_top.index, fill_value=0)
+    aggregates['facility_unit_type_crosstab'] = unit_type_crosstab.loc[:, unit_type_crosstab.sum() > 0]
+
+    # calculating the total and average energy use for each region and state (Questions 4 and 5)
+    for dimension, prefix in [('MECS_Region', 'region'), ('STATE', 'state')]:
+        energy = cube['filters'].groupby(dimension, observed=True)[['units', 'MMBtu_TOTAL']].sum()
+        aggregates[f'{prefix}_energy_total'] = energy['MMBtu_TOTAL']
+        aggregates[f'{prefix}_energy_mean'] = energy['MMBtu_TOTAL'] / energy['units']
+
+    # ranking the NAICS industries and the industry groups by total energy use (Questions 6 and 7)
+    aggregates['naics_energy_top'] = rollup(cube['PRIMARY_NAICS_TITLE'], 'PRIMARY_NAICS_TITLE', 'MMBtu_TOTAL') \
+            .sort_values(ascending=False) \
+            .head(top_n)
+    aggregates['grouping_energy_top'] = rollup(cube['filters'], 'GROUPING', 'MMBtu_TOTAL') \
+            .sort_values(ascending=False) \
+            .head(top_n)
+
+    # counting the industry groups' units used and not used for cogeneration, largest first within each (Question 8)
+    aggregates['cogen_grouping_counts'] = rollup(cube['filters'], ['COGENERATION_UNIT_EMISS_IND', 'GROUPING']) \
+            .loc[lambda counts: counts > 0] \
+            .sort_values(ascending=False, kind='stable') \
+            .sort_index(level=0, sort_remaining=False, kind='stable')
+
+    return aggregates
@@ -0,0 +1,117 @@
+# importing the required libraries
+import re # for normalising the facility names into words
+import numpy as np # for the sorted word array and the trigram scoring
+from .spatial_index import facility_labels # for the facility picker labels
+
+
+# the number of matches returned by a search by default
+SEARCH_LIMIT = 20
+
+# the smallest share of the query's trigrams a name must contain for a fuzzy match
+# (scored against the query only, so a typo in one word of a long name is still found)
+FUZZY_MIN_SIMILARITY = 0.5
+
+# the unit-level columns kept in the per-facility drill-down slices
+DRILL_DOWN_COLUMNS = ['UNIT_NAME', 'UNIT_TYPE', 'FUEL_TYPE', 'COGENERATION_UNIT_EMISS_IND', 'MMBtu_TOTAL', 'GWht_TOTAL']
+
+
+# helper function for lower-casing a name and splitting it into its words, ignoring punctuation
+def name_words(name):
+    return re.sub(r'[^0-9a-z]+', ' ', str(name).lower()).split()
+
+
+# helper function for the trigrams of a name, padding every word so short words and word starts still produce
+# trigrams, and a word scores the same wherever it is in the name
+def name_trigrams(name):
+    return {f"  {word} "[start:start + 3] for word in name_words(name) for start in range(len(word) + 1)}
+
+
+# helper function for building the search index once per dataset version:
+# - one row per facility (name, state, units and energy use), the most energy-using first, with its picker label;
+# - a sorted array of every word of every name with its facility, for prefix search with a binary search;
+# - the facilities of every name trigram, for fuzzy search;
+# - the units sorted by facility with every facility's first row, so a drill-down is one contiguous slice
+def build_facility_search_index(cleaned_df):
+    facilities = cleaned_df.groupby('FACILITY_ID', sort=False) \
+            .agg(FACILITY_NAME=('FACILITY_NAME', 'first'), STATE=('STATE', 'first'),
+                 units=('MMBtu_TOTAL', 'size'), MMBtu_TOTAL=('MMBtu_TOTAL', 'sum')) \
+            .sort_values('MMBtu_TOTAL', ascending=False) \
+            .reset_index()
+
+    # listing every (word, facility position) pair, sorted by word
+    word_pairs = sorted((word, position) for position, name in enumerate(facilities['FACILITY_NAME'])
+                        for word in set(name_words(name)))
+    words = np.array([word for word, _ in word_pairs], dtype=str)
+    word_facilities = np.array([position for _, position in word_pairs], dtype='int64')
+
+    # listing the facilities of every trigram
+    trigram_lists = {}
+    for position, name in enumerate(facilities['FACILITY_NAME']):
+        for trigram in name_trigrams(name):
+            trigram_lists.setdefault(trigram, []).append(position)
+
+    # sorting the units in facility order once, so each facility's units are rows offsets[i]:offsets[i + 1]
+    unit_order = facilities.reset_index().set_index('FACILITY_ID')['index'] \
+            .reindex(cleaned_df['FACILITY_ID']).to_numpy()
+    sort_order = np.argsort(unit_order, kind='stable')
+    units = cleaned_df[DRILL_DOWN_COLUMNS].iloc[sort_order].reset_index(drop=True)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(unit_order, minlength=len(facilities)))])
+
+    return {
+        'facilities': facilities,
+        'labels': facility_labels(facilities),
+        'words': words,
+        'word_facilities': word_facilities,
+        'trigrams': {trigram: np.array(positions, dtype='int64') for trigram, positions in trigram_lists.items()},
+        'units': units,
+        'unit_offsets': offsets,
+    }
+
+
+# helper function for the positions of the facilities having a word starting with the prefix (a binary search)
+def prefix_positions(search_index, prefix):
+    start = np.searchsorted(search_index['words'], prefix, side='left')
+    stop = np.searchsorted(search_index['words'], prefix + '\uffff', side='left')
+    return set(search_index['word_facilities'][start:stop].tolist())
+
+
+# helper function for the positions of the facilities whose name contains enough of the query's trigrams, best first
+def fuzzy_positions(search_index, query):
+    all_query_trigrams = name_trigrams(query)
+    query_trigrams = [trigram for trigram in all_query_trigrams if trigram in search_index['trigrams']]
+    if not query_trigrams:
+        return []
+    shared = np.bincount(np.concatenate([search_index['trigrams'][trigram] for trigram in query_trigrams]),
+                         minlength=len(search_index['facilities']))
+    candidates = np.flatnonzero(shared)
+    similarity = shared[candidates] / len(all_query_trigrams)
+    matched = similarity >= FUZZY_MIN_SIMILARITY
+    return candidates[matched][np.argsort(-similarity[matched], kind='stable')].tolist()
+
+
+# helper function for searching the facilities by name: the facilities with a word starting with every word of the
+# query come first (the most energy-using first), then the closest fuzzy matches, up to the limit
+def search_facilities(search_index, query, limit=SEARCH_LIMIT):
+    query_words = name_words(query)
+    if not query_words:
+        return search_index['facilities'].head(0)
+    prefix_matches = set.intersection(*(prefix_positions(search_index, word) for word in query_words))
+    # the facility table is sorted by energy use, so sorting the positions ranks the prefix matches
+    positions = sorted(prefix_matches)[:limit]
+    if len(positions) < limit:
+        positions += [position for position in fuzzy_positions(search_index, query)
+                      if position not in prefix_matches][:limit - len(positions)]
+    return search_index['facilities'].iloc[positions]
+
+
+# helper function for the units of one facility (given by its position in the facility table), read as one slice
+def facility_units(search_index, position):
+    start, stop = search_index['unit_offsets'][position], search_index['unit_offsets'][position + 1]
+    return search_index['units'].iloc[start:stop]
+
+
+# helper function for summarising a facility's units per fuel type: units and energy use, the largest first
+def facility_fuel_summary(units):
+    return units.groupby('FUEL_TYPE', observed=True) \
+            .agg(units=('MMBtu_TOTAL', 'size'), MMBtu_TOTAL=('MMBtu_TOTAL', 'sum')) \
+            .sort_values('MMBtu_TOTAL', ascending=False)
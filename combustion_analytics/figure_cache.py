@@ -0,0 +1,137 @@
+# importing the required libraries
+import hashlib # for hashing the figure code and the page state into the cache key
+import json # for writing the figure manifest and hashing the page state
+import os # for file system paths
+import re # for turning figure ids into safe file names
+import shutil # for removing partly written and pruned cache entries
+from functools import lru_cache # for hashing the figure code once per process
+import plotly.graph_objects as go # for rebuilding the cached figure specs
+from .aggregate_store import AGGREGATE_STORE_VERSION # for keying the figures on the stored aggregates they are drawn from
+
+
+# the version of the cache layout; bump it when the file layout changes
+FIGURE_CACHE_VERSION = 1
+
+# the modules drawing the figures and shaping the data they are drawn from (preparation, aggregates, cube, reducers,
+# NAICS roll-up), hashed into the cache key so a changed chart or aggregation is never served from a stale file
+FIGURE_SOURCE_MODULES = ['page_figures.py', 'chart_builders.py', 'chart_reducers.py', 'aggregate_store.py',
+                         'energy_cube.py', 'naics_hierarchy.py', 'prepared_dataset.py', 'columnar_store.py']
+
+# the number of page states (e.g. filter selections) kept on disk per dataset version, the least recently used dropped
+FIGURE_CACHE_STATES = 256
+
+# the number of cache folders (one per code and dataset version) kept on disk, the least recently used dropped;
+# enough for the old and new code of a rolling deploy sharing the cache volume, each with two dataset versions
+FIGURE_CACHE_FOLDERS = 4
+
+
+# helper function for hashing the source of the figure modules (and of any caller's files building figure data, e.g.
+# the app), so editing a chart or an aggregation invalidates its cached figures
+@lru_cache(maxsize=4)
+def figure_code_version(extra_sources=()):
+    code_hash = hashlib.sha256(f"aggregates-v{AGGREGATE_STORE_VERSION}".encode('utf-8'))
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    for source_path in [os.path.join(module_dir, module_file) for module_file in FIGURE_SOURCE_MODULES] \
+            + list(extra_sources):
+        with open(source_path, 'rb') as source_file:
+            code_hash.update(source_file.read())
+    return code_hash.hexdigest()[:12]
+
+
+# helper function for the name prefix shared by the cached figures of the current code version
+def figure_cache_prefix(extra_sources=()):
+    return f"v{FIGURE_CACHE_VERSION}-a{AGGREGATE_STORE_VERSION}-{figure_code_version(tuple(extra_sources))}-"
+
+
+# helper function for locating the cached figures of one dataset version, next to the dataset like the other stores
+def figure_cache_dir(dataset_path, dataset_version, extra_sources=()):
+    return os.path.join(os.path.dirname(os.path.abspath(dataset_path)), 'figure_cache',
+                        figure_cache_prefix(extra_sources) + safe_file_name(str(dataset_version)))
+
+
+# helper function for turning a figure id or page name into a file name
+def safe_file_name(name):
+    return re.sub(r'[^\w.-]+', '_', name)
+
+
+# helper function for locating the figures of one page state (the parameters and filters the page was built with)
+def page_state_dir(cache_dir, page_name, page_state):
+    state_hash = hashlib.sha256(json.dumps(page_state, default=str).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{safe_file_name(page_name)}-{state_hash}")
+
+
+# helper function for reading a page's figures back from their JSON specs, or None when they were not cached yet;
+# nested figure groups (e.g. one chart per region) keep their nesting through the manifest, and the specs skip
+# Plotly's validation as they were validated when first built (validating them again cost as much as rebuilding)
+def load_cached_figures(cache_dir, page_name, page_state):
+    state_dir = page_state_dir(cache_dir, page_name, page_state)
+    try:
+        with open(os.path.join(state_dir, 'manifest.json'), encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+
+        def read_figure(entry):
+            if isinstance(entry, dict):
+                return {key: read_figure(sub_entry) for key, sub_entry in entry.items()}
+            with open(os.path.join(state_dir, entry), encoding='utf-8') as figure_file:
+                return go.Figure(json.load(figure_file), _validate=False)
+
+        figures = {figure_id: read_figure(entry) for figure_id, entry in manifest.items()}
+        # marking the entry and its cache folder as recently used, so pruning drops what nobody opens any more
+        os.utime(state_dir)
+        os.utime(cache_dir)
+        return figures
+    except (OSError, ValueError):
+        return None
+
+
+# helper function for writing a page's figures as one JSON spec per figure (keyed on figure id, dataset version and
+# page state), moving the finished folder into place in one step so a reader never sees a partly written page
+def store_figures(cache_dir, page_name, page_state, figures):
+    state_dir = page_state_dir(cache_dir, page_name, page_state)
+    tmp_dir = f"{state_dir}.{os.getpid()}.tmp"
+
+    def write_figure(figure_id, fig):
+        if isinstance(fig, dict):
+            return {key: write_figure(f"{figure_id}-{key}", sub_fig) for key, sub_fig in fig.items()}
+        file_name = f"{safe_file_name(figure_id)}.json"
+        with open(os.path.join(tmp_dir, file_name), 'w', encoding='utf-8') as figure_file:
+            figure_file.write(fig.to_json())
+        return file_name
+
+    try:
+        os.makedirs(tmp_dir, exist_ok=True)
+        manifest = {figure_id: write_figure(figure_id, fig) for figure_id, fig in figures.items()}
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file)
+        os.rename(tmp_dir, state_dir)
+    except OSError:
+        # another worker stored the same page first, or the deployment is read-only: the figures are still returned
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return
+    prune_figure_cache(cache_dir)
+    prune_cache_folders(cache_dir)
+
+
+# helper function for dropping the least recently used page states beyond FIGURE_CACHE_STATES
+def prune_figure_cache(cache_dir, max_states=FIGURE_CACHE_STATES):
+    try:
+        state_dirs = [entry for entry in os.scandir(cache_dir) if entry.is_dir() and not entry.name.endswith('.tmp')]
+    except OSError:
+        return
+    state_dirs.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in state_dirs[max_states:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+# helper function for dropping the least recently used cache folders beyond FIGURE_CACHE_FOLDERS, whatever code
+# version wrote them (instances of different versions may share the folder), always keeping the given one
+def prune_cache_folders(cache_dir, max_folders=FIGURE_CACHE_FOLDERS):
+    try:
+        cache_dirs = [entry for entry in os.scandir(os.path.dirname(cache_dir)) if entry.is_dir()]
+    except OSError:
+        return
+    cache_dirs.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    kept = {os.path.basename(cache_dir)} | {entry.name for entry in cache_dirs[:max_folders]}
+    for entry in cache_dirs:
+        if entry.name not in kept:
+            shutil.rmtree(entry.path, ignore_errors=True)
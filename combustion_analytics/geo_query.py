@@ -0,0 +1,89 @@
+# importing the required libraries
+import numpy as np # for numerical operations and array manipulation
+import pandas as pd # for data manipulation and analysis with DataFrames
+from scipy import sparse # for summing the facilities of many query points in one matrix product
+from sklearn.neighbors import BallTree # for the haversine tree over the facility coordinates
+from .spatial_index import facility_locations, facility_labels # for one labelled row per facility with coordinates
+
+
+# the Earth's mean radius in each supported distance unit (the haversine tree works on the unit sphere)
+EARTH_RADIUS = {'miles': 3958.8, 'km': 6371.0}
+
+
+# helper function for building the geo index once: the facilities, a haversine ball tree over their coordinates
+# and a facility x fuel type matrix of energy use, aligned row for row with the facilities
+def build_geo_index(cleaned_df):
+    facilities = facility_locations(cleaned_df)
+    fuel_energy = cleaned_df.groupby(['FACILITY_ID', 'FUEL_TYPE'], observed=True)['MMBtu_TOTAL'].sum() \
+            .unstack(fill_value=0.0) \
+            .reindex(facilities['FACILITY_ID'], fill_value=0.0)
+    return {
+        'facilities': facilities,
+        'tree': BallTree(np.radians(facilities[['LATITUDE', 'LONGITUDE']].to_numpy()), metric='haversine'),
+        'fuel_types': fuel_energy.columns.astype(str),
+        'fuel_energy': fuel_energy.to_numpy(),
+        # the "name (state)" label of every facility, built once for the facility picker
+        'labels': facility_labels(facilities),
+    }
+
+
+# helper function for converting a distance into the radians of the unit sphere
+def radius_radians(radius, distance_unit='miles'):
+    return radius / EARTH_RADIUS[distance_unit]
+
+
+# helper function for the positions (in the facilities table) and distances of the facilities within a radius
+# of a point, nearest first
+def radius_positions(geo_index, latitude, longitude, radius, distance_unit='miles'):
+    positions, distances = geo_index['tree'].query_radius(np.radians([[latitude, longitude]]),
+                                                          r=radius_radians(radius, distance_unit),
+                                                          return_distance=True, sort_results=True)
+    return positions[0], distances[0] * EARTH_RADIUS[distance_unit]
+
+
+# helper function for listing the facilities within a radius of a point, nearest first, with their distance
+def facilities_within_radius(geo_index, latitude, longitude, radius, distance_unit='miles'):
+    positions, distances = radius_positions(geo_index, latitude, longitude, radius, distance_unit)
+    return geo_index['facilities'].iloc[positions].assign(distance=distances)
+
+
+# helper function for totalling the energy use by fuel type of the facilities within a radius of a point
+def energy_within_radius(geo_index, latitude, longitude, radius, distance_unit='miles'):
+    positions, _ = radius_positions(geo_index, latitude, longitude, radius, distance_unit)
+    return pd.Series(geo_index['fuel_energy'][positions].sum(axis=0), index=geo_index['fuel_types'], name='MMBtu_TOTAL')
+
+
+# helper function for the great-circle distance, in radians, between points given in radians
+def haversine_radians(lat_1, lon_1, lat_2, lon_2):
+    return 2 * np.arcsin(np.sqrt(np.sin((lat_2 - lat_1) / 2) ** 2
+                                 + np.cos(lat_1) * np.cos(lat_2) * np.sin((lon_2 - lon_1) / 2) ** 2))
+
+
+# helper function for listing the facilities inside the bounds (lat_min, lat_max, lon_min, lon_max): the tree finds
+# the facilities within the circle around the box, and only those are checked against its edges
+def facilities_in_bounding_box(geo_index, bounds):
+    lat_min, lat_max, lon_min, lon_max = bounds
+    center = np.radians([(lat_min + lat_max) / 2, (lon_min + lon_max) / 2])
+    corners = np.radians([[lat_min, lon_min], [lat_min, lon_max], [lat_max, lon_min], [lat_max, lon_max]])
+    circle_radius = haversine_radians(center[0], center[1], corners[:, 0], corners[:, 1]).max()
+    positions = geo_index['tree'].query_radius(center.reshape(1, -1), r=circle_radius)[0]
+    candidates = geo_index['facilities'].iloc[np.sort(positions)]
+    return candidates.loc[candidates['LATITUDE'].between(lat_min, lat_max)
+                          & candidates['LONGITUDE'].between(lon_min, lon_max)]
+
+
+# helper function for answering many radius queries in one call: one tree query for every point, then one sparse
+# (point x facility) by (facility x fuel type) product for the energy totals, returning a row per query point
+# with its number of facilities, combustion units, energy use per fuel type and total energy use
+def batch_energy_within_radius(geo_index, latitudes, longitudes, radius, distance_unit='miles'):
+    query_points = np.radians(np.column_stack([latitudes, longitudes]))
+    positions = geo_index['tree'].query_radius(query_points, r=radius_radians(radius, distance_unit))
+    counts = np.fromiter((len(point_positions) for point_positions in positions), dtype='int64', count=len(positions))
+    nearby = sparse.csr_matrix((np.ones(counts.sum()), np.concatenate(positions),
+                                np.concatenate([[0], np.cumsum(counts)])),
+                               shape=(len(positions), len(geo_index['facilities'])))
+    results = pd.DataFrame(nearby @ geo_index['fuel_energy'], columns=geo_index['fuel_types'])
+    results.insert(0, 'facilities', counts)
+    results.insert(1, 'units', (nearby @ geo_index['facilities']['units'].to_numpy()).astype('int64'))
+    results['MMBtu_TOTAL'] = results[geo_index['fuel_types']].sum(axis=1)
+    return results
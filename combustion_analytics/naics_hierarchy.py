@@ -0,0 +1,69 @@
+# the NAICS code lengths rolled up to, from the sector down to the 6-digit national industry
+NAICS_LEVELS = [2, 3, 4, 5, 6]
+
+# the names of the NAICS levels
+NAICS_LEVEL_NAMES = {2: 'Sector', 3: 'Subsector', 4: 'Industry Group', 5: 'NAICS Industry', 6: 'National Industry'}
+
+# the titles of the NAICS sectors (the 2-digit codes; the dataset only titles the 6-digit industries),
+# telling apart the parts of the sectors spanning several codes (e.g. 31-33 Manufacturing)
+NAICS_SECTOR_TITLES = {
+    '11': 'Agriculture, Forestry, Fishing and Hunting', '21': 'Mining, Quarrying, and Oil and Gas Extraction',
+    '22': 'Utilities', '23': 'Construction', '31': 'Manufacturing (food, beverages, textiles and apparel)',
+    '32': 'Manufacturing (wood, paper, petroleum, chemicals, plastics and minerals)',
+    '33': 'Manufacturing (metals, machinery, electronics and equipment)',
+    '42': 'Wholesale Trade', '44': 'Retail Trade', '45': 'Retail Trade', '48': 'Transportation and Warehousing',
+    '49': 'Transportation and Warehousing', '51': 'Information', '52': 'Finance and Insurance',
+    '53': 'Real Estate and Rental and Leasing', '54': 'Professional, Scientific, and Technical Services',
+    '55': 'Management of Companies and Enterprises',
+    '56': 'Administrative and Support and Waste Management and Remediation Services', '61': 'Educational Services',
+    '62': 'Health Care and Social Assistance', '71': 'Arts, Entertainment, and Recreation',
+    '72': 'Accommodation and Food Services', '81': 'Other Services (except Public Administration)',
+    '92': 'Public Administration',
+}
+
+
+# helper function for rolling the energy use up the NAICS hierarchy: the units are grouped once by their
+# 6-digit code, then every shorter level is summed from that small table of industries (never from the rows again);
+# every node keeps its parent, units, energy use, title and, for the levels above the industries, the largest
+# industry below it, and the children of every node are stored ready to be read in constant time per drill-down
+def build_naics_tree(cleaned_df):
+    codes = cleaned_df['PRIMARY_NAICS_CODE'].astype('Int64').astype('string')
+    industries = cleaned_df.groupby([codes, cleaned_df['PRIMARY_NAICS_TITLE']], observed=True)['MMBtu_TOTAL'] \
+            .agg(units='size', MMBtu_TOTAL='sum') \
+            .reset_index() \
+            .sort_values('MMBtu_TOTAL', ascending=False, kind='stable')
+    # keeping the well-formed 6-digit codes, and one title per code (the one carrying the most energy)
+    industries = industries.loc[industries['PRIMARY_NAICS_CODE'].str.len() == max(NAICS_LEVELS)] \
+            .groupby('PRIMARY_NAICS_CODE', sort=False) \
+            .agg(title=('PRIMARY_NAICS_TITLE', 'first'), units=('units', 'sum'), MMBtu_TOTAL=('MMBtu_TOTAL', 'sum')) \
+            .sort_values('MMBtu_TOTAL', ascending=False, kind='stable') \
+            .reset_index() \
+            .astype({'title': str})
+
+    levels = {}
+    for level in NAICS_LEVELS:
+        level_df = industries.assign(code=industries['PRIMARY_NAICS_CODE'].str[:level]) \
+                .groupby('code', sort=False) \
+                .agg(units=('units', 'sum'), MMBtu_TOTAL=('MMBtu_TOTAL', 'sum'), largest_industry=('title', 'first')) \
+                .sort_values('MMBtu_TOTAL', ascending=False, kind='stable')
+        level_df['parent'] = level_df.index.str[:level - 1] if level > min(NAICS_LEVELS) else None
+        if level == min(NAICS_LEVELS):
+            level_df['title'] = level_df.index.map(lambda code: NAICS_SECTOR_TITLES.get(code, f"NAICS {code}"))
+        elif level == max(NAICS_LEVELS):
+            level_df['title'] = level_df['largest_industry']
+        else:
+            level_df['title'] = "incl. " + level_df['largest_industry']
+        levels[level] = level_df
+
+    # splitting every level by parent once, so a drill-down is a dictionary lookup
+    children = {(None, None): levels[min(NAICS_LEVELS)]}
+    for level in NAICS_LEVELS[1:]:
+        for parent_code, child_df in levels[level].groupby('parent', sort=False):
+            children[(level - 1, parent_code)] = child_df
+    return {'levels': levels, 'children': children}
+
+
+# helper function for the children of a node, largest energy use first (the sectors for the root, level None)
+def naics_children(naics_tree, level=None, code=None):
+    children = naics_tree['children'].get((level, code))
+    return children if children is not None else naics_tree['levels'][min(NAICS_LEVELS)].head(0)
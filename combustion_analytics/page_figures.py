@@ -0,0 +1,533 @@
+# importing the required libraries
+import numpy as np # for fitting the map zoom to an area
+import pandas as pd # for data manipulation and analysis with DataFrames
+import plotly.express as px # for Plotly visualizations using high-level interface
+from .chart_reducers import reduce_scatter, SCATTER_POINT_BUDGET # for shrinking chart payloads before plotting
+from .chart_builders import box_figure, histogram_figure # for building figures from precomputed statistics
+from .energy_cube import EXPLORATION_COUNT_COLUMNS # for the category columns counted by the bar charts
+
+
+# setting the bar colours of the regional fuel type charts (regions missing here fall back to grey)
+MECS_REGION_COLOURS = {'South': 'green', 'West': 'purple', 'Midwest': '#D46A21', 'Northeast': '#167F9E'}
+
+
+# helper function for centring a figure's title (the layout every chart of the app shares),
+# applying any other layout updates in the same call
+def center_title(fig, **layout_updates):
+    fig.update_layout(title={
+            'x': 0.5, # Sets the x-position to the center (0.5)
+            'xanchor': 'center' # Aligns the title's center with the x-position
+        }, **layout_updates)
+    return fig
+
+
+# helper function for preparing the small inputs every Dataset Exploration figure is drawn from: the category counts
+# (over the whole dataset, unless the page is filtered and they were rolled up from the cube), the precomputed box
+# statistics and histogram counts, the reduced scatter points and the correlation matrix; the figures are then built
+# from these alone, so each can be built on its own (e.g. in a separate process by the batch report)
+def dataset_exploration_inputs(cleaned_df, box_stats_dt, hist_counts_dt, hist_scale='linear', scatter_reduction='lttb',
+                               category_counts=None):
+    # reducing the points to a fixed budget, so the payload does not grow with the number of rows
+    scatter_points = reduce_scatter(cleaned_df['GWht_TOTAL'], cleaned_df['MMBtu_TOTAL'], SCATTER_POINT_BUDGET,
+                                    mode=scatter_reduction)
+    return {
+        'category_counts': category_counts or {col: cleaned_df[col].value_counts() for col in EXPLORATION_COUNT_COLUMNS},
+        'box_stats_dt': box_stats_dt,
+        'hist_counts_dt': hist_counts_dt,
+        'hist_scale': hist_scale,
+        'scatter_points': scatter_points,
+        # getting the correlation between the MMBtu and GWht values
+        'corr_df': cleaned_df[['MMBtu_TOTAL', 'GWht_TOTAL']].corr(),
+    }
+
+
+# helper function for the bar graph of the fuel types
+def fuel_type_figure(inputs):
+    # extracting the different fuel types in the dataset
+    fuel_type_dt = inputs['category_counts']['FUEL_TYPE']
+    # extracting the fuel types and their corresponding counts
+    y_1, x_1 = fuel_type_dt.index, fuel_type_dt.values
+
+    # plotting the bar graph of the fuel types
+    fig_1 = px.bar(x=x_1, y=y_1, title='Fuel Type Used across the different combustion units',
+                   labels={'x':'No. of combustion units',
+                           'y': 'Fuel Type'},
+                           height=600)
+    return center_title(fig_1)
+
+
+# helper function for the bar graph of the combustion units
+def unit_type_figure(inputs):
+    # extracting the different combustion units in the dataset
+    unit_type_dt = inputs['category_counts']['UNIT_TYPE']
+    # extracting the combustion units and their corresponding counts
+    y_2, x_2 = unit_type_dt.index, unit_type_dt.values
+
+    # plotting the bar graph of the combustion units
+    fig_2 = px.bar(x=x_2, y=y_2, title='Combustion Unit Type Used across the Industries',
+                   labels={'x':'No. of combustion units',
+                           'y': 'Combustion unit type'},
+                           height=600)
+    return center_title(fig_2)
+
+
+# helper function for the bar graph of the industries
+def naics_count_figure(inputs):
+    # extracting the different industries based on NAICS in the dataset and selecting the first 20
+    naics_dt = inputs['category_counts']['PRIMARY_NAICS_TITLE'].head(20)
+    # extracting the industries and their corresponding counts
+    y_3, x_3 = naics_dt.index, naics_dt.values
+
+    # plotting the bar graph of the industries
+    fig_3 = px.bar(x=x_3, y=y_3, title='Classification of Combustion Units by NAICS title (Top 20)',
+                   labels={'x':'No. of combustion units',
+                           'y': 'NAICS Title'},
+                           height=600)
+    return center_title(fig_3)
+
+
+# helper function for the bar graph of the industry groups
+def grouping_count_figure(inputs):
+    # extracting the different industry groups in the dataset
+    group_dt = inputs['category_counts']['GROUPING']
+    # extracting the industry groups and their corresponding counts
+    y_4, x_4 = group_dt.index, group_dt.values
+
+    # plotting the bar graph of the industry groups
+    fig_4 = px.bar(x=x_4, y=y_4, title='Classification of Combustion Units by Industry Group',
+                   labels={'x':'No. of combustion units',
+                           'y': 'Industry Group'},
+                           height=600)
+    return center_title(fig_4)
+
+
+# helper function for the bar graph of the cogeneration status of the combustion units
+def cogeneration_count_figure(inputs):
+    # extracting the cogeneration status of the combustion units in the dataset
+    cogen_dt = inputs['category_counts']['COGENERATION_UNIT_EMISS_IND']
+    # extracting the corresponding counts of the two groups (Yes and No)
+    x_5, y_5 = cogen_dt.index, cogen_dt.values
+
+    # plotting the bar graph of the cogeneration status of the combustion units
+    fig_5 = px.bar(x=x_5, y=y_5, title='Classification of Combustion Units by Cogeneration',
+                   labels={'x':'Cogeneration Indicator',
+                           'y': 'No. of combustion units'},
+                           )
+    return center_title(fig_5)
+
+
+# helper function for the bar graph of the combustion units' division by region
+def region_count_figure(inputs):
+    # extracting the different regions in the dataset
+    mecs_dt = inputs['category_counts']['MECS_Region']
+    # extracting the different regions and their corresponding combustion unit counts
+    x_6, y_6 = mecs_dt.index, mecs_dt.values
+
+    # plotting the bar graph of the combustion units' division by region
+    fig_6 = px.bar(x=x_6, y=y_6, title='Classification of Combustion Units by Manufacturing Energy Consumption Survey (MECS) Region',
+                   labels={'x':'MECS Region',
+                           'y': 'No. of combustion units'},
+                           )
+    return center_title(fig_6)
+
+
+# helper function for the first histogram graph for the MMBtu values
+def mmbtu_histogram_figure(inputs):
+    fig_7_1 = histogram_figure(*inputs['hist_counts_dt']['MMBtu_TOTAL'], title='Distribution of Total Energy Use (MMBtu)',
+                               labels={'x':'Total Energy Use (MMBtu)',
+                           'y': 'Count'}, scale=inputs['hist_scale'])
+    return center_title(fig_7_1)
+
+
+# helper function for the second histogram graph for the GWht values
+def gwht_histogram_figure(inputs):
+    fig_7_2 = histogram_figure(*inputs['hist_counts_dt']['GWht_TOTAL'], title='Distribution of Total Energy Use (GWht)',
+                        labels={'x':'Total Energy Use (GWht)',
+                           'y': 'Count'}, scale=inputs['hist_scale'])
+    return center_title(fig_7_2)
+
+
+# helper function for the scatterplot for relationship between the MMBtu and GWht values
+def energy_scatter_figure(inputs):
+    gwht_reduced, mmbtu_reduced, point_counts = inputs['scatter_points']
+    fig_8_1 = px.scatter(x=gwht_reduced, y=mmbtu_reduced, color=point_counts, title='Scatterplot of MMBtu vs GWht',
+                               labels={'x':'Total Energy Use (GWht)',
+                           'y': 'Total Energy Use (MMBtu)',
+                           'color': 'No. of combustion units'})
+    return center_title(fig_8_1)
+
+
+# helper function for the correlation heatmap to show the correlation between MMBtu and GWht
+def energy_correlation_figure(inputs):
+    fig_8_2 = px.imshow(inputs['corr_df'], text_auto=True, title='Heatmap of MMBtu vs GWht',
+                            labels=dict(color="Correlation"),
+                x=['MMBtu', 'GWht'],
+                y=['MMBtu', 'GWht'])
+    return center_title(fig_8_2)
+
+
+# helper function for the boxplot distribution of the different fuel types and their usage in terms of combustion energy
+def fuel_type_box_figure(inputs):
+    fig_9 = box_figure(*inputs['box_stats_dt']['FUEL_TYPE'], 'FUEL_TYPE', 'MMBtu_TOTAL',
+                   title='Boxplot Distribution of Fuel Type and their energy use (MMBtu)',
+                   labels={'x':'Total Energy Use (MMBtu)',
+                           'y': 'Fuel Type'},
+                   height=1000)
+    return center_title(fig_9)
+
+
+# helper function for the boxplot distribution of the different combustion units and their corresponding energy use
+def unit_type_box_figure(inputs):
+    fig_10 = box_figure(*inputs['box_stats_dt']['UNIT_TYPE'], 'UNIT_TYPE', 'MMBtu_TOTAL',
+                   title='Boxplot Distribution of  Combustion Unit Type and their energy use (MMBtu)',
+                   labels={'x':'Total Energy Use (MMBtu)',
+                           'y': 'Unit Type'},
+                   height=800)
+    return center_title(fig_10)
+
+
+# helper function for the boxplot distribution of the different industry groups and their corresponding energy use
+def grouping_box_figure(inputs):
+    fig_11 = box_figure(*inputs['box_stats_dt']['GROUPING'], 'GROUPING', 'MMBtu_TOTAL',
+                   title='Boxplot Distribution of the Industry Groups and their energy use (MMBtu)',
+                   labels={'x':'Total Energy Use (MMBtu)',
+                           'y': 'Group'},
+                   height=600)
+    return center_title(fig_11)
+
+
+# the figure builders of the Dataset Exploration page in page order, keyed by figure id
+DATASET_EXPLORATION_FIGURES = {
+    'fig_1': fuel_type_figure,
+    'fig_2': unit_type_figure,
+    'fig_3': naics_count_figure,
+    'fig_4': grouping_count_figure,
+    'fig_5': cogeneration_count_figure,
+    'fig_6': region_count_figure,
+    'fig_7_1': mmbtu_histogram_figure,
+    'fig_7_2': gwht_histogram_figure,
+    'fig_8_1': energy_scatter_figure,
+    'fig_8_2': energy_correlation_figure,
+    'fig_9': fuel_type_box_figure,
+    'fig_10': unit_type_box_figure,
+    'fig_11': grouping_box_figure,
+}
+
+
+# helper function for building every figure of the Dataset Exploration page,
+# taking the cleaned dataset, the precomputed box statistics and histogram counts
+# and, when the page is filtered, the category counts rolled up from the cube
+def build_dataset_exploration_figures(cleaned_df, box_stats_dt, hist_counts_dt, hist_scale='linear',
+                                      scatter_reduction='lttb', category_counts=None):
+    inputs = dataset_exploration_inputs(cleaned_df, box_stats_dt, hist_counts_dt, hist_scale=hist_scale,
+                                        scatter_reduction=scatter_reduction, category_counts=category_counts)
+    return {figure_id: build_figure(inputs) for figure_id, build_figure in DATASET_EXPLORATION_FIGURES.items()}
+
+
+# helper function for ordering the MECS regions found in the data, keeping the familiar order for the known regions
+def ordered_mecs_regions(region_fuel_top):
+    found_regions = region_fuel_top.index.get_level_values(0)
+    mecs_regions = [region for region in MECS_REGION_COLOURS if region in found_regions]
+    mecs_regions += sorted(set(found_regions) - set(mecs_regions))
+    return mecs_regions
+
+
+# helper function for plotting a facility x unit type crosstab as a grid of small bar charts,
+# one facet per facility with its own unit type axis and facet_col_wrap facets per row
+def facility_unit_type_figure(unit_type_crosstab, facet_col_wrap=3, facet_height=400):
+    # reshaping the crosstab into one row per (facility, unit type) pair actually present
+    unit_type_counts = unit_type_crosstab.rename_axis(index='Facility', columns='Unit Type') \
+            .stack() \
+            .rename('Count') \
+            .loc[lambda counts: counts > 0] \
+            .reset_index()
+    facility_order = list(unit_type_crosstab.index)
+    facet_rows = -(-len(facility_order) // facet_col_wrap)
+
+    fig = px.bar(unit_type_counts, x='Unit Type', y='Count', facet_col='Facility', facet_col_wrap=facet_col_wrap,
+                 category_orders={'Facility': facility_order}, facet_row_spacing=min(0.5 / max(facet_rows, 1), 0.12),
+                 title='Combustion Unit Types owned by the Top 10 Facilities',
+                 height=facet_height * facet_rows, color_discrete_sequence=["#000080"])
+    # letting every facet show only its own unit types and the facility name as its title
+    fig.update_xaxes(matches=None, showticklabels=True, tickangle=-45, title_text='')
+    fig.update_yaxes(matches=None, showticklabels=True)
+    fig.for_each_annotation(lambda annotation: annotation.update(text=annotation.text.split('=', 1)[-1][:40]))
+    center_title(fig)
+    return fig
+
+
+# helper function for the bar graphs of the top 10 fuel types for every region found in the data (Question 1),
+# one figure per region keyed by the region
+def region_fuel_figures(aggregates):
+    region_fuel_top = aggregates['region_fuel_top']
+    region_figures = {}
+    for region in ordered_mecs_regions(region_fuel_top):
+        # extracting the top 10 fuel types and their corresponding counts for the region
+        mecs_fuel = region_fuel_top[region]
+        x_mecs, y_mecs = mecs_fuel.index, mecs_fuel.values
+
+        fig_12 = px.bar(x=x_mecs, y=y_mecs, title=f'{region} MECS Region (Top 10 Fuel Type Used)',
+                               labels={'x':'Fuel Type',
+                           'y': 'No. of combustion units'},
+                           color_discrete_sequence=[MECS_REGION_COLOURS.get(region, '#555555')])
+        center_title(fig_12, xaxis_tickangle=-45)
+        region_figures[region] = fig_12
+    return region_figures
+
+
+# helper function for the bar graph for the top 10 industrial facilities (Question 2)
+def facility_energy_figure(aggregates):
+    # extracting the industrial facilities, ranked based on total combustion energy usage (top 10)
+    inds_comb_high = aggregates['facility_energy_top']
+    x_inds_comb_high, y_inds_comb_high = inds_comb_high.index, inds_comb_high.values
+
+    # plotting the bar graph for the top 10 industrial facilities
+    fig_13 = px.bar(x=x_inds_comb_high, y=y_inds_comb_high,
+                          title='Top 10 Facilities with the Highest Combustion Energy Use',
+                               labels={'x':'Facility',
+                           'y': 'Combustion energy use (MMBtu)'}, height=600,
+                           color_discrete_sequence=["#0B5345"])
+    return center_title(fig_13, xaxis_tickangle=-45)
+
+
+# helper function for the bar graph for the top 10 facilities by number of combustion units (Question 3)
+def facility_units_figure(aggregates):
+    # extracting the facilities, ranked based on the number of combustion units owned (top 10)
+    ind_top_comb_units = aggregates['facility_units_top']
+    x_ind_top_comb_units, y_ind_top_comb_units = ind_top_comb_units.index, ind_top_comb_units.values
+
+    # plotting the bar graph for the top 10 facilities
+    fig_14_1 = px.bar(x=x_ind_top_comb_units, y=y_ind_top_comb_units,
+                      title='Top 10 Facilities with the most combustion units',
+                        labels={'x':'Facility',
+                           'y': 'No. of combustion units'}, height=600,
+                          color_discrete_sequence=["#DC143C"])
+    return center_title(fig_14_1, xaxis_tickangle=-45)
+
+
+# helper function for the combustion unit types of the top 10 facilities as one faceted figure (Question 3)
+def top_facility_unit_types_figure(aggregates):
+    return facility_unit_type_figure(aggregates['facility_unit_type_crosstab'])
+
+
+# helper function for the bar graph for the total combustion energy consumption for the regions (Question 4)
+def region_energy_total_figure(aggregates):
+    # extracting the regions and their corresponding total energy consumed
+    tot_energy_mecs = aggregates['region_energy_total']
+    x_tot_mecs, y_tot_mecs = tot_energy_mecs.index, tot_energy_mecs.values
+
+    fig_15_1 = px.bar(x=x_tot_mecs, y=y_tot_mecs,
+                  title="Total MMBtu consumed by MECS Region",
+                    labels={'x': 'MECS Region',
+                       'y': 'Total amount of energy consumed (MMBtu)'},
+                       color_discrete_sequence=['#008080'], height=500)
+    return center_title(fig_15_1, xaxis_tickangle=-45)
+
+
+# helper function for the bar graph for the average combustion energy consumption for the regions (Question 4)
+def region_energy_mean_figure(aggregates):
+    # extracting the regions and their corresponding average energy consumed
+    avg_energy_mecs = aggregates['region_energy_mean']
+    x_avg_mecs, y_avg_mecs = avg_energy_mecs.index, avg_energy_mecs.values
+
+    fig_15_2 = px.bar(x=x_avg_mecs, y=y_avg_mecs,
+                  title="Average MMBtu consumed by MECS Region",
+                    labels={'x': 'MECS Region',
+                       'y': 'Average amount of energy consumed (MMBtu)'},
+                       color_discrete_sequence=['#8C5DAF'], height=500)
+    return center_title(fig_15_2, xaxis_tickangle=-45)
+
+
+# helper function for the bar graph of total combustion energy consumption for the different states (Question 5)
+def state_energy_total_figure(aggregates):
+    # extracting the states and their corresponding total combustion energy consumed
+    tot_energy_state = aggregates['state_energy_total']
+    x_tot_state, y_tot_state = tot_energy_state.index, tot_energy_state.values
+
+    fig_16_1 = px.bar(x=x_tot_state, y=y_tot_state,
+                      title="Total MMBtu consumed by State",
+                        labels={'x': 'State',
+                           'y': 'Total amount of energy consumed (MMBtu)'},
+                           color_discrete_sequence=['#4B0082'], height=500)
+    return center_title(fig_16_1)
+
+
+# helper function for the bar graph of average combustion energy consumption for the different states (Question 5)
+def state_energy_mean_figure(aggregates):
+    # extracting the states and their corresponding average combustion energy consumed
+    avg_energy_state = aggregates['state_energy_mean']
+    x_avg_state, y_avg_state = avg_energy_state.index, avg_energy_state.values
+
+    fig_16_2 = px.bar(x=x_avg_state, y=y_avg_state,
+                      title="Average MMBtu consumed by State",
+                        labels={'x': 'State',
+                           'y': 'Average amount of energy consumed (MMBtu)'},
+                           color_discrete_sequence=['#C41E3A'], height=500)
+    return center_title(fig_16_2)
+
+
+# helper function for the bar graph for the top 10 industries (Question 6)
+def naics_energy_figure(aggregates):
+    # extracting the industries in reference to NAICS, ranked based on total combustion energy usage (top 10)
+    energy_cons_naics = aggregates['naics_energy_top']
+    x_energy_cons_naics, y_energy_cons_naics = energy_cons_naics.index, energy_cons_naics.values
+
+    fig_17 = px.bar(x=x_energy_cons_naics, y=y_energy_cons_naics,
+                      title='Top 10 NAICS Industries based on combustion energy consumption',
+                        labels={'x':'NAICS Title',
+                           'y': 'Total amount of energy consumed (MMBtu)'}, height=800,
+                           color_discrete_sequence=["#151B54"])
+    return center_title(fig_17, xaxis_tickangle=-45)
+
+
+# helper function for the bar graph for the top 10 industry groups (Question 7)
+def grouping_energy_figure(aggregates):
+    # extracting the industry groups, ranked based on total combustion energy usage (top 10)
+    energy_cons_grp = aggregates['grouping_energy_top']
+    x_energy_grp, y_energy_grp = energy_cons_grp.index, energy_cons_grp.values
+
+    fig_18 = px.bar(x=x_energy_grp, y=y_energy_grp,
+                      title='Top 10 Industry Groups based on combustion energy consumption',
+                        labels={'x':'Group',
+                           'y': 'Total amount of energy consumed (MMBtu)'},
+                           color_discrete_sequence=['#c21807'],
+                             height=800)
+    return center_title(fig_18, xaxis_tickangle=-45)
+
+
+# helper function for the industry groups' units with one cogeneration indicator (Question 8)
+# (a filtered dataset may hold only one of the two, leaving the other chart empty)
+def cogen_grouping_counts(aggregates, cogen_indicator):
+    cogen_grouping_counts = aggregates['cogen_grouping_counts']
+    cogen_ind = cogen_grouping_counts.index.get_level_values(0)
+    return cogen_grouping_counts[cogen_ind == cogen_indicator].droplevel(0)
+
+
+# helper function for the bar graph for the first group (units used for cogeneration) (Question 8)
+# (passing a frame, as plotly express rejects empty x and y arrays)
+def cogeneration_grouping_figure(aggregates):
+    cogen_grp_yes = cogen_grouping_counts(aggregates, 'Yes')
+    fig_19_1 = px.bar(pd.DataFrame({'x': cogen_grp_yes.index, 'y': cogen_grp_yes.values}), x='x', y='y',
+                      title='Distribution of Combustion Units Used For Cogeneration',
+                        labels={'x':'Industry Group',
+                           'y': 'No. of combustion units'},
+                           color_discrete_sequence=['#ff6e00'],
+                             height=800)
+    return center_title(fig_19_1, xaxis_tickangle=-45)
+
+
+# helper function for the bar graph for the second group (units not used for cogeneration) (Question 8)
+def non_cogeneration_grouping_figure(aggregates):
+    cogen_grp_no = cogen_grouping_counts(aggregates, 'No')
+    fig_19_2 = px.bar(pd.DataFrame({'x': cogen_grp_no.index, 'y': cogen_grp_no.values}), x='x', y='y',
+                      title='Distribution of Combustion Units Not Used For Cogeneration',
+                        labels={'x':'Industry Group',
+                           'y': 'No. of combustion units'},
+                           color_discrete_sequence=["#a1195d"],
+                            height=800)
+    return center_title(fig_19_2, xaxis_tickangle=-45)
+
+
+# the figure builders of the Key Insights page in page order, keyed by figure id
+# (fig_12 is a group of figures, one per MECS region)
+KEY_INSIGHTS_FIGURES = {
+    'fig_12': region_fuel_figures,
+    'fig_13': facility_energy_figure,
+    'fig_14_1': facility_units_figure,
+    'fig_14_2': top_facility_unit_types_figure,
+    'fig_15_1': region_energy_total_figure,
+    'fig_15_2': region_energy_mean_figure,
+    'fig_16_1': state_energy_total_figure,
+    'fig_16_2': state_energy_mean_figure,
+    'fig_17': naics_energy_figure,
+    'fig_18': grouping_energy_figure,
+    'fig_19_1': cogeneration_grouping_figure,
+    'fig_19_2': non_cogeneration_grouping_figure,
+}
+
+
+# helper function for building every figure of the Key Insights page from the precomputed aggregates
+def build_key_insights_figures(aggregates):
+    return {figure_id: build_figure(aggregates) for figure_id, build_figure in KEY_INSIGHTS_FIGURES.items()}
+
+
+# helper function for plotting the visible tiles of the spatial index as one bubble per tile,
+# sized by total energy use and coloured by the number of combustion units, centred on the bounds
+def facility_map_figure(visible_tiles, bounds, height=650, width_px=1000):
+    lat_min, lat_max, lon_min, lon_max = bounds
+    # fitting the map zoom to the wider of the two spans (zoom 0 shows the world in one 512-pixel tile)
+    map_zoom = min(np.log2(360.0 / max(lon_max - lon_min, 1e-6) * width_px / 512),
+                   np.log2(170.0 / max(lat_max - lat_min, 1e-6) * height / 512))
+    fig = px.scatter_map(visible_tiles, lat='LATITUDE', lon='LONGITUDE', size='MMBtu_TOTAL', color='units',
+                         hover_data={'facilities': True, 'units': True, 'MMBtu_TOTAL': ':,.0f',
+                                     'LATITUDE': False, 'LONGITUDE': False},
+                         labels={'facilities': 'Facilities', 'units': 'Combustion units',
+                                 'MMBtu_TOTAL': 'Total energy use (MMBtu)'},
+                         color_continuous_scale='Viridis', size_max=40, height=height,
+                         center={'lat': (lat_min + lat_max) / 2, 'lon': (lon_min + lon_max) / 2},
+                         zoom=float(map_zoom), map_style='carto-positron',
+                         title='Combustion Energy Use of the Facilities in View (one bubble per map tile)')
+    return center_title(fig, margin={'l': 0, 'r': 0, 'b': 0})
+
+
+# helper function for plotting the energy use by fuel type of the facilities near a point, largest first
+def nearby_fuel_energy_figure(fuel_energy, radius, distance_unit='miles'):
+    fuel_energy = fuel_energy.loc[fuel_energy > 0].sort_values(ascending=False)
+    fig = px.bar(pd.DataFrame({'x': fuel_energy.index, 'y': fuel_energy.values}), x='x', y='y',
+                 title=f'Combustion Energy Use by Fuel Type within {radius:g} {distance_unit}',
+                 labels={'x': 'Fuel Type', 'y': 'Total amount of energy consumed (MMBtu)'},
+                 color_discrete_sequence=['#167F9E'], height=500)
+    return center_title(fig, xaxis_tickangle=-45)
+
+
+# the county boundaries of the choropleth, fetched by the browser so the figure only carries the FIPS codes and values
+COUNTY_GEOJSON_URL = "https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json"
+
+# the measures the county map can be coloured by, with their labels
+COUNTY_MEASURE_LABELS = {'MMBtu_TOTAL': 'Total energy use (MMBtu)', 'MMBtu_mean': 'Average energy use per unit (MMBtu)',
+                         'main_fuel': 'Main fuel type'}
+
+
+# helper function for drawing the precomputed county aggregates as a choropleth of the US counties
+# (the energy scales stop at the 95th percentile, so a few very large counties don't wash out the rest)
+def county_choropleth_figure(county_energy, measure='MMBtu_TOTAL'):
+    county_df = county_energy.reset_index()
+    choropleth_kwargs = {}
+    if measure != 'main_fuel':
+        choropleth_kwargs = {'color_continuous_scale': 'YlOrRd',
+                             'range_color': (0, float(county_df[measure].quantile(0.95) or 1))}
+    fig = px.choropleth(county_df, geojson=COUNTY_GEOJSON_URL, locations='COUNTY_FIPS', color=measure, scope='usa',
+                        hover_name='COUNTY',
+                        hover_data={'STATE': True, 'units': True, 'MMBtu_TOTAL': ':,.0f', 'MMBtu_mean': ':,.0f',
+                                    'main_fuel': True, 'main_fuel_share': ':.0%', 'COUNTY_FIPS': False},
+                        labels={'STATE': 'State', 'units': 'Combustion units', 'main_fuel_share': 'Main fuel share',
+                                **COUNTY_MEASURE_LABELS},
+                        title=f'{COUNTY_MEASURE_LABELS[measure]} by County', height=600, **choropleth_kwargs)
+    return center_title(fig, margin={'l': 0, 'r': 0, 'b': 0})
+
+
+# helper function for plotting one facility's energy use by fuel type, split by combustion unit type
+def facility_drill_down_figure(units, facility_name):
+    fuel_unit_energy = units.groupby(['FUEL_TYPE', 'UNIT_TYPE'], observed=True)['MMBtu_TOTAL'].sum().reset_index()
+    fig = px.bar(fuel_unit_energy, x='FUEL_TYPE', y='MMBtu_TOTAL', color='UNIT_TYPE',
+                 title=f'Combustion Energy Use of {facility_name} by Fuel Type and Unit Type',
+                 labels={'FUEL_TYPE': 'Fuel Type', 'MMBtu_TOTAL': 'Total amount of energy consumed (MMBtu)',
+                         'UNIT_TYPE': 'Unit Type'},
+                 category_orders={'FUEL_TYPE': list(fuel_unit_energy.groupby('FUEL_TYPE', observed=True)['MMBtu_TOTAL']
+                                                    .sum().sort_values(ascending=False).index)},
+                 height=550)
+    return center_title(fig, xaxis_tickangle=-45)
+
+
+# helper function for plotting the nodes of one NAICS level below the chosen path (the sectors for an empty path)
+def naics_level_figure(level_nodes, naics_path):
+    naics_df = level_nodes.reset_index()
+    naics_df['label'] = naics_df['code'] + ' · ' + naics_df['title'].str.slice(0, 50)
+    title = f"Combustion Energy Use below NAICS {naics_path[-1]}" if naics_path else \
+        "Combustion Energy Use by NAICS Sector"
+    fig = px.bar(naics_df, x='label', y='MMBtu_TOTAL', hover_data={'units': True, 'largest_industry': True},
+                 title=title,
+                 labels={'label': 'NAICS code', 'MMBtu_TOTAL': 'Total amount of energy consumed (MMBtu)',
+                         'units': 'No. of combustion units', 'largest_industry': 'Largest industry'},
+                 color_discrete_sequence=["#151B54"], height=600)
+    return center_title(fig, xaxis_tickangle=-45)
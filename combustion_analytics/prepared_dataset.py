@@ -0,0 +1,100 @@
+# importing the required libraries
+import copy # for copying the raw summary handed to a page
+import os # for file system paths and file metadata
+import pandas as pd # for data manipulation and analysis with DataFrames
+from .columnar_store import OPTIONAL_COLUMNS, load_columnar_dataset # for the typed, memory-mapped copy of the dataset
+from .rerun_profile import timed_stage # for timing the preparation steps when profiling is on
+
+
+# bumping this value invalidates every cached prepared dataset (e.g. after changing the cleaning steps)
+PREPARED_DATASET_VERSION = 5
+
+# the repository root, one level above this package
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the dataset locations, accounting for running from the repository root, the app_deploy folder or the notebook folder
+DATASET_PATHS = ["data_source/IndustrialCombEnergy_2014_utf-8_version.csv",
+                 "../data_source/IndustrialCombEnergy_2014_utf-8_version.csv",
+                 os.path.join(REPOSITORY_ROOT, "data_source", "IndustrialCombEnergy_2014_utf-8_version.csv")]
+
+# the columns that are not required for the analysis
+# (the NAICS code, facility id, coordinates and county in OPTIONAL_COLUMNS are kept for the roll-up and the maps)
+DROPPED_COLUMNS = ['FUEL_TYPE_BLEND', 'FUEL_TYPE_OTHER', 'OTHER_OR_BLEND_FUEL_TYPE', 'CENSUS_PLACE_NAME', \
+                   'REPORTING_YEAR','ZIP']
+
+# the readable labels of the COGENERATION_UNIT_EMISS_IND values
+COGENERATION_LABELS = {'Y': 'Yes', 'N': 'No'}
+
+
+# helper function for finding the dataset file on the file system
+def resolve_dataset_path():
+    for dataset_path in DATASET_PATHS:
+        if os.path.exists(dataset_path):
+            return dataset_path
+    # falling back to the first location so the read error names the expected file
+    return DATASET_PATHS[0]
+
+
+# helper function for fingerprinting the source file, cheap enough to run on every rerun
+def dataset_fingerprint(dataset_path=None):
+    dataset_path = dataset_path or resolve_dataset_path()
+    try:
+        file_stat = os.stat(dataset_path)
+    except OSError:
+        return f"v{PREPARED_DATASET_VERSION}-missing"
+    return f"v{PREPARED_DATASET_VERSION}-{file_stat.st_size}-{file_stat.st_mtime_ns}"
+
+
+# helper function to load the raw dataset
+def load_combustion__energy_dataset(dataset_path=None):
+    # importing the dataset from the file system, specifying file encoding
+    df = pd.read_csv(dataset_path or resolve_dataset_path(), encoding="utf-8")
+    # returning the loaded dataset as output
+    return df
+
+
+# helper function for dropping the unwanted columns and relabelling the cogeneration indicator
+def transform_combustion_dataset(raw_df):
+    # dropping the columns that are not required for the analysis (the columnar copy never stored them)
+    transformed_df = raw_df.drop(DROPPED_COLUMNS, axis=1, errors='ignore')
+    # transforming the values of the COGENERATION_UNIT_EMISS_IND column
+    cogen_ind = transformed_df['COGENERATION_UNIT_EMISS_IND']
+    if isinstance(cogen_ind.dtype, pd.CategoricalDtype):
+        # renaming the categories keeps the column categorical instead of replacing every row
+        transformed_df['COGENERATION_UNIT_EMISS_IND'] = cogen_ind.cat.rename_categories(
+            lambda category: COGENERATION_LABELS.get(category, category))
+    else:
+        transformed_df = transformed_df.replace({'COGENERATION_UNIT_EMISS_IND': COGENERATION_LABELS})
+    return transformed_df
+
+
+# helper function for dropping the records having null values
+# (a unit missing only its NAICS code, coordinates or county is kept for the analysis, the roll-up and maps leave it out)
+def clean_combustion_dataset(transformed_df):
+    cleaned_df = transformed_df.dropna(subset=[col for col in transformed_df.columns if col not in OPTIONAL_COLUMNS],
+                                       ignore_index=True)
+    # dropping the categories only seen in the removed records, so value counts don't report empty categories
+    for col in cleaned_df.select_dtypes('category').columns:
+        cleaned_df[col] = cleaned_df[col].cat.remove_unused_categories()
+    return cleaned_df
+
+
+# helper function for handing a page its own view of the prepared dataset shared by every session and rerun:
+# shallow copies of the frames, which share the data until written to (pandas copy-on-write then copies only the
+# written columns, so a page assigning through .loc or adding a column never changes the shared frames),
+# and a deep copy of the small raw summary
+def prepared_dataset_view(prepared_dataset):
+    raw_summary, transformed_df, cleaned_df = prepared_dataset
+    return copy.deepcopy(raw_summary), transformed_df.copy(deep=False), cleaned_df.copy(deep=False)
+
+
+# helper function for running the whole preparation pipeline once,
+# returning the raw dataset summary and the transformed and cleaned frames
+def build_prepared_dataset(dataset_path=None):
+    with timed_stage('load_dataset'):
+        raw_summary, columnar_df = load_columnar_dataset(dataset_path or resolve_dataset_path())
+    with timed_stage('transform_dataset'):
+        transformed_df = transform_combustion_dataset(columnar_df)
+    with timed_stage('clean_dataset'):
+        cleaned_df = clean_combustion_dataset(transformed_df)
+    return raw_summary, transformed_df, cleaned_df
@@ -0,0 +1,126 @@
+# importing the required libraries
+import cProfile # for the optional function-level profile of one rerun
+import glob # for listing the retained cProfile dumps
+import json # for the structured log line of every rerun
+import logging # for writing the rerun log lines
+import os # for file system paths
+import threading # for keeping the active profile per script thread
+import time # for timing every stage
+from contextlib import contextmanager # for the named stage timers
+
+
+# the environment variable (or query parameter, without the prefix) enabling the instrumentation:
+# "1" for the stage timers and figure payloads, "cprofile" to also dump a cProfile of the rerun
+# (a visitor's query parameter can only ask for the cProfile when the variable is set on the server)
+PROFILE_ENV_VAR = "APP_PROFILE"
+
+# the folder the cProfile dumps are written to by default
+PROFILE_DUMP_DIR = "profiles"
+
+# the number of cProfile dumps kept in the folder, the oldest removed
+PROFILE_DUMP_LIMIT = 20
+
+# the logger of the structured rerun lines
+rerun_logger = logging.getLogger("combustion_analytics.rerun_profile")
+
+# the profile of the rerun running in the current thread (Streamlit runs every session's script in its own thread)
+_active = threading.local()
+
+
+# helper function for turning a query parameter or environment value into a profiling mode
+# (None when the instrumentation is off, otherwise 'timers' or 'cprofile')
+def parse_profiling_mode(value):
+    value = str(value or '').strip().lower()
+    if value in ('', '0', 'false', 'off', 'no'):
+        return None
+    return 'cprofile' if value == 'cprofile' else 'timers'
+
+
+# helper function for reading the profiling mode from the query parameter or the environment: the query parameter
+# picks the mode, but the cProfile (which writes a file every rerun) is only allowed when the environment enables
+# profiling, so an anonymous visitor can switch on the stage timers at most
+def profiling_mode(query_value=None, env_value=None):
+    env_mode = parse_profiling_mode(env_value or os.environ.get(PROFILE_ENV_VAR, ''))
+    query_mode = parse_profiling_mode(query_value)
+    if query_mode == 'cprofile' and env_mode is None:
+        return 'timers'
+    return query_mode or env_mode
+
+
+# helper function for starting the profile of one rerun, making it the active profile of this thread
+def start_rerun_profile(page, mode):
+    # printing the rerun log lines to stderr the first time profiling is switched on
+    if not rerun_logger.handlers:
+        rerun_logger.addHandler(logging.StreamHandler())
+        rerun_logger.setLevel(logging.INFO)
+        rerun_logger.propagate = False
+    profile = {'page': page, 'mode': mode, 'started': time.perf_counter(), 'stages': [], 'figures': [],
+               'profiler': None}
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            profile['profiler'] = profiler
+        except ValueError:
+            # another session's rerun is being profiled (Python 3.12+ allows one active profiler per process)
+            profile['mode'] = 'timers'
+    _active.profile = profile
+    return profile
+
+
+# helper function for timing a named stage of the active rerun; a no-op when profiling is off,
+# so the pipeline can be instrumented without checking the mode at every call site
+@contextmanager
+def timed_stage(stage_name):
+    profile = getattr(_active, 'profile', None)
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile['stages'].append({'stage': stage_name, 'offset_ms': round((started - profile['started']) * 1000, 2),
+                                  'ms': round((time.perf_counter() - started) * 1000, 2)})
+
+
+# helper function for recording the serialised size and display time of one figure of the active rerun
+def record_figure(figure_name, fig, render_seconds):
+    profile = getattr(_active, 'profile', None)
+    if profile is not None:
+        profile['figures'].append({'figure': figure_name, 'bytes': len(fig.to_json().encode('utf-8')),
+                                   'render_ms': round(render_seconds * 1000, 2)})
+
+
+# helper function for finishing the active rerun: stopping the profiler, dumping its stats,
+# writing one structured log line and returning the summary shown in the sidebar
+def finish_rerun_profile(profile, dump_dir=PROFILE_DUMP_DIR):
+    _active.profile = None
+    summary = {
+        'page': profile['page'],
+        'total_ms': round((time.perf_counter() - profile['started']) * 1000, 2),
+        # listing the stages in start order, as nested stages finish before the stage around them
+        'stages': sorted(profile['stages'], key=lambda stage: stage['offset_ms']),
+        'figures': profile['figures'],
+        'figure_bytes': sum(figure['bytes'] for figure in profile['figures']),
+        'profile_path': None,
+    }
+    if profile['profiler'] is not None:
+        profile['profiler'].disable()
+        os.makedirs(dump_dir, exist_ok=True)
+        summary['profile_path'] = os.path.join(dump_dir, f"rerun-{time.strftime('%Y%m%d-%H%M%S')}-"
+                                                         f"{profile['page'].lower().replace(' ', '_')}.prof")
+        profile['profiler'].dump_stats(summary['profile_path'])
+        prune_profile_dumps(dump_dir)
+    rerun_logger.info(json.dumps({'event': 'rerun_profile', **summary}))
+    return summary
+
+
+# helper function for removing the oldest cProfile dumps beyond PROFILE_DUMP_LIMIT
+def prune_profile_dumps(dump_dir=PROFILE_DUMP_DIR, max_dumps=PROFILE_DUMP_LIMIT):
+    dump_paths = sorted(glob.glob(os.path.join(dump_dir, 'rerun-*.prof')), key=os.path.getmtime, reverse=True)
+    for dump_path in dump_paths[max_dumps:]:
+        try:
+            os.remove(dump_path)
+        except OSError:
+            pass
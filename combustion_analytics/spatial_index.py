@@ -0,0 +1,92 @@
+# importing the required libraries
+import numpy as np # for the vectorised tile arithmetic
+
+
+# the tile zoom levels pre-aggregated by the index (at zoom z the world is split into 2^z x 2^z web-mercator tiles,
+# so zoom 3 puts the contiguous US in a handful of tiles and zoom 10 gives tiles of about 30 km)
+TILE_ZOOM_LEVELS = list(range(3, 11))
+
+# the number of tiles across the visible area the fitted zoom level aims for, enough detail without crowding the map
+MAP_TILES_ACROSS = 24
+
+# the latitude limit of the web-mercator projection
+MERCATOR_MAX_LATITUDE = 85.05112878
+
+# the margin (in degrees) added around an area's facilities when fitting the map to them
+AREA_MARGIN_DEGREES = 0.5
+
+
+# helper function for keeping one row per facility with coordinates: its name, state, location,
+# number of combustion units and total energy use (the prepared dataset holds one row per combustion unit)
+def facility_locations(cleaned_df):
+    located_df = cleaned_df.dropna(subset=['LATITUDE', 'LONGITUDE'])
+    return located_df.groupby('FACILITY_ID', sort=True) \
+            .agg(FACILITY_NAME=('FACILITY_NAME', 'first'), STATE=('STATE', 'first'),
+                 LATITUDE=('LATITUDE', 'first'), LONGITUDE=('LONGITUDE', 'first'),
+                 units=('MMBtu_TOTAL', 'size'), MMBtu_TOTAL=('MMBtu_TOTAL', 'sum')) \
+            .reset_index()
+
+
+# helper function for the "name (state)" label of every facility, built once with the index it labels
+# so a facility picker looks its options up instead of formatting them on every rerun
+def facility_labels(facilities):
+    return (facilities['FACILITY_NAME'].astype(str) + ' (' + facilities['STATE'].astype(str) + ')').tolist()
+
+
+# helper function for finding the web-mercator tile of every coordinate at a zoom level
+def tile_coordinates(latitude, longitude, zoom):
+    n_tiles = 2 ** zoom
+    lat_rad = np.radians(np.clip(np.asarray(latitude, dtype='float64'), -MERCATOR_MAX_LATITUDE, MERCATOR_MAX_LATITUDE))
+    tile_x = np.floor((np.asarray(longitude, dtype='float64') + 180.0) / 360.0 * n_tiles)
+    tile_y = np.floor((1.0 - np.arcsinh(np.tan(lat_rad)) / np.pi) / 2.0 * n_tiles)
+    return np.clip(tile_x, 0, n_tiles - 1).astype('int64'), np.clip(tile_y, 0, n_tiles - 1).astype('int64')
+
+
+# helper function for pre-aggregating the facilities per tile at every zoom level: the number of facilities,
+# their units and energy use, and their mean position (so a tile's marker sits where its facilities are);
+# every level is sorted by tile so a visible area is found with a binary search
+def build_tile_index(facilities, zoom_levels=TILE_ZOOM_LEVELS):
+    tile_index = {}
+    for zoom in zoom_levels:
+        tile_x, tile_y = tile_coordinates(facilities['LATITUDE'], facilities['LONGITUDE'], zoom)
+        tile_index[zoom] = facilities.assign(tile_x=tile_x, tile_y=tile_y) \
+                .groupby(['tile_x', 'tile_y'], sort=True) \
+                .agg(facilities=('FACILITY_ID', 'size'), units=('units', 'sum'), MMBtu_TOTAL=('MMBtu_TOTAL', 'sum'),
+                     LATITUDE=('LATITUDE', 'mean'), LONGITUDE=('LONGITUDE', 'mean')) \
+                .reset_index()
+    return tile_index
+
+
+# helper function for the bounds (lat_min, lat_max, lon_min, lon_max) around the facilities of a state,
+# or around every facility when no state is given
+def area_bounds(facilities, state=None):
+    if state is not None:
+        facilities = facilities.loc[facilities['STATE'] == state]
+    return (facilities['LATITUDE'].min() - AREA_MARGIN_DEGREES, facilities['LATITUDE'].max() + AREA_MARGIN_DEGREES,
+            facilities['LONGITUDE'].min() - AREA_MARGIN_DEGREES, facilities['LONGITUDE'].max() + AREA_MARGIN_DEGREES)
+
+
+# helper function for the deepest indexed zoom level at which the bounds span at most MAP_TILES_ACROSS tiles
+def zoom_for_bounds(bounds, zoom_levels=TILE_ZOOM_LEVELS, tiles_across=MAP_TILES_ACROSS):
+    lon_span = max(bounds[3] - bounds[2], 1e-6)
+    fitted = [zoom for zoom in zoom_levels if lon_span / 360.0 * 2 ** zoom <= tiles_across]
+    return max(fitted) if fitted else min(zoom_levels)
+
+
+# helper function for reading only the tiles of a zoom level that intersect the bounds:
+# a binary search on the sorted tile columns, then a filter on the tile rows of that slice
+def query_tiles(tile_index, zoom, bounds):
+    tiles = tile_index[zoom]
+    lat_min, lat_max, lon_min, lon_max = bounds
+    # the northern edge has the smaller tile row in web-mercator
+    (x_min, x_max), (y_max, y_min) = tile_coordinates([lat_min, lat_max], [lon_min, lon_max], zoom)
+    tile_x = tiles['tile_x'].to_numpy()
+    visible = tiles.iloc[np.searchsorted(tile_x, x_min, side='left'):np.searchsorted(tile_x, x_max, side='right')]
+    return visible.loc[visible['tile_y'].between(y_min, y_max)]
+
+
+# helper function for the facilities inside the bounds
+def query_facilities(facilities, bounds):
+    lat_min, lat_max, lon_min, lon_max = bounds
+    return facilities.loc[facilities['LATITUDE'].between(lat_min, lat_max)
+                          & facilities['LONGITUDE'].between(lon_min, lon_max)]
@@ -0,0 +1,124 @@
+# importing the required libraries
+import argparse # for reading the generator options from the command line
+import os # for file system paths
+import numpy as np # for numerical operations and random sampling
+import pandas as pd # for data manipulation and analysis with DataFrames
+from .prepared_dataset import load_combustion__energy_dataset, resolve_dataset_path # for the source dataset
+
+
+# the columns that describe a facility rather than one of its units, sampled together from a real facility
+# so a synthetic facility keeps a consistent state, region, industry and location
+FACILITY_COLUMNS = ['REPORTING_YEAR', 'COUNTY', 'COUNTY_FIPS', 'LATITUDE', 'LONGITUDE', 'STATE', 'ZIP',
+                    'PRIMARY_NAICS_CODE', 'PRIMARY_NAICS_TITLE', 'CENSUS_PLACE_NAME', 'MECS_Region', 'GROUPING']
+
+# the unit-level columns sampled from their observed value frequencies (missing values included)
+UNIT_CATEGORY_COLUMNS = ['FUEL_TYPE', 'FUEL_TYPE_BLEND', 'FUEL_TYPE_OTHER', 'OTHER_OR_BLEND_FUEL_TYPE', 'UNIT_TYPE',
+                         'COGENERATION_UNIT_EMISS_IND']
+
+# the number of quantiles kept of the log energy distribution, enough to follow its heavy tail
+ENERGY_QUANTILES = 1001
+
+# the number of rows generated and written per chunk by default
+CHUNK_ROWS = 500_000
+
+
+# helper function for learning the column-level distributions of the source dataset
+def learn_dataset_model(raw_df):
+    model = {'columns': list(raw_df.columns)}
+
+    # keeping one row per real facility, with its number of units as the facility -> unit fan-out
+    facility_groups = raw_df.groupby('FACILITY_ID', sort=False)
+    facility_df = facility_groups[[col for col in FACILITY_COLUMNS if col in raw_df.columns]].first()
+    facility_df['unit_count'] = facility_groups.size()
+    model['facilities'] = facility_df.reset_index(drop=True)
+
+    # counting the value frequencies of the unit-level categories
+    model['unit_categories'] = {col: raw_df[col].value_counts(dropna=False, normalize=True)
+                                for col in UNIT_CATEGORY_COLUMNS if col in raw_df.columns}
+
+    # keeping the quantiles of the positive energy values on a log scale, plus the share of zero and missing values
+    energy = raw_df['MMBtu_TOTAL']
+    positive_energy = energy[energy > 0]
+    model['energy_log_quantiles'] = np.quantile(np.log(positive_energy), np.linspace(0, 1, ENERGY_QUANTILES))
+    model['energy_missing_share'] = energy.isna().mean()
+    model['energy_zero_share'] = (energy <= 0).mean()
+
+    # deriving GWht_TOTAL from MMBtu_TOTAL with the ratio observed in the dataset (the MMBtu -> GWh conversion)
+    model['gwht_per_mmbtu'] = (raw_df['GWht_TOTAL'][energy > 0] / positive_energy).median()
+    return model
+
+
+# helper function for sampling the energy use of n units from the learned heavy-tailed distribution
+def sample_energy(model, n, rng):
+    quantile_positions = np.linspace(0, 1, len(model['energy_log_quantiles']))
+    mmbtu = np.exp(np.interp(rng.random(n), quantile_positions, model['energy_log_quantiles']))
+    kind = rng.random(n)
+    mmbtu[kind < model['energy_zero_share']] = 0.0
+    mmbtu[kind > 1 - model['energy_missing_share']] = np.nan
+    return mmbtu, mmbtu * model['gwht_per_mmbtu']
+
+
+# helper function for generating one chunk of synthetic units, continuing the facility ids of the previous chunk
+def generate_chunk(model, n_rows, first_facility_id, rng):
+    facilities = model['facilities']
+
+    # sampling whole real facilities until they hold enough units, then cutting the last one at the chunk size
+    sampled = []
+    sampled_units = 0
+    while sampled_units < n_rows:
+        batch = rng.integers(0, len(facilities), size=max(1, int(n_rows / facilities['unit_count'].mean() * 1.1)))
+        sampled.append(batch)
+        sampled_units += facilities['unit_count'].to_numpy()[batch].sum()
+    facility_rows = facilities.iloc[np.concatenate(sampled)].reset_index(drop=True)
+    unit_counts = facility_rows.pop('unit_count').to_numpy()
+    facility_ids = first_facility_id + np.arange(len(facility_rows))
+
+    # repeating every facility's attributes once per unit, numbering its units from 1
+    row_facility = np.repeat(np.arange(len(facility_rows)), unit_counts)[:n_rows]
+    chunk_df = facility_rows.iloc[row_facility].reset_index(drop=True)
+    unit_numbers = np.arange(len(row_facility)) - np.repeat(np.cumsum(unit_counts) - unit_counts, unit_counts)[:n_rows] + 1
+    chunk_df['FACILITY_ID'] = facility_ids[row_facility]
+    chunk_df['FACILITY_NAME'] = "Synthetic Facility " + pd.Series(facility_ids[row_facility]).astype(str)
+    chunk_df['UNIT_NAME'] = "Unit " + pd.Series(unit_numbers).astype(str)
+
+    # sampling the unit-level categories and the energy use independently of the facility
+    for col, frequencies in model['unit_categories'].items():
+        chunk_df[col] = rng.choice(frequencies.index.to_numpy(dtype=object), size=n_rows, p=frequencies.to_numpy())
+    chunk_df['MMBtu_TOTAL'], chunk_df['GWht_TOTAL'] = sample_energy(model, n_rows, rng)
+
+    next_facility_id = int(facility_ids[row_facility[-1]]) + 1
+    return chunk_df[model['columns']], next_facility_id
+
+
+# helper function for writing an arbitrarily large synthetic dataset in fixed-size chunks,
+# so memory use depends on the chunk size rather than on the number of rows
+def generate_synthetic_dataset(output_path, n_rows, dataset_path=None, chunk_rows=CHUNK_ROWS, seed=0):
+    model = learn_dataset_model(load_combustion__energy_dataset(dataset_path or resolve_dataset_path()))
+    rng = np.random.default_rng(seed)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    # writing to a temporary file first so a partly written dataset is never picked up
+    tmp_path = output_path + f".{os.getpid()}.tmp"
+    next_facility_id, rows_written = 1, 0
+    while rows_written < n_rows:
+        chunk_df, next_facility_id = generate_chunk(model, min(chunk_rows, n_rows - rows_written), next_facility_id, rng)
+        chunk_df.to_csv(tmp_path, mode='w' if rows_written == 0 else 'a', header=rows_written == 0, index=False,
+                        encoding="utf-8")
+        rows_written += len(chunk_df)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+# generating a synthetic dataset with the schema of the source file from the command line, e.g.
+# python -m combustion_analytics.synthetic_dataset --rows 5000000 --output data_source/synthetic/IndustrialCombEnergy_5M.csv
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset matching the NREL combustion energy schema.")
+    parser.add_argument("--rows", type=int, required=True, help="number of combustion units to generate")
+    parser.add_argument("--output", required=True, help="path of the generated CSV file")
+    parser.add_argument("--dataset", help="path of the dataset the distributions are learned from")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="number of rows generated per chunk")
+    parser.add_argument("--seed", type=int, default=0, help="random seed, for reproducible files")
+    args = parser.parse_args()
+
+    print(f"wrote {args.rows:,} rows to "
+          f"{generate_synthetic_dataset(args.output, args.rows, args.dataset, args.chunk_rows, args.seed)}")
@@ -0,0 +1,207 @@
+# importing the required libraries
+import glob # for listing the partition files
+import json # for reading and writing the store manifest
+import os # for file system paths
+import pickle # for persisting the per-partition aggregates
+import sys # for reading the command line arguments
+import pandas as pd # for data manipulation and analysis with DataFrames
+import pyarrow.feather as feather # for reading and writing the partition files
+from .aggregate_store import dataset_hash, county_fips_codes # for detecting changed source files and keying the counties
+from .columnar_store import COLUMNAR_SCHEMA, concat_shared_dictionary # for the stored schema and combining partitions
+from .prepared_dataset import transform_combustion_dataset, clean_combustion_dataset # for cleaning every partition
+from .data_quality import column_profile, schema_drift # for flagging schema changes between the yearly files
+
+
+# bumping this value forces every registered file to be processed again (e.g. after changing the partial aggregates)
+YEARLY_STORE_VERSION = 6
+
+# the default location of the partitioned store, next to the dataset files
+DEFAULT_STORE_DIR = "data_source/yearly_store"
+
+# the dimensions whose energy totals and unit counts are pre-aggregated for every partition
+AGGREGATE_DIMENSIONS = ['MECS_Region', 'STATE', 'PRIMARY_NAICS_TITLE', 'GROUPING']
+
+
+# helper function for locating the files of one (reporting year, source file) partition
+def partition_paths(store_dir, year, file_stem):
+    partition_dir = os.path.join(store_dir, f"year={year}")
+    return os.path.join(partition_dir, f"{file_stem}.feather"), os.path.join(partition_dir, f"{file_stem}.aggregates.pkl")
+
+
+# helper function for reading the store manifest, which records the checksum and years of every registered file
+def read_manifest(store_dir):
+    try:
+        with open(os.path.join(store_dir, 'manifest.json')) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get('version') != YEARLY_STORE_VERSION:
+        manifest = {'version': YEARLY_STORE_VERSION, 'files': {}}
+    return manifest
+
+
+# helper function for writing the store manifest atomically
+def write_manifest(store_dir, manifest):
+    manifest_path = os.path.join(store_dir, 'manifest.json')
+    with open(manifest_path + '.tmp', 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+
+# helper function for computing the mergeable (sum and count) aggregates of one cleaned partition
+def partition_aggregates(cleaned_df):
+    aggregates = {dimension: cleaned_df.groupby(dimension, observed=True)['MMBtu_TOTAL'].agg(['sum', 'count'])
+                  for dimension in AGGREGATE_DIMENSIONS}
+    # keying the county totals on the 5-digit FIPS codes, as the number of counties grows with every year loaded
+    aggregates['COUNTY_FIPS'] = cleaned_df.groupby(county_fips_codes(cleaned_df['COUNTY_FIPS']))['MMBtu_TOTAL'] \
+            .agg(['sum', 'count'])
+    return aggregates
+
+
+# helper function for writing a file atomically: the writer fills a temporary file that is then moved into place,
+# so an interrupted ingest never leaves a partly written partition behind
+def write_atomically(target_path, write):
+    tmp_path = f"{target_path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, target_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# helper function for casting a source file's raw columns to the stored schema, checked against it first:
+# returns the typed columns, the file's column profile and its drift from the reference file, raising a ValueError
+# listing the drift when a column of the stored schema is missing or cannot be cast to its stored type
+def cast_yearly_file(raw_df, file_key, reference_columns=None):
+    columns = column_profile(raw_df)
+    drift = schema_drift(reference_columns, columns) if reference_columns else []
+    problems = [f"missing column {col} of the stored schema" for col in COLUMNAR_SCHEMA if col not in columns]
+    typed_columns = {}
+    for col, dtype in COLUMNAR_SCHEMA.items():
+        if col not in columns:
+            continue
+        try:
+            typed_columns[col] = raw_df[col].astype(dtype) if dtype else raw_df[col]
+        except (ValueError, TypeError):
+            problems.append(f"column {col} ({columns[col]['dtype']}) cannot be read as {dtype}")
+    if problems:
+        raise ValueError(f"Schema drift in {file_key}: {'; '.join(problems + drift)}")
+    return pd.DataFrame(typed_columns), columns, drift
+
+
+# helper function for writing one source file's rows into a partition per reporting year,
+# returning the years written, the file's column profile and its schema drift from the reference file
+def ingest_yearly_file(dataset_path, store_dir, file_stem, reference_columns=None):
+    raw_df = pd.read_csv(dataset_path, encoding="utf-8")
+    # checking the raw columns before casting, so a renamed or retyped column is reported as drift
+    typed_df, columns, drift = cast_yearly_file(raw_df, os.path.basename(dataset_path), reference_columns)
+    years = []
+    for year, year_df in typed_df.groupby(raw_df['REPORTING_YEAR']):
+        year = int(year)
+        # cleaning the partition exactly like the single-year dataset
+        cleaned_df = clean_combustion_dataset(transform_combustion_dataset(year_df))
+
+        columnar_path, aggregates_path = partition_paths(store_dir, year, file_stem)
+        os.makedirs(os.path.dirname(columnar_path), exist_ok=True)
+        write_atomically(columnar_path, lambda tmp_path: feather.write_feather(cleaned_df, tmp_path,
+                                                                                compression='uncompressed'))
+        aggregates = partition_aggregates(cleaned_df)
+
+        def write_aggregates(tmp_path):
+            with open(tmp_path, 'wb') as aggregates_file:
+                pickle.dump(aggregates, aggregates_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        write_atomically(aggregates_path, write_aggregates)
+        years.append(year)
+    return years, columns, drift
+
+
+# helper function for removing the partitions previously written for a source file
+def remove_file_partitions(store_dir, file_stem, years):
+    for year in years:
+        for partition_path in partition_paths(store_dir, year, file_stem):
+            if os.path.exists(partition_path):
+                os.remove(partition_path)
+
+
+# helper function for registering yearly dataset files into the partitioned store,
+# only processing the files whose checksum changed since they were last registered
+def register_dataset_files(dataset_paths, store_dir=DEFAULT_STORE_DIR):
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = read_manifest(store_dir)
+    processed_files = []
+    for dataset_path in dataset_paths:
+        file_key = os.path.basename(dataset_path)
+        file_stem = os.path.splitext(file_key)[0]
+        checksum = dataset_hash(dataset_path)
+        registered = manifest['files'].get(file_key)
+        if registered and registered['checksum'] == checksum:
+            continue
+
+        # comparing the file's columns with the latest reporting year already registered from another file
+        reference = max((other for other_key, other in manifest['files'].items() if other_key != file_key),
+                        key=lambda other: max(other['years'], default=0), default=None)
+        years, columns, drift = ingest_yearly_file(dataset_path, store_dir, file_stem,
+                                                   reference['columns'] if reference else None)
+        # replacing the partitions of a changed file (the years it still holds were just overwritten),
+        # leaving every other file's partitions untouched
+        if registered:
+            remove_file_partitions(store_dir, file_stem, [year for year in registered['years'] if year not in years])
+        manifest['files'][file_key] = {'checksum': checksum, 'years': years, 'columns': columns, 'schema_drift': drift}
+        # recording each file as soon as it is done, so an interrupted run resumes where it stopped
+        write_manifest(store_dir, manifest)
+        processed_files.append(file_key)
+    return processed_files
+
+
+# helper function for listing the reporting years held in the store
+def available_years(store_dir=DEFAULT_STORE_DIR):
+    manifest = read_manifest(store_dir)
+    return sorted({year for registered in manifest['files'].values() for year in registered['years']})
+
+
+# helper function for listing the partition files of the selected reporting years (all years when None)
+def selected_partitions(store_dir, pattern, years=None):
+    years = available_years(store_dir) if years is None else years
+    return [(year, partition_path) for year in years
+            for partition_path in sorted(glob.glob(os.path.join(store_dir, f"year={year}", pattern)))]
+
+
+# helper function for loading the cleaned rows of the selected reporting years only, with a REPORTING_YEAR column
+def load_yearly_dataset(store_dir=DEFAULT_STORE_DIR, years=None):
+    year_frames = [feather.read_table(partition_path, memory_map=True).to_pandas().assign(REPORTING_YEAR=year)
+                   for year, partition_path in selected_partitions(store_dir, '*.feather', years)]
+    if not year_frames:
+        return pd.DataFrame(columns=list(COLUMNAR_SCHEMA) + ['REPORTING_YEAR'])
+    # sharing one dictionary per categorical column, as partitions with different categories concatenate to plain strings
+    return concat_shared_dictionary(year_frames)
+
+
+# helper function for combining the stored partial aggregates of a dimension, per year or across the selected years,
+# returning the total, unit count and average energy use without loading any rows
+def yearly_energy_aggregates(dimension, store_dir=DEFAULT_STORE_DIR, years=None, per_year=False):
+    partials = []
+    for year, aggregates_path in selected_partitions(store_dir, '*.aggregates.pkl', years):
+        with open(aggregates_path, 'rb') as aggregates_file:
+            partial = pickle.load(aggregates_file)[dimension]
+        partial.index = partial.index.astype(str)
+        partials.append(partial.assign(REPORTING_YEAR=year))
+    if not partials:
+        return pd.DataFrame(columns=['sum', 'count', 'mean'])
+
+    group_keys = ['REPORTING_YEAR', dimension] if per_year else [dimension]
+    combined = pd.concat(partials).rename_axis(dimension).reset_index().groupby(group_keys)[['sum', 'count']].sum()
+    combined['mean'] = combined['sum'] / combined['count']
+    return combined
+
+
+# registering the given yearly CSV files from the command line, e.g.
+# python -m combustion_analytics.yearly_store data_source/IndustrialCombEnergy_*_utf-8_version.csv
+if __name__ == "__main__":
+    processed = register_dataset_files(sys.argv[1:])
+    print(f"processed {len(processed)} changed file(s): {', '.join(processed) or '-'}")
+    for file_key, registered in read_manifest(DEFAULT_STORE_DIR)['files'].items():
+        if file_key in processed and registered['schema_drift']:
+            print(f"schema drift in {file_key}: {'; '.join(registered['schema_drift'])}")
+    print(f"reporting years in the store: {available_years()}")
@@ -0,0 +1,32 @@
+# importing the required libraries
+import numpy as np # for the random unit rows
+import pandas as pd # for building the test frames
+import pytest # for the shared fixtures
+
+
+# the facilities of the test frame: (name, state, MECS region, NAICS code, NAICS title, industry group, county FIPS)
+TEST_FACILITIES = [
+    ('Alpha Paper Mill', 'WI', 'Midwest', 322121, 'Paper Mills', 'Paper', 55009.0),
+    ('Beta Chemical Plant', 'TX', 'South', 325110, 'Petrochemical Manufacturing', 'Chemicals', 48201.0),
+    ('Gamma Refinery', 'TX', 'South', 324110, 'Petroleum Refineries', 'Refining', 48245.0),
+    ('Delta Steel Works', 'OH', 'Midwest', 331110, 'Iron and Steel Mills', 'Iron and Steel', np.nan),
+    ('Epsilon Foods', 'CA', 'West', 311421, 'Fruit and Vegetable Canning', 'Food', 6019.0),
+]
+
+
+# helper function for a small cleaned frame with plain object columns, as the notebook builds it from the CSV
+@pytest.fixture
+def object_cleaned_df():
+    rng = np.random.default_rng(0)
+    facility_rows = rng.integers(0, len(TEST_FACILITIES), 200)
+    facilities = pd.DataFrame(TEST_FACILITIES, columns=['FACILITY_NAME', 'STATE', 'MECS_Region', 'PRIMARY_NAICS_CODE',
+                                                        'PRIMARY_NAICS_TITLE', 'GROUPING', 'COUNTY_FIPS'])
+    cleaned_df = facilities.iloc[facility_rows].reset_index(drop=True)
+    cleaned_df['FACILITY_ID'] = facility_rows + 1000
+    cleaned_df['COUNTY'] = cleaned_df['STATE'] + ' County'
+    cleaned_df['FUEL_TYPE'] = rng.choice(['Natural Gas', 'Coal', 'Fuel Oil', 'Biomass'], len(cleaned_df))
+    cleaned_df['UNIT_TYPE'] = rng.choice(['Boiler', 'Furnace', 'Turbine'], len(cleaned_df))
+    cleaned_df['COGENERATION_UNIT_EMISS_IND'] = rng.choice(['Yes', 'No'], len(cleaned_df))
+    cleaned_df['MMBtu_TOTAL'] = rng.lognormal(10, 2, len(cleaned_df))
+    cleaned_df['GWht_TOTAL'] = cleaned_df['MMBtu_TOTAL'] * 0.000293
+    return cleaned_df
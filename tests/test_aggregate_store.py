@@ -0,0 +1,60 @@
+# importing the required libraries
+import os # for listing the stored aggregates
+import pandas as pd # for the categorical copy of the test frame
+import pytest # for comparing the energy totals
+from combustion_analytics import aggregate_store # for the store path and the stored aggregates
+from combustion_analytics.aggregate_store import build_key_insights_aggregates, county_energy_aggregates # for the aggregates
+
+
+# checking the aggregates build from the notebook's plain object columns, not only from the dictionary-encoded frame
+def test_aggregates_on_object_columns(object_cleaned_df):
+    assert not any(isinstance(dtype, pd.CategoricalDtype) for dtype in object_cleaned_df.dtypes)
+    aggregates = build_key_insights_aggregates(object_cleaned_df)
+
+    unit_counts = object_cleaned_df['FACILITY_NAME'].value_counts()
+    assert aggregates['facility_units_top'].to_dict() == unit_counts.to_dict()
+    crosstab = aggregates['facility_unit_type_crosstab']
+    assert list(crosstab.index) == list(aggregates['facility_units_top'].index)
+    assert crosstab.sum(axis=1).to_dict() == unit_counts.to_dict()
+
+
+# checking the object and categorical frames give the same unit type crosstab
+def test_aggregates_match_categorical_columns(object_cleaned_df):
+    text_columns = object_cleaned_df.select_dtypes(exclude='number').columns
+    categorical_df = object_cleaned_df.astype({col: 'category' for col in text_columns})
+    object_crosstab = build_key_insights_aggregates(object_cleaned_df)['facility_unit_type_crosstab']
+    categorical_crosstab = build_key_insights_aggregates(categorical_df)['facility_unit_type_crosstab']
+    # (facilities tied on their number of units may come in either order)
+    pd.testing.assert_frame_equal(object_crosstab.sort_index(), categorical_crosstab.sort_index(), check_names=False,
+                                  check_index_type=False, check_column_type=False, check_categorical=False)
+
+
+# checking the stored aggregates are keyed on the cleaning version, and a new store replaces the superseded ones
+def test_store_keyed_on_cleaning_version(object_cleaned_df, tmp_path, monkeypatch):
+    dataset_path = tmp_path / 'dataset.csv'
+    dataset_path.write_text('rows')
+    current_path = aggregate_store.aggregate_store_path(str(dataset_path), 'abc')
+    monkeypatch.setattr(aggregate_store, 'PREPARED_DATASET_VERSION', aggregate_store.PREPARED_DATASET_VERSION + 1)
+    new_path = aggregate_store.aggregate_store_path(str(dataset_path), 'abc')
+    assert new_path != current_path
+
+    os.makedirs(os.path.dirname(current_path))
+    open(current_path, 'wb').close()
+    aggregate_store.load_or_build_aggregates(object_cleaned_df, str(dataset_path), data_hash='abc')
+    assert os.listdir(os.path.dirname(new_path)) == [os.path.basename(new_path)]
+
+
+# checking the county aggregates are keyed on 5-digit FIPS codes, leave out units without a county
+# and hold the energy use and fuel mix of the units they cover
+def test_county_aggregates(object_cleaned_df):
+    county_aggregates = county_energy_aggregates(object_cleaned_df)
+    county_energy, county_fuel_mix = county_aggregates['county_energy'], county_aggregates['county_fuel_mix']
+    located_df = object_cleaned_df.dropna(subset=['COUNTY_FIPS'])
+
+    assert sorted(county_energy.index) == ['06019', '48201', '48245', '55009']
+    assert county_energy['units'].sum() == len(located_df)
+    assert county_fuel_mix.sum().sum() == pytest.approx(located_df['MMBtu_TOTAL'].sum())
+    assert county_energy['MMBtu_TOTAL'].to_dict() == pytest.approx(county_fuel_mix.sum(axis=1).to_dict())
+    california = located_df.loc[located_df['STATE'] == 'CA'].groupby('FUEL_TYPE')['MMBtu_TOTAL'].sum()
+    assert county_energy.loc['06019', 'main_fuel'] == california.idxmax()
+    assert county_energy.loc['06019', 'main_fuel_share'] == pytest.approx(california.max() / california.sum())
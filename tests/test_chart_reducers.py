@@ -0,0 +1,51 @@
+# importing the required libraries
+import numpy as np # for the test series
+import pandas as pd # for the reference quantiles
+from combustion_analytics.chart_reducers import reduce_scatter, box_statistics, histogram_counts # for the reducers under test
+
+
+# checking the LTTB sample keeps the first and last points and returns exactly the requested number of points
+def test_lttb_keeps_endpoints_and_budget():
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(0, 100, 5000), rng.lognormal(5, 2, 5000)
+    x_reduced, y_reduced, counts = reduce_scatter(x, y, point_budget=300, mode='lttb')
+    first, last = np.argmin(x), np.argmax(x)
+
+    assert counts is None
+    assert len(x_reduced) == len(y_reduced) == 300
+    assert (x_reduced[0], y_reduced[0]) == (x[first], y[first])
+    assert (x_reduced[-1], y_reduced[-1]) == (x[last], y[last])
+    assert np.all(np.diff(x_reduced) >= 0)
+
+
+# checking the box statistics match pandas' quartiles, with whiskers at the furthest values inside the Tukey fences
+def test_box_whiskers_match_tukey_fences():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'FUEL_TYPE': pd.Categorical(rng.choice(['Coal', 'Natural Gas', 'Biomass'], 3000)),
+                       'MMBtu_TOTAL': rng.lognormal(8, 1.5, 3000)})
+    box_stats, outliers = box_statistics(df, 'FUEL_TYPE', 'MMBtu_TOTAL', outlier_cap=5)
+
+    for fuel, values in df.groupby('FUEL_TYPE', observed=True)['MMBtu_TOTAL']:
+        q1, median, q3 = values.quantile([0.25, 0.5, 0.75])
+        inside = values[values.between(q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))]
+        assert np.allclose(box_stats.loc[fuel, ['q1', 'median', 'q3']].astype(float), [q1, median, q3])
+        assert box_stats.loc[fuel, 'lowerfence'] == inside.min()
+        assert box_stats.loc[fuel, 'upperfence'] == inside.max()
+        assert box_stats.loc[fuel, 'count'] == len(values)
+        # keeping the capped number of outliers, all of them outside the fences
+        fuel_outliers = outliers.loc[outliers['FUEL_TYPE'] == fuel, 'MMBtu_TOTAL']
+        assert len(fuel_outliers) == min(5, len(values) - len(inside))
+        assert not fuel_outliers.isin(inside).any()
+
+
+# checking the server-side bins count every finite value once, with zero and negative values in the first log bin
+def test_histogram_counts_every_value():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.lognormal(8, 2, 1000), [0.0, -5.0, np.nan]])
+    linear_counts, linear_edges = histogram_counts(values, nbins=20)
+    log_counts, log_edges = histogram_counts(values, nbins=20, scale='log')
+
+    assert linear_counts.sum() == log_counts.sum() == 1002
+    assert np.allclose(linear_counts, np.histogram(values[np.isfinite(values)], bins=20)[0])
+    assert np.allclose(np.diff(np.log(log_edges)), np.log(log_edges[1] / log_edges[0]))
+    assert log_counts[0] == np.histogram(values[values > 0], bins=log_edges)[0][0] + 2
@@ -0,0 +1,43 @@
+# importing the required libraries
+import re # for matching the drift message literally
+import numpy as np # for the missing test values
+import pytest # for checking the raised schema drift
+from combustion_analytics.data_quality import column_profile, quality_profile, schema_drift # for the profile under test
+from combustion_analytics.yearly_store import cast_yearly_file # for the check breaking drift goes through
+
+
+# checking a removed column is reported as drift and stops the file being cast to the stored schema
+def test_removed_column_is_breaking(object_cleaned_df):
+    raw_df = object_cleaned_df.assign(REPORTING_YEAR=2014, UNIT_NAME='Unit 1', CENSUS_PLACE_NAME='Place',
+                                      LATITUDE=30.0, LONGITUDE=-95.0)
+    drifted_df = raw_df.drop(columns='COUNTY_FIPS').assign(FIPS=1)
+    drift = schema_drift(column_profile(raw_df), column_profile(drifted_df))
+
+    assert drift == ['added column FIPS (int64)', 'removed column COUNTY_FIPS']
+    with pytest.raises(ValueError, match=re.escape('missing column COUNTY_FIPS of the stored schema')) as raised:
+        cast_yearly_file(drifted_df, 'combustion_2015.csv', column_profile(raw_df))
+    assert 'removed column COUNTY_FIPS' in str(raised.value)
+    assert cast_yearly_file(raw_df, 'combustion_2015.csv', column_profile(raw_df))[2] == []
+
+
+# checking a retyped column is drift unless it holds no values in one of the files
+def test_retyped_column_drift(object_cleaned_df):
+    reference_columns = column_profile(object_cleaned_df)
+    retyped_df = object_cleaned_df.assign(MMBtu_TOTAL='unknown', COUNTY=np.nan)
+
+    assert schema_drift(reference_columns, column_profile(retyped_df)) == \
+        ['column MMBtu_TOTAL changed from float64 to str']
+
+
+# checking the profile counts the missing values of the kept columns and the duplicates left after cleaning
+def test_quality_profile_counts(object_cleaned_df):
+    raw_df = object_cleaned_df.copy()
+    raw_df.loc[:9, 'MMBtu_TOTAL'] = np.nan
+    profile = quality_profile(raw_df, ['FACILITY_ID', 'UNIT_TYPE', 'MMBtu_TOTAL'])
+    kept_df = raw_df[['FACILITY_ID', 'UNIT_TYPE', 'MMBtu_TOTAL']].dropna()
+
+    assert profile['rows'] == 200
+    assert profile['kept_nulls'] == {'FACILITY_ID': 0, 'UNIT_TYPE': 0, 'MMBtu_TOTAL': 10}
+    assert profile['cleaned_rows'] == 190
+    assert profile['duplicate_rows'] == kept_df.duplicated().sum()
+    assert profile['columns']['MMBtu_TOTAL']['nulls'] == 10
@@ -0,0 +1,43 @@
+# importing the required libraries
+import pandas as pd # for comparing the aggregates
+from combustion_analytics.aggregate_store import build_key_insights_aggregates # for the unfiltered reference
+from combustion_analytics.energy_cube import CUBE_FILTER_DIMENSIONS, CUBE_CHART_DIMENSIONS, build_energy_cube, \
+    build_facility_table, filter_state, slice_cube, slice_energy_cube, cube_category_counts, \
+    cube_key_insights_aggregates # for the filtered aggregates
+
+
+# checking every cube holds the filters plus at most one chart dimension, and no unit rows
+def test_cube_per_chart_dimension(object_cleaned_df):
+    cube = build_energy_cube(object_cleaned_df)
+    assert list(cube['filters'].columns) == CUBE_FILTER_DIMENSIONS + ['units', 'MMBtu_TOTAL']
+    for dimension in CUBE_CHART_DIMENSIONS:
+        assert list(cube[dimension].columns) == CUBE_FILTER_DIMENSIONS + [dimension, 'units', 'MMBtu_TOTAL']
+    assert all(cells['units'].sum() == len(object_cleaned_df) for cells in cube.values())
+    assert build_facility_table(object_cleaned_df)['units'].sum() == len(object_cleaned_df)
+
+
+# checking the filtered facility rankings, unit types, NAICS ranking and category counts match the aggregates of
+# the filtered rows
+def test_filtered_facility_aggregates_match_rows(object_cleaned_df):
+    cleaned_df = object_cleaned_df.astype({'FACILITY_NAME': 'category', 'UNIT_TYPE': 'category'})
+    cube, facility_table = build_energy_cube(cleaned_df), build_facility_table(cleaned_df)
+    for filters in [{'STATE': ['TX']}, {'FUEL_TYPE': ['Coal', 'Biomass'], 'COGENERATION_UNIT_EMISS_IND': ['No']}]:
+        filter_key = filter_state(filters)
+        filtered_cube = slice_energy_cube(cube, filter_key)
+        aggregates = cube_key_insights_aggregates(filtered_cube, facility_table, filter_key)
+        expected = build_key_insights_aggregates(slice_cube(cleaned_df, filter_key))
+        # (the value counts of a categorical column also list the facilities left out by the filters, with no units)
+        for key in ['facility_energy_top', 'facility_units_top']:
+            pd.testing.assert_series_equal(aggregates[key].sort_index(), expected[key].loc[lambda top: top > 0]
+                                           .sort_index(), check_names=False, check_index_type=False,
+                                           check_categorical=False)
+        expected_crosstab = expected['facility_unit_type_crosstab']
+        pd.testing.assert_frame_equal(aggregates['facility_unit_type_crosstab'].sort_index(),
+                                      expected_crosstab.loc[expected_crosstab.sum(axis=1) > 0].sort_index(),
+                                      check_names=False, check_index_type=False, check_column_type=False,
+                                      check_categorical=False)
+        pd.testing.assert_series_equal(aggregates['naics_energy_top'], expected['naics_energy_top'], check_names=False)
+        category_counts = cube_category_counts(filtered_cube)
+        for col in ['UNIT_TYPE', 'PRIMARY_NAICS_TITLE', 'FUEL_TYPE']:
+            assert category_counts[col].to_dict() == slice_cube(cleaned_df, filter_key)[col].value_counts() \
+                .loc[lambda counts: counts > 0].to_dict()
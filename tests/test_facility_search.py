@@ -0,0 +1,47 @@
+# importing the required libraries
+import pandas as pd # for the test facilities
+import pytest # for the parametrized misspellings
+from combustion_analytics import build_facility_search_index, search_facilities, facility_units
+
+
+# the test facilities, with multi-word names like the dataset's
+FACILITY_NAMES = ['EXXONMOBIL BAYTOWN REFINERY', 'EXXON MOBIL CHEMICAL - BEAUMONT', 'WARWICK POWER STATION',
+                  'FREEPORT LNG TERMINAL', 'VALERO PORT ARTHUR REFINERY', 'GEORGIA-PACIFIC PAPER MILL']
+
+
+# helper function for a cleaned frame with two units per test facility
+@pytest.fixture
+def search_index():
+    cleaned_df = pd.DataFrame({'FACILITY_ID': [1000 + i for i in range(len(FACILITY_NAMES)) for _ in range(2)],
+                               'FACILITY_NAME': [name for name in FACILITY_NAMES for _ in range(2)],
+                               'STATE': 'TX', 'UNIT_NAME': ['GP-1', 'GP-2'] * len(FACILITY_NAMES),
+                               'UNIT_TYPE': 'Boiler', 'FUEL_TYPE': 'Natural Gas',
+                               'COGENERATION_UNIT_EMISS_IND': 'No',
+                               'MMBtu_TOTAL': [float(100 - i) for i in range(2 * len(FACILITY_NAMES))],
+                               'GWht_TOTAL': 1.0})
+    return build_facility_search_index(cleaned_df)
+
+
+# checking a one-letter misspelling of one word of a multi-word name still finds the facility
+@pytest.mark.parametrize('query, expected_name', [
+    ('refinary', 'VALERO PORT ARTHUR REFINERY'),
+    ('warick', 'WARWICK POWER STATION'),
+    ('baytwn', 'EXXONMOBIL BAYTOWN REFINERY'),
+    ('exon', 'EXXON MOBIL CHEMICAL - BEAUMONT'),
+    ('freprt', 'FREEPORT LNG TERMINAL'),
+])
+def test_fuzzy_search_finds_misspelt_words(search_index, query, expected_name):
+    assert expected_name in search_facilities(search_index, query)['FACILITY_NAME'].tolist()
+
+
+# checking the prefix matches come first, the most energy-using first, and an unrelated query finds nothing
+def test_prefix_matches_rank_first(search_index):
+    assert search_facilities(search_index, 'refin')['FACILITY_NAME'].tolist()[:2] == \
+        ['EXXONMOBIL BAYTOWN REFINERY', 'VALERO PORT ARTHUR REFINERY']
+    assert search_facilities(search_index, 'zzqx').empty
+
+
+# checking a facility's drill-down slice holds exactly its own units
+def test_facility_units_slice(search_index):
+    position = search_index['facilities'].index[search_index['facilities']['FACILITY_NAME'] == 'FREEPORT LNG TERMINAL'][0]
+    assert facility_units(search_index, position)['MMBtu_TOTAL'].tolist() == [94.0, 93.0]
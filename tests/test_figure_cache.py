@@ -0,0 +1,43 @@
+# importing the required libraries
+import os # for creating the cache folders
+import plotly.graph_objects as go # for the cached test figures
+from combustion_analytics import figure_cache # for the figure cache key and pruning
+
+
+# checking every module shaping figure data, and the aggregate version, changes the cache key
+def test_cache_key_covers_data_modules(monkeypatch):
+    assert {'aggregate_store.py', 'energy_cube.py', 'naics_hierarchy.py'} <= set(figure_cache.FIGURE_SOURCE_MODULES)
+    current_dir = figure_cache.figure_cache_dir('data.csv', 'v1')
+    monkeypatch.setattr(figure_cache, 'AGGREGATE_STORE_VERSION', figure_cache.AGGREGATE_STORE_VERSION + 1)
+    figure_cache.figure_code_version.cache_clear()
+    assert figure_cache.figure_cache_dir('data.csv', 'v1') != current_dir
+    figure_cache.figure_code_version.cache_clear()
+
+
+# checking only the least recently used folders beyond the limit are dropped, whatever code version wrote them
+# (the old and new instances of a rolling deploy share the cache volume)
+def test_prune_cache_folders_by_count(tmp_path):
+    prefix = figure_cache.figure_cache_prefix()
+    # the folders from the least to the most recently used, alternating between an old and the current code version
+    names = [f"{prefix}v5-1-1", 'v1-a0-0123456789ab-v5-1-1', f"{prefix}v5-2-2", 'v1-a0-0123456789ab-v5-2-2']
+    for age, name in enumerate(names):
+        os.makedirs(tmp_path / name)
+        os.utime(tmp_path / name, (1000 + age, 1000 + age))
+    figure_cache.prune_cache_folders(str(tmp_path / names[2]), max_folders=2)
+    assert sorted(os.listdir(tmp_path)) == sorted(names[2:])
+    # the given folder is kept even when it is not among the most recently used
+    os.utime(tmp_path / names[2], (900, 900))
+    figure_cache.prune_cache_folders(str(tmp_path / names[2]), max_folders=1)
+    assert sorted(os.listdir(tmp_path)) == sorted(names[2:])
+
+
+# checking the figures read back from the cache equal the stored ones, nested figure groups included
+def test_cached_figures_round_trip(tmp_path):
+    figures = {'fig_1': go.Figure(go.Bar(x=['a', 'b'], y=[1, 2]), layout={'title': {'text': 'Bars'}}),
+               'fig_2': {'West': go.Figure(go.Scatter(x=[1, 2], y=[3, 4]))}}
+    figure_cache.store_figures(str(tmp_path / 'cache'), 'Page', ['linear'], figures)
+    cached = figure_cache.load_cached_figures(str(tmp_path / 'cache'), 'Page', ['linear'])
+    assert cached['fig_1'].layout.title.text == 'Bars'
+    assert cached['fig_1'].to_dict() == figures['fig_1'].to_dict()
+    assert cached['fig_2']['West'].to_dict() == figures['fig_2']['West'].to_dict()
+    assert figure_cache.load_cached_figures(str(tmp_path / 'cache'), 'Page', ['log']) is None
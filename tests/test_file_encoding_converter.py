@@ -0,0 +1,36 @@
+# importing the required libraries
+import os # for the test file paths
+import pytest # for checking the failed conversion
+from utils.file_encoding_converter import convertFileEncoding # for the converter under test
+
+
+# the text of the test files, with Windows-1252 characters that take two or three bytes in utf-8
+CP1252_LINE = "Café Façade Corp,Señor Ñandú Mill,Œuvre – “quoted” €125 naïve\n"
+
+
+# checking a cp1252 file spanning many chunks converts to utf-8 and back unchanged,
+# including the multi-byte characters split across chunk boundaries
+def test_cp1252_round_trip_across_chunks(tmp_path):
+    source_path, utf8_path, back_path = (os.path.join(tmp_path, name) for name in ('source.csv', 'utf8.csv', 'back.csv'))
+    source_bytes = (CP1252_LINE * 500).encode('cp1252')
+    with open(source_path, 'wb') as f_source:
+        f_source.write(source_bytes)
+
+    convertFileEncoding('cp1252', 'utf-8', source_path, utf8_path, chunk_size=1000)
+    convertFileEncoding('utf-8', 'cp1252', utf8_path, back_path, chunk_size=1001)
+
+    with open(utf8_path, 'rb') as f_utf8, open(back_path, 'rb') as f_back:
+        assert f_utf8.read().decode('utf-8') == CP1252_LINE * 500
+        assert f_back.read() == source_bytes
+    assert sorted(os.listdir(tmp_path)) == ['back.csv', 'source.csv', 'utf8.csv']
+
+
+# checking a conversion failing half way leaves neither a partly converted target nor a temporary file
+def test_failed_conversion_leaves_no_file(tmp_path):
+    source_path, target_path = os.path.join(tmp_path, 'source.csv'), os.path.join(tmp_path, 'target.csv')
+    with open(source_path, 'wb') as f_source:
+        f_source.write((CP1252_LINE * 100).encode('cp1252'))
+
+    with pytest.raises(UnicodeDecodeError):
+        convertFileEncoding('utf-8', 'cp1252', source_path, target_path, chunk_size=1000)
+    assert os.listdir(tmp_path) == ['source.csv']
@@ -0,0 +1,32 @@
+# importing the required libraries
+import subprocess # for importing the package in a fresh interpreter
+import sys # for the running interpreter
+import numpy as np # for the brute-force distances
+import pandas as pd # for the test facilities
+
+
+# checking the package import stays light: scikit-learn and scipy are only loaded with geo_query
+def test_package_import_skips_geo_dependencies():
+    loaded = subprocess.run([sys.executable, '-c', "import sys, combustion_analytics; "
+                             "print(sorted(m for m in ('sklearn', 'scipy') if m in sys.modules))"],
+                            capture_output=True, text=True, check=True).stdout.strip()
+    assert loaded == '[]'
+
+
+# checking the tree's radius query finds the same facilities as a brute-force haversine scan
+def test_radius_query_matches_brute_force():
+    from combustion_analytics.geo_query import EARTH_RADIUS, build_geo_index, facilities_within_radius, \
+        energy_within_radius, haversine_radians
+    rng = np.random.default_rng(0)
+    cleaned_df = pd.DataFrame({'FACILITY_ID': np.arange(300), 'FACILITY_NAME': [f"Plant {i}" for i in range(300)],
+                               'STATE': 'TX', 'LATITUDE': rng.uniform(28, 34, 300),
+                               'LONGITUDE': rng.uniform(-102, -94, 300),
+                               'FUEL_TYPE': rng.choice(['Natural Gas', 'Coal'], 300),
+                               'MMBtu_TOTAL': rng.uniform(1, 100, 300)})
+    geo_index = build_geo_index(cleaned_df)
+    distances = haversine_radians(*np.radians([29.76, -95.37]), np.radians(cleaned_df['LATITUDE']),
+                                  np.radians(cleaned_df['LONGITUDE'])) * EARTH_RADIUS['miles']
+    within = cleaned_df.loc[distances <= 100]
+
+    assert set(facilities_within_radius(geo_index, 29.76, -95.37, 100)['FACILITY_ID']) == set(within['FACILITY_ID'])
+    assert np.isclose(energy_within_radius(geo_index, 29.76, -95.37, 100).sum(), within['MMBtu_TOTAL'].sum())
@@ -0,0 +1,34 @@
+# importing the required libraries
+import numpy as np # for comparing the energy totals
+from combustion_analytics.naics_hierarchy import NAICS_LEVELS, build_naics_tree, naics_children # for the roll-up tree
+
+
+# checking every level of the roll-up sums to the grand total of the well-formed 6-digit codes
+def test_level_totals_equal_grand_total(object_cleaned_df):
+    cleaned_df = object_cleaned_df.copy()
+    cleaned_df.loc[:4, 'PRIMARY_NAICS_CODE'] = 3221
+    naics_tree = build_naics_tree(cleaned_df)
+    well_formed = cleaned_df.loc[cleaned_df['PRIMARY_NAICS_CODE'] >= 100000]
+
+    for level in NAICS_LEVELS:
+        level_df = naics_tree['levels'][level]
+        assert np.isclose(level_df['MMBtu_TOTAL'].sum(), well_formed['MMBtu_TOTAL'].sum())
+        assert level_df['units'].sum() == len(well_formed)
+        assert (level_df.index.str.len() == level).all()
+    assert sorted(naics_tree['levels'][2].index) == ['31', '32', '33']
+    assert naics_tree['levels'][2]['MMBtu_TOTAL'].is_monotonic_decreasing
+
+
+# checking the children of every node sum to the node and the drill-down reaches the industries
+def test_children_sum_to_parent(object_cleaned_df):
+    naics_tree = build_naics_tree(object_cleaned_df)
+    for level in NAICS_LEVELS[:-1]:
+        for code, node in naics_tree['levels'][level].iterrows():
+            children = naics_children(naics_tree, level, code)
+            assert (children['parent'] == code).all()
+            assert np.isclose(children['MMBtu_TOTAL'].sum(), node['MMBtu_TOTAL'])
+            assert children['MMBtu_TOTAL'].is_monotonic_decreasing
+
+    assert naics_children(naics_tree).equals(naics_tree['levels'][2])
+    assert list(naics_children(naics_tree, 5, '32411')['title']) == ['Petroleum Refineries']
+    assert naics_children(naics_tree, 6, '324110').empty
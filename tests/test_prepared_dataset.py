@@ -0,0 +1,32 @@
+# importing the required libraries
+import pandas as pd # for building and comparing the test frames
+from combustion_analytics import prepared_dataset_view # the page boundary under test
+
+
+# helper function for a prepared dataset like the cached one, with dictionary-encoded columns as the app loads them
+def cached_prepared_dataset(cleaned_df):
+    cleaned_df = cleaned_df.astype({'FACILITY_NAME': 'category', 'FUEL_TYPE': 'category', 'UNIT_TYPE': 'category'})
+    raw_summary = {'rows': len(cleaned_df), 'missing_values': {'COUNTY_FIPS': 1}}
+    return raw_summary, cleaned_df.copy(), cleaned_df
+
+
+# checking that a page mutating its frames in one rerun leaves the cached frames and the next rerun's frames untouched
+def test_page_mutations_do_not_leak_between_reruns(object_cleaned_df):
+    prepared = cached_prepared_dataset(object_cleaned_df)
+    expected = cached_prepared_dataset(object_cleaned_df)
+
+    # the first rerun writes through .loc, assigns whole columns, edits a categorical and the summary
+    raw_summary, transformed_df, cleaned_df = prepared_dataset_view(prepared)
+    cleaned_df.loc[cleaned_df['STATE'] == 'TX', 'MMBtu_TOTAL'] = 0.0
+    cleaned_df.loc[0, 'FUEL_TYPE'] = 'Coal'
+    cleaned_df['UNIT_TYPE'] = cleaned_df['UNIT_TYPE'].cat.rename_categories(str.upper)
+    cleaned_df['NEW_COLUMN'] = 1
+    transformed_df.loc[:, 'STATE'] = 'changed'
+    transformed_df.drop(columns='COUNTY', inplace=True)
+    raw_summary['missing_values']['COUNTY_FIPS'] = 0
+
+    # the cached frames, and the frames of the next rerun, are unchanged
+    for rerun_prepared in [prepared, prepared_dataset_view(prepared)]:
+        assert rerun_prepared[0] == expected[0]
+        pd.testing.assert_frame_equal(rerun_prepared[1], expected[1])
+        pd.testing.assert_frame_equal(rerun_prepared[2], expected[2])
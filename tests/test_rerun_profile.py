@@ -0,0 +1,37 @@
+# importing the required libraries
+import os # for the dump folder contents
+from combustion_analytics import rerun_profile # for the profiling mode, the profiler fallback and the dump limit
+
+
+# checking a visitor's query parameter can only ask for a cProfile when the environment enables profiling
+def test_cprofile_needs_the_environment(monkeypatch):
+    monkeypatch.delenv(rerun_profile.PROFILE_ENV_VAR, raising=False)
+    assert rerun_profile.profiling_mode('cprofile') == 'timers'
+    assert rerun_profile.profiling_mode('1') == 'timers'
+    assert rerun_profile.profiling_mode(None) is None
+    monkeypatch.setenv(rerun_profile.PROFILE_ENV_VAR, '1')
+    assert rerun_profile.profiling_mode('cprofile') == 'cprofile'
+    assert rerun_profile.profiling_mode(None) == 'timers'
+    assert rerun_profile.profiling_mode('0') == 'timers'
+
+
+# checking a rerun falls back to the stage timers when another profiler is already active
+def test_busy_profiler_falls_back_to_timers(monkeypatch):
+    class BusyProfile:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(rerun_profile.cProfile, 'Profile', BusyProfile)
+    profile = rerun_profile.start_rerun_profile('Key Insights', 'cprofile')
+    assert profile['mode'] == 'timers' and profile['profiler'] is None
+    assert rerun_profile.finish_rerun_profile(profile)['profile_path'] is None
+
+
+# checking only the latest cProfile dumps are kept
+def test_profile_dumps_are_capped(tmp_path):
+    for rerun in range(5):
+        dump_path = tmp_path / f"rerun-{rerun}.prof"
+        dump_path.write_bytes(b'')
+        os.utime(dump_path, (1000 + rerun, 1000 + rerun))
+    rerun_profile.prune_profile_dumps(str(tmp_path), max_dumps=2)
+    assert sorted(os.listdir(tmp_path)) == ['rerun-3.prof', 'rerun-4.prof']
@@ -0,0 +1,53 @@
+# importing the required libraries
+import numpy as np # for the random test coordinates
+import pandas as pd # for the test facilities
+from combustion_analytics.spatial_index import TILE_ZOOM_LEVELS, MAP_TILES_ACROSS, facility_locations, \
+    tile_coordinates, build_tile_index, area_bounds, zoom_for_bounds, query_tiles, query_facilities # for the map index
+
+
+# helper function for a frame of 2,000 units spread over 500 facilities across the contiguous US,
+# a few of them without coordinates
+def random_units_df():
+    rng = np.random.default_rng(0)
+    facility_ids = rng.integers(0, 500, 2000)
+    latitude, longitude = rng.uniform(25, 49, 500), rng.uniform(-124, -67, 500)
+    latitude[:5] = np.nan
+    return pd.DataFrame({'FACILITY_ID': facility_ids, 'FACILITY_NAME': [f"Plant {i}" for i in facility_ids],
+                         'STATE': np.where(longitude[facility_ids] < -100, 'West', 'East'),
+                         'LATITUDE': latitude[facility_ids], 'LONGITUDE': longitude[facility_ids],
+                         'MMBtu_TOTAL': rng.uniform(1, 100, 2000)})
+
+
+# checking the tile query returns exactly the tiles of the facilities inside the bounds,
+# and the facility query exactly the facilities inside them
+def test_tile_query_matches_brute_force():
+    units_df = random_units_df()
+    facilities = facility_locations(units_df)
+    tile_index = build_tile_index(facilities)
+    bounds = (32.0, 38.5, -105.0, -90.0)
+    inside = units_df.loc[units_df['LATITUDE'].between(32.0, 38.5) & units_df['LONGITUDE'].between(-105.0, -90.0)]
+
+    assert set(query_facilities(facilities, bounds)['FACILITY_ID']) == set(inside['FACILITY_ID'])
+    for zoom in TILE_ZOOM_LEVELS:
+        tiles = query_tiles(tile_index, zoom, bounds)
+        (x_min, x_max), (y_max, y_min) = tile_coordinates([32.0, 38.5], [-105.0, -90.0], zoom)
+        expected = tile_index[zoom].loc[tile_index[zoom]['tile_x'].between(x_min, x_max)
+                                        & tile_index[zoom]['tile_y'].between(y_min, y_max)]
+        assert tiles.equals(expected)
+        # keeping every facility inside the bounds in one of the returned tiles
+        inside_tiles = set(zip(*tile_coordinates(inside['LATITUDE'], inside['LONGITUDE'], zoom)))
+        assert inside_tiles <= set(zip(tiles['tile_x'], tiles['tile_y']))
+        # summing every level's tiles back to the located facilities
+        assert tile_index[zoom]['facilities'].sum() == len(facilities) == units_df['FACILITY_ID'].nunique() - 5
+        assert np.isclose(tile_index[zoom]['MMBtu_TOTAL'].sum(), units_df.dropna()['MMBtu_TOTAL'].sum())
+
+
+# checking the fitted zoom level is the deepest one keeping the area within the tiles across the map
+def test_zoom_fits_area():
+    facilities = facility_locations(random_units_df())
+    for state in (None, 'West', 'East'):
+        bounds = area_bounds(facilities, state)
+        zoom = zoom_for_bounds(bounds)
+        lon_span = bounds[3] - bounds[2]
+        assert lon_span / 360.0 * 2 ** zoom <= MAP_TILES_ACROSS
+        assert zoom == max(TILE_ZOOM_LEVELS) or lon_span / 360.0 * 2 ** (zoom + 1) > MAP_TILES_ACROSS
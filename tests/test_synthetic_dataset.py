@@ -0,0 +1,34 @@
+# importing the required libraries
+import os # for the test file paths
+import pandas as pd # for reading the generated files
+from combustion_analytics.synthetic_dataset import generate_synthetic_dataset # for the generator under test
+
+
+# checking a dataset written over several chunks has the source schema, the requested rows,
+# facility ids continuing across the chunks and one set of facility attributes per facility
+def test_chunked_dataset_matches_schema(object_cleaned_df, tmp_path):
+    source_path = os.path.join(tmp_path, 'source.csv')
+    object_cleaned_df.assign(REPORTING_YEAR=2014, UNIT_NAME='Unit 1').to_csv(source_path, index=False)
+    output_path = os.path.join(tmp_path, 'synthetic', 'synthetic.csv')
+
+    generate_synthetic_dataset(output_path, 1000, source_path, chunk_rows=300)
+    synthetic_df = pd.read_csv(output_path)
+
+    assert list(synthetic_df.columns) == list(pd.read_csv(source_path, nrows=0).columns)
+    assert len(synthetic_df) == 1000
+    assert synthetic_df['FACILITY_ID'].is_monotonic_increasing
+    assert set(synthetic_df['FACILITY_ID']) == set(range(1, synthetic_df['FACILITY_ID'].max() + 1))
+    assert synthetic_df.groupby('FACILITY_ID')[['STATE', 'PRIMARY_NAICS_CODE']].nunique().max().max() == 1
+    assert os.listdir(os.path.dirname(output_path)) == ['synthetic.csv']
+
+
+# checking the same seed writes the same file
+def test_seed_is_reproducible(object_cleaned_df, tmp_path):
+    source_path = os.path.join(tmp_path, 'source.csv')
+    object_cleaned_df.assign(REPORTING_YEAR=2014, UNIT_NAME='Unit 1').to_csv(source_path, index=False)
+    first_path, second_path = os.path.join(tmp_path, 'first.csv'), os.path.join(tmp_path, 'second.csv')
+
+    generate_synthetic_dataset(first_path, 500, source_path, seed=7)
+    generate_synthetic_dataset(second_path, 500, source_path, seed=7)
+    with open(first_path, 'rb') as f_first, open(second_path, 'rb') as f_second:
+        assert f_first.read() == f_second.read()
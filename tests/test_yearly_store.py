@@ -0,0 +1,41 @@
+# importing the required libraries
+import glob # for listing the written partition files
+import os # for the store paths
+import re # for matching the drift message literally
+import numpy as np # for the test coordinates
+import pytest # for checking the raised schema drift
+from combustion_analytics.yearly_store import register_dataset_files, read_manifest, available_years # for the store
+
+
+# helper function for writing a yearly CSV file in the raw dataset's layout, returning its path
+def write_yearly_csv(cleaned_df, tmp_path, year, **changes):
+    raw_columns = {'REPORTING_YEAR': year, 'UNIT_NAME': 'Unit 1', 'CENSUS_PLACE_NAME': 'Place',
+                   'LATITUDE': np.linspace(30, 40, len(cleaned_df)), 'LONGITUDE': np.linspace(-100, -90, len(cleaned_df))}
+    raw_df = cleaned_df.assign(**{**raw_columns, **changes})
+    csv_path = os.path.join(tmp_path, f"combustion_{year}.csv")
+    raw_df.to_csv(csv_path, index=False)
+    return csv_path
+
+
+# checking a column holding no values is not reported as a type change
+def test_all_null_column_is_not_drift(object_cleaned_df, tmp_path):
+    store_dir = os.path.join(tmp_path, 'store')
+    register_dataset_files([write_yearly_csv(object_cleaned_df, tmp_path, 2014)], store_dir)
+    register_dataset_files([write_yearly_csv(object_cleaned_df, tmp_path, 2015, CENSUS_PLACE_NAME=None)], store_dir)
+    assert read_manifest(store_dir)['files']['combustion_2015.csv']['schema_drift'] == []
+    assert available_years(store_dir) == [2014, 2015]
+
+
+# checking a renamed or retyped column of the stored schema is reported as drift before anything is written
+@pytest.mark.parametrize('changes, message', [
+    ({'FIPS': 1}, 'missing column COUNTY_FIPS'),
+    ({'LATITUDE': 'unknown'}, 'LATITUDE (str) cannot be read as float64'),
+])
+def test_breaking_drift_is_raised(object_cleaned_df, tmp_path, changes, message):
+    store_dir = os.path.join(tmp_path, 'store')
+    register_dataset_files([write_yearly_csv(object_cleaned_df, tmp_path, 2014)], store_dir)
+    drifted_df = object_cleaned_df.drop(columns='COUNTY_FIPS') if 'FIPS' in changes else object_cleaned_df
+    with pytest.raises(ValueError, match=re.escape(message)):
+        register_dataset_files([write_yearly_csv(drifted_df, tmp_path, 2015, **changes)], store_dir)
+    assert available_years(store_dir) == [2014]
+    assert not glob.glob(os.path.join(store_dir, 'year=2015', '*'))
@@ -1,25 +1,81 @@
-import chardet # for detecting character encoding of text files
+import argparse # for reading the input and output paths from the command line
+import codecs # for incremental decoding and encoding of byte chunks
+import os # for moving the finished output file into place
+from chardet import UniversalDetector # for detecting character encoding from a sample of a file
 
 
-# helper function for converting files from one encoding to another
-def convertFileEncoding(prev_encode,new_encode,old_filepath,target_file):
-    f_old=open(old_filepath, 'rb')
-    file_content=[]
-    while True:
-        line=f_old.readline()
-        file_content.append(line.decode(prev_encode).encode(new_encode))
-        if len(line) ==0:
+# the size of the byte chunks read from the source file
+CHUNK_SIZE = 1 << 20
+
+# the maximum number of bytes fed to the encoding detector
+DETECTION_SAMPLE_SIZE = 1 << 22
+
+# the encoding assumed when the detector cannot decide (the original dataset is Windows-1252)
+FALLBACK_ENCODING = 'cp1252'
+
+
+# helper function for feeding the detector chunks of an open file until chardet is confident or the sample is used up
+def detectSampleEncoding(f_sample, sample_size, chunk_size, first_chunk=b''):
+    detector = UniversalDetector()
+    detector.feed(first_chunk)
+    bytes_read = len(first_chunk)
+    while bytes_read < sample_size and not detector.done:
+        chunk = f_sample.read(min(chunk_size, sample_size - bytes_read))
+        if not chunk:
             break
+        detector.feed(chunk)
+        bytes_read += len(chunk)
+    detector.close()
+    return detector.result['encoding']
+
+
+# helper function for detecting the encoding of a file from a bounded sample, stopping as soon as chardet is confident;
+# an 'ascii' result is inconclusive when the file goes on, so the rest of the file is scanned for its first chunk
+# holding a non-ASCII byte and the encoding is detected again from there
+def detectFileEncoding(filepath, sample_size=DETECTION_SAMPLE_SIZE, chunk_size=64 * 1024):
+    with open(filepath, 'rb') as f_sample:
+        encoding = detectSampleEncoding(f_sample, sample_size, chunk_size)
+        if encoding == 'ascii':
+            for chunk in iter(lambda: f_sample.read(chunk_size), b''):
+                if not chunk.isascii():
+                    encoding = detectSampleEncoding(f_sample, sample_size, chunk_size, first_chunk=chunk)
+                    break
+    # falling back to the dataset's original encoding when chardet found no likely encoding
+    return encoding or FALLBACK_ENCODING
+
+
+# helper function for converting files from one encoding to another, streaming fixed-size chunks
+# through an incremental decoder/encoder so memory use stays constant whatever the file size;
+# the output is written to a temporary file moved onto the target at the end, so a failed conversion
+# (e.g. a byte the source encoding cannot decode) never leaves a partly converted file behind
+def convertFileEncoding(prev_encode,new_encode,old_filepath,target_file,chunk_size=CHUNK_SIZE):
+    decoder = codecs.getincrementaldecoder(prev_encode)()
+    encoder = codecs.getincrementalencoder(new_encode)()
+    tmp_file = f"{target_file}.{os.getpid()}.tmp"
+    try:
+        with open(old_filepath, 'rb') as f_old, open(tmp_file, 'wb') as f_new:
+            while True:
+                chunk = f_old.read(chunk_size)
+                # flushing any partial multi-byte character held by the decoder at the end of the file
+                final = len(chunk) == 0
+                f_new.write(encoder.encode(decoder.decode(chunk, final=final), final=final))
+                if final:
+                    break
+        os.replace(tmp_file, target_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
 
-    f_old.close()
-    f_new=open(target_file,'wb')
-    f_new.writelines(file_content)
-    f_new.close()
 
-# reading the original dataset file
-convertFile = open("data_source/IndustrialCombEnergy_2014.csv",'rb')
-data = convertFile.read()
-convertFile.close()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a text file to another encoding in constant memory.")
+    parser.add_argument("input", nargs="?", default="data_source/IndustrialCombEnergy_2014.csv",
+                        help="path of the file to convert")
+    parser.add_argument("output", nargs="?", default="data_source/IndustrialCombEnergy_2014_utf-8_version.csv",
+                        help="path of the converted file")
+    parser.add_argument("--from-encoding", help="source encoding (detected from a sample of the input when omitted)")
+    parser.add_argument("--to-encoding", default="utf-8", help="target encoding (default: utf-8)")
+    args = parser.parse_args()
 
-# executing the function to convert the original dataset in Windows-1252 to utf-8 which is an efficient encoding systems and widely used 
-convertFileEncoding(chardet.detect(data)['encoding'], "utf-8", "data_source/IndustrialCombEnergy_2014.csv", "data_source/IndustrialCombEnergy_2014_utf-8_version.csv")
\ No newline at end of file
+    # executing the function to convert the original dataset (in Windows-1252 by default) to utf-8 which is an efficient encoding systems and widely used
+    convertFileEncoding(args.from_encoding or detectFileEncoding(args.input), args.to_encoding, args.input, args.output)